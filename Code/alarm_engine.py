@@ -0,0 +1,206 @@
+# alarm_engine.py
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from alarm_zones import ZoneSet
+from radar_decoder import frame_source
+
+# 默认报警事件日志，放在用户目录下而不是运行目录
+DEFAULT_LOG_PATH = os.path.join(os.path.expanduser('~'), '.sr111', 'alarm_events.csv')
+
+# 报警区域状态
+ZONE_CLEAR = 0  # 无目标
+ZONE_PENDING = 1  # 有目标，等待持续时间
+ZONE_ALARM = 2  # 报警中
+ZONE_RELEASING = 3  # 报警中目标离开，等待解除延时
+
+
+class AlarmEvent:
+    """一次报警区域状态变化
+
+    kind: 'enter' 进入报警 / 'leave' 解除报警
+    """
+
+    def __init__(self, timestamp, zone, kind, targets=()):
+        self.timestamp = timestamp  # 墙上时间 (秒)
+        self.zone = zone  # 区域序号
+        self.kind = kind
+        self.targets = list(targets)
+
+    def format(self):
+        ts = datetime.fromtimestamp(self.timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        targets = ' '.join(str(t) for t in self.targets)
+        return f"{ts},{self.kind},{self.zone + 1},{targets}"
+
+
+class AlarmEngine:
+    """报警区域状态机，带持续时间和解除延时
+
+    区域内连续有目标达到 dwell 秒才报警，报警后连续无目标达到 hold 秒才解除，
+    避免目标在区域边缘抖动时反复报警。多个雷达的帧分别记录，区域占用为
+    各雷达最近一帧（未超过 sensor_timeout）的合计。雷达有列表头时没有目标的扫描
+    发送空帧，目标离开后立即视为无目标；没有列表头时不发送空帧，最多
+    sensor_timeout 秒后才视为无目标。
+    """
+
+    def __init__(self, zones=None, dwell=0.0, hold=0.0, sensor_timeout=0.5):
+        self.dwell = dwell  # 秒
+        self.hold = hold  # 秒
+        self.sensor_timeout = sensor_timeout
+        self.set_zones(zones or ZoneSet())
+
+    @property
+    def active(self):
+        """是否有区域处于报警中"""
+        return bool(np.isin(self.state, (ZONE_ALARM, ZONE_RELEASING)).any())
+
+    def set_zones(self, zones):
+        """更换报警区域，状态重新开始"""
+        self.zones = zones
+        self.state = np.full(len(zones), ZONE_CLEAR, dtype=np.int8)
+        self.since = np.zeros(len(zones))  # 进入当前状态的时间
+        self._hits = {}  # {(传感器序号, 目标类型): (ZoneHits, 时间)}
+
+    def process(self, frame, now=None, wall=None):
+        """处理一帧目标 frame: FRAME_DTYPE结构化数组，返回报警事件列表
+
+        空帧（该雷达本次扫描没有目标）立即清除该雷达在各区域中的目标。
+        """
+        now = time.monotonic() if now is None else now
+        source = frame_source(frame)
+        if source is not None:
+            hits = self.zones.evaluate(frame['x'], frame['y'], frame['tid'])
+            self._hits[source] = (hits, now)
+        return self.update(now, wall)
+
+    def update(self, now=None, wall=None):
+        """按当前占用情况推进状态机，没有新帧时也需定期调用以处理超时"""
+        now = time.monotonic() if now is None else now
+        wall = time.time() if wall is None else wall
+        counts = np.zeros(len(self.zones), dtype=np.intp)
+        for key, (hits, received) in list(self._hits.items()):
+            if now - received > self.sensor_timeout:
+                del self._hits[key]
+            else:
+                counts += hits.counts
+        occupied = counts > 0
+        state, since = self.state, self.since
+        events = []
+
+        # 无目标 -> 等待；报警解除中又有目标 -> 报警
+        start = occupied & (state == ZONE_CLEAR)
+        state[start], since[start] = ZONE_PENDING, now
+        state[occupied & (state == ZONE_RELEASING)] = ZONE_ALARM
+        # 等待期间目标离开 -> 无目标
+        state[~occupied & (state == ZONE_PENDING)] = ZONE_CLEAR
+        # 报警中目标离开 -> 解除中
+        leaving = ~occupied & (state == ZONE_ALARM)
+        state[leaving], since[leaving] = ZONE_RELEASING, now
+
+        for zone in np.flatnonzero((state == ZONE_PENDING) & (now - since >= self.dwell)).tolist():
+            state[zone] = ZONE_ALARM
+            events.append(AlarmEvent(wall, zone, 'enter', self._targets(zone)))
+        for zone in np.flatnonzero((state == ZONE_RELEASING) & (now - since >= self.hold)).tolist():
+            state[zone] = ZONE_CLEAR
+            events.append(AlarmEvent(wall, zone, 'leave'))
+        return events
+
+    def _targets(self, zone):
+        return [int(t) for hits, _ in self._hits.values() for t in hits.targets[zone]]
+
+
+class AlarmMonitor:
+    """在独立线程中对解析出的每帧目标做报警判断
+
+    接收线程通过 submit 提交帧（不阻塞，队列满时丢弃最旧的帧），报警事件
+    追加写入 log_path（CSV: 时间,类型,区域,目标ID），并回调 on_event。
+    日志文件在第一次产生事件时才创建。
+    """
+
+    def __init__(self, log_path=None, dwell=0.0, hold=0.0, on_event=None, max_queue=64, tick=0.05):
+        self.engine = AlarmEngine(dwell=dwell, hold=hold)
+        self.log_path = log_path
+        self.on_event = on_event
+        self.tick = tick  # 无新帧时推进状态机的间隔 (秒)
+        self.dropped_frames = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._log = None
+        self._thread = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="AlarmMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._thread.join()
+        with self._lock:
+            if self._log:
+                self._log.close()
+                self._log = None
+
+    def submit(self, frame):
+        """提交一帧目标，在接收线程中调用"""
+        while True:
+            try:
+                self._queue.put_nowait((frame, time.monotonic(), time.time()))
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped_frames += 1
+                except queue.Empty:
+                    pass
+
+    def set_zones(self, zones):
+        """更换报警区域，在界面线程中调用"""
+        with self._lock:
+            self._emit(self._leave_all())
+            self.engine.set_zones(zones)
+
+    def set_times(self, dwell, hold):
+        with self._lock:
+            self.engine.dwell = dwell
+            self.engine.hold = hold
+
+    def _leave_all(self):
+        """区域更换前解除仍在报警的区域"""
+        wall = time.time()
+        alarmed = np.isin(self.engine.state, (ZONE_ALARM, ZONE_RELEASING))
+        return [AlarmEvent(wall, zone, 'leave') for zone in np.flatnonzero(alarmed).tolist()]
+
+    def _run(self):
+        while self.running:
+            try:
+                frame, now, wall = self._queue.get(timeout=self.tick)
+            except queue.Empty:
+                with self._lock:
+                    self._emit(self.engine.update())
+            else:
+                with self._lock:
+                    self._emit(self.engine.process(frame, now, wall))
+
+    def _emit(self, events):
+        """写入事件日志并回调，调用时已持有锁"""
+        if not events:
+            return
+        if self.log_path and not self._log:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                self._log = open(self.log_path, 'a', encoding='utf-8')
+            except OSError as e:
+                print(f"无法打开报警日志: {e}")
+                self.log_path = None
+        if self._log:
+            self._log.write(''.join(event.format() + '\n' for event in events))
+            self._log.flush()
+        if self.on_event:
+            self.on_event(events)
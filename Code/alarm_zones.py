@@ -0,0 +1,145 @@
+# alarm_zones.py
+import numpy as np
+
+
+def is_polygon(zone):
+    """区域是否为多边形 [[x, y], ...]，否则为矩形 (x1, y1, x2, y2)"""
+    return len(zone) > 0 and not np.isscalar(zone[0])
+
+
+def zone_bounds(zone):
+    """区域的外接矩形 (x_min, y_min, x_max, y_max)"""
+    if is_polygon(zone):
+        pts = np.asarray(zone, dtype=float)
+        return (*pts.min(axis=0), *pts.max(axis=0))
+    x1, y1, x2, y2 = zone
+    return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+
+def describe_zone(zone):
+    """用于日志显示的区域描述"""
+    if is_polygon(zone):
+        return "多边形: " + ", ".join(f"({x:.1f},{y:.1f})" for x, y in zone)
+    x1, y1, x2, y2 = zone_bounds(zone)
+    return f"X={x1:g}~{x2:g}m, Y={y1:g}~{y2:g}m"
+
+
+def points_in_polygon(xs, ys, polygon):
+    """射线法判断点是否在多边形内，对全部点和边一次计算，返回布尔数组"""
+    poly = np.asarray(polygon, dtype=float)
+    x1, y1 = poly[:, 0:1], poly[:, 1:2]  # (边数, 1)
+    x2, y2 = np.roll(x1, -1, axis=0), np.roll(y1, -1, axis=0)
+    crosses = (y1 > ys) != (y2 > ys)  # (边数, 点数)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_at = x1 + (ys - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(crosses & (xs < x_at), axis=0) % 2 == 1
+
+
+class ZoneHits:
+    """一帧的报警区域检测结果
+
+    counts: 每个区域内的目标数；targets: 每个区域内的目标ID数组
+    """
+
+    def __init__(self, counts, targets):
+        self.counts = counts
+        self.targets = targets
+
+    @property
+    def active(self):
+        return bool(self.counts.any())
+
+    def occupied(self):
+        """有目标进入的区域序号"""
+        return np.flatnonzero(self.counts).tolist()
+
+
+class _ZoneGrid:
+    """报警区域外接矩形的均匀网格索引，每个网格记录与之相交的区域"""
+
+    def __init__(self, bounds):
+        n = max(1, int(np.ceil(np.sqrt(len(bounds)))))  # 每个方向的网格数
+        self.n = n
+        self.origin = bounds[:, :2].min(axis=0)
+        self.cell = np.maximum((bounds[:, 2:].max(axis=0) - self.origin) / n, 1e-6)
+        lo = self._cell_xy(bounds[:, :2])
+        hi = self._cell_xy(bounds[:, 2:])
+        cells = [[] for _ in range(n * n)]
+        for zone, ((cx0, cy0), (cx1, cy1)) in enumerate(zip(lo.tolist(), hi.tolist())):
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    cells[cx * n + cy].append(zone)
+        # CSR格式: 网格c中的区域为 zones[start[c]:start[c+1]]
+        self.start = np.zeros(n * n + 1, dtype=np.intp)
+        self.start[1:] = np.cumsum([len(c) for c in cells])
+        self.zones = np.array([z for c in cells for z in c], dtype=np.intp)
+
+    def _cell_xy(self, pts):
+        return np.clip(np.floor((pts - self.origin) / self.cell), 0, self.n - 1).astype(np.intp)
+
+    def candidates(self, xs, ys):
+        """每个点所在网格中的区域，返回 (区域序号, 点序号) 数组"""
+        pts = np.column_stack((xs, ys))
+        rel = (pts - self.origin) / self.cell
+        valid = np.flatnonzero(((rel >= 0) & (rel <= self.n)).all(axis=1))
+        cxy = self._cell_xy(pts[valid])
+        cell = cxy[:, 0] * self.n + cxy[:, 1]
+        counts = self.start[cell + 1] - self.start[cell]
+        total = int(counts.sum())
+        point_idx = np.repeat(valid, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        zone_idx = self.zones[np.repeat(self.start[cell], counts) + offsets]
+        return zone_idx, point_idx
+
+
+class ZoneSet:
+    """一组报警区域，支持矩形和多边形，对一帧全部点向量化检测
+
+    区域数达到 grid_threshold 时先用均匀网格索引找出候选的 区域-点 对，
+    避免每帧计算 区域数×点数 的完整矩阵。
+    """
+
+    def __init__(self, zones=(), grid_threshold=32):
+        self.zones = list(zones)
+        self.bounds = np.array([zone_bounds(z) for z in self.zones], dtype=float).reshape(-1, 4)
+        self._polygons = {i: np.asarray(z, dtype=float) for i, z in enumerate(self.zones) if is_polygon(z)}
+        self._grid = _ZoneGrid(self.bounds) if len(self.zones) >= max(grid_threshold, 1) else None
+
+    def __len__(self):
+        return len(self.zones)
+
+    def pairs(self, xs, ys):
+        """目标所在的区域，返回按区域排序的 (区域序号, 点序号) 数组"""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        if self._grid is not None:
+            zone_idx, point_idx = self._grid.candidates(xs, ys)
+        else:
+            zone_idx, point_idx = np.divmod(np.arange(len(self.zones) * len(xs)), len(xs))
+        # 外接矩形检测同时是矩形区域的结果和多边形区域的预筛选
+        b = self.bounds[zone_idx]
+        px, py = xs[point_idx], ys[point_idx]
+        keep = (b[:, 0] <= px) & (px <= b[:, 2]) & (b[:, 1] <= py) & (py <= b[:, 3])
+        zone_idx, point_idx = zone_idx[keep], point_idx[keep]
+        order = np.argsort(zone_idx, kind='stable')
+        zone_idx, point_idx = zone_idx[order], point_idx[order]
+        if self._polygons and len(zone_idx):
+            keep = np.ones(len(zone_idx), dtype=bool)
+            bounds = np.searchsorted(zone_idx, np.arange(len(self.zones) + 1))
+            # 只检测有候选点的多边形
+            for i in np.flatnonzero(bounds[1:] > bounds[:-1]).tolist():
+                poly = self._polygons.get(i)
+                if poly is not None:
+                    lo, hi = bounds[i], bounds[i + 1]
+                    pts = point_idx[lo:hi]
+                    keep[lo:hi] = points_in_polygon(xs[pts], ys[pts], poly)
+            zone_idx, point_idx = zone_idx[keep], point_idx[keep]
+        return zone_idx, point_idx
+
+    def evaluate(self, xs, ys, ids=None):
+        """检测一帧目标，ids为目标ID（默认为点的序号）"""
+        zone_idx, point_idx = self.pairs(xs, ys)
+        ids = np.arange(len(xs)) if ids is None else np.asarray(ids)
+        counts = np.bincount(zone_idx, minlength=len(self.zones))
+        targets = np.split(ids[point_idx], np.cumsum(counts)[:-1]) if len(self.zones) else []
+        return ZoneHits(counts, targets)
@@ -0,0 +1,419 @@
+# benchmark.py
+"""接收→解析→绘制流水线的无界面性能测试
+
+通过python-can的virtual总线发送合成的0x60B目标报文，在offscreen Qt平台下
+驱动 RadarWorker、RadarGUI.update_frame/refresh_plots 和
+PointCloudViewer.update_frame，统计各阶段延迟分位数、丢帧数和CPU时间；
+另外单独测试批量解析和 TargetTracker 的每帧耗时，以及无界面(radar_daemon)
+与界面两种方式在新进程中的启动耗时和内存。
+
+用法:
+    python benchmark.py --targets 100 --rate 50 --duration 10 --output result.json
+    python benchmark.py --output new.json --baseline result.json
+    python benchmark.py --refresh-ms 50  # 使用固定50ms定时器刷新（旧方式）
+"""
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import can
+import numpy as np
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import QTimer, Qt
+from radar_decoder import decode_target, decode_targets
+from radar_gui import RadarGUI
+from tracker import TargetTracker
+
+VIRTUAL_CHANNEL = 'sr111_benchmark'
+
+
+def summarize(samples):
+    """计算样本(毫秒)的分位数统计"""
+    if not samples:
+        return {'count': 0}
+    a = np.asarray(samples, dtype=np.float64)
+    p50, p90, p99 = np.percentile(a, [50, 90, 99])
+    return {
+        'count': len(a),
+        'mean': float(a.mean()),
+        'p50': float(p50),
+        'p90': float(p90),
+        'p99': float(p99),
+        'max': float(a.max()),
+    }
+
+
+def make_scan(targets, rng):
+    """生成一次扫描的目标报文，目标ID为 0..targets-1"""
+    payloads = rng.integers(0, 256, (targets, 8), dtype=np.uint8)
+    payloads[:, 0] = np.arange(targets)
+    return [can.Message(arbitration_id=0x60B, data=row.tobytes(), is_extended_id=False)
+            for row in payloads]
+
+
+class TrafficGenerator(threading.Thread):
+    """按固定帧率向virtual总线发送合成扫描"""
+
+    def __init__(self, targets, rate, duration, seed=0):
+        super().__init__(name="TrafficGenerator", daemon=True)
+        rng = np.random.default_rng(seed)
+        self.scans = [make_scan(targets, rng) for _ in range(16)]
+        self.rate = rate
+        self.scan_count = int(duration * rate)
+        self.scan_end_times = []  # 每次扫描最后一条报文的发送时刻
+        self.messages_sent = 0
+
+    def run(self):
+        bus = can.interface.Bus(interface='virtual', channel=VIRTUAL_CHANNEL)
+        period = 1.0 / self.rate
+        next_time = time.perf_counter()
+        try:
+            for i in range(self.scan_count):
+                for msg in self.scans[i % len(self.scans)]:
+                    msg.timestamp = time.time()
+                    bus.send(msg)
+                    self.messages_sent += 1
+                self.scan_end_times.append(time.time())
+                next_time += period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        finally:
+            bus.shutdown()
+
+
+def thread_cpu_time(ident):
+    """读取指定线程的CPU时间（仅Linux等支持pthread_getcpuclockid的平台）"""
+    if ident is None or not hasattr(time, 'pthread_getcpuclockid'):
+        return None
+    return time.clock_gettime(time.pthread_getcpuclockid(ident))
+
+
+def bench_pipeline(targets, rate, duration, refresh_ms):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    window = RadarGUI()
+    window.can_interface = 'virtual'
+    window.show()
+
+    emit_times = []  # 工作线程发出 new_frame 的时刻
+    receive_times = []  # 界面线程收到帧的时刻
+    samples = {'update_frame': [], 'refresh_plots': [], 'update_cloud': []}
+    rendered = []  # (帧序号, 绘制完成时刻)
+    worker_ident = [None]
+    state = {'last_received': -1, 'last_rendered': -1}
+
+    def timed(name, func):
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            result = func(*args, **kwargs)
+            samples[name].append((time.perf_counter() - t0) * 1000)
+            return result
+        return wrapper
+
+    update_frame = timed('update_frame', window.update_frame)
+
+    def on_frame(frame):
+        receive_times.append(time.time())
+        state['last_received'] = len(receive_times) - 1
+        update_frame(frame)
+    window.update_frame = on_frame
+
+    refresh_plots = window.refresh_plots
+
+    def on_refresh():
+        pending = state['last_received'] if state['last_received'] != state['last_rendered'] else None
+        t0 = time.perf_counter()
+        refresh_plots()
+        if pending is not None:
+            samples['refresh_plots'].append((time.perf_counter() - t0) * 1000)
+            rendered.append((pending, time.time()))
+            state['last_rendered'] = pending
+    window.point_cloud.update_frame = timed('update_cloud', window.point_cloud.update_frame)
+    scheduler = window.render_scheduler
+    if refresh_ms > 0:
+        # 固定周期刷新，用于与旧的定时器方式对比
+        scheduler.enabled = False
+    else:
+        scheduler.render = on_refresh
+
+    generator = TrafficGenerator(targets, rate, duration)
+    result = {}
+
+    def start():
+        window.start_radar(VIRTUAL_CHANNEL)
+        worker = window.radar_threads[0]
+        # DirectConnection 的槽在工作线程中执行，用于记录发送时刻和线程标识
+        worker.new_frame.connect(lambda frame: emit_times.append(time.time()), Qt.DirectConnection)
+        worker.status_signal.connect(
+            lambda status: worker_ident.__setitem__(0, threading.get_ident()), Qt.DirectConnection)
+        QTimer.singleShot(200, begin)
+
+    def begin():
+        result['cpu_start'] = time.process_time()
+        result['main_cpu_start'] = time.thread_time()
+        result['worker_cpu_start'] = thread_cpu_time(worker_ident[0])
+        result['wall_start'] = time.perf_counter()
+        generator.start()
+        QTimer.singleShot(int(duration * 1000), finish)
+
+    def finish():
+        if generator.is_alive():
+            QTimer.singleShot(50, finish)
+            return
+        # 留出时间让最后一帧被处理
+        QTimer.singleShot(max(500, 4 * refresh_ms), stop)
+
+    def stop():
+        result['wall'] = time.perf_counter() - result['wall_start']
+        result['cpu'] = time.process_time() - result['cpu_start']
+        result['main_cpu'] = time.thread_time() - result['main_cpu_start']
+        worker_end = thread_cpu_time(worker_ident[0])
+        if worker_end is not None and result['worker_cpu_start'] is not None:
+            result['worker_cpu'] = worker_end - result['worker_cpu_start']
+        app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(on_refresh)
+    if refresh_ms > 0:
+        timer.start(refresh_ms)
+    QTimer.singleShot(0, start)
+    app.exec_()
+    timer.stop()
+    window.stop_radar()
+    window.close()
+
+    # 按顺序将扫描与帧对应（工作线程按接收顺序发送帧）
+    scan_end = generator.scan_end_times
+    n = min(len(scan_end), len(emit_times))
+    decode = [(emit_times[i] - scan_end[i]) * 1000 for i in range(n)]
+    queue = [(receive_times[i] - emit_times[i]) * 1000 for i in range(min(n, len(receive_times)))]
+    end_to_end = [(t - scan_end[i]) * 1000 for i, t in rendered if i < len(scan_end)]
+
+    messages_received = window.raw_log.total
+    return {
+        'stages_ms': {
+            'receive_decode': summarize(decode),
+            'signal_queue': summarize(queue),
+            'update_frame': summarize(samples['update_frame']),
+            'refresh_plots': summarize(samples['refresh_plots']),
+            'update_cloud': summarize(samples['update_cloud']),
+            'end_to_end': summarize(end_to_end),
+        },
+        'frames': {
+            'sent': len(scan_end),
+            'emitted': len(emit_times),
+            'received': len(receive_times),
+            'rendered': len(rendered),
+            # 未形成独立帧的扫描 + 收到后被下一帧覆盖、从未绘制的帧
+            'dropped': max(0, len(scan_end) - len(emit_times)) + len(receive_times) - len(rendered),
+        },
+        'messages': {
+            'sent': generator.messages_sent,
+            'received': messages_received,
+            'per_second': messages_received / result['wall'],
+        },
+        'cpu_s': {
+            'process': result['cpu'],
+            'main_thread': result['main_cpu'],
+            'worker_thread': result.get('worker_cpu'),
+            'wall': result['wall'],
+        },
+    }
+
+
+def bench_decoder(count, repeats=5, seed=0):
+    """比较逐条解析与批量解析的耗时，并校验两者结果一致"""
+    rng = np.random.default_rng(seed)
+    payloads = rng.integers(0, 256, (count, 8), dtype=np.uint8)
+    rows = [bytearray(row.tobytes()) for row in payloads]
+
+    scalar_times, vector_times = [], []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        scalar = [decode_target(row) for row in rows]
+        scalar_times.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        tids, xs, ys = decode_targets(payloads)
+        vector_times.append((time.perf_counter() - t0) * 1000)
+
+    expected = np.array(scalar, dtype=np.float64)
+    match = (np.array_equal(tids, expected[:, 0]) and
+             np.allclose(xs, expected[:, 1]) and np.allclose(ys, expected[:, 2]))
+    return {
+        'payloads': count,
+        'scalar_ms': min(scalar_times),
+        'vectorized_ms': min(vector_times),
+        'speedup': min(scalar_times) / max(min(vector_times), 1e-9),
+        'results_match': bool(match),
+    }
+
+
+def bench_tracker(counts=(100, 300, 500), frames=250, rate=50, seed=0):
+    """跟踪器每帧耗时: 匀速运动的目标加量测噪声，每帧打乱量测顺序"""
+    rng = np.random.default_rng(seed)
+    results = {}
+    for count in counts:
+        tracker = TargetTracker(max_tracks=max(512, 2 * count))
+        pos = rng.uniform(-100, 100, (count, 2))
+        vel = rng.uniform(-10, 10, (count, 2))
+        times = []
+        for i in range(frames):
+            pos += vel / rate
+            meas = pos[rng.permutation(count)] + rng.normal(0, 0.3, pos.shape)
+            t0 = time.perf_counter()
+            tracker.update(meas[:, 0], meas[:, 1], i / rate)
+            times.append((time.perf_counter() - t0) * 1000)
+        results[str(count)] = summarize(times[10:])
+        results[str(count)]['confirmed'] = len(tracker.confirmed)
+    return results
+
+
+# 在新进程中启动并输出 {'import_ms', 'ready_ms', 'rss_mb'}
+STARTUP_SCRIPTS = {
+    'headless': """
+import json, time
+t0 = time.perf_counter()
+from radar_daemon import RadarDaemon, memory_usage_mb
+t1 = time.perf_counter()
+daemon = RadarDaemon('sr111_startup', interface='virtual', alarm_log=None, configure=False, output=lambda text: None)
+daemon.start()
+t2 = time.perf_counter()
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'ready_ms': (t2 - t0) * 1000, 'rss_mb': memory_usage_mb()}))
+daemon.stop()
+""",
+    'gui': """
+import json, os, sys, time
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+t0 = time.perf_counter()
+try:  # 与main.py相同；未安装matplotlib时只测Qt部分
+    import matplotlib
+    matplotlib.use('Agg')
+except ImportError:
+    pass
+from PyQt5 import QtWidgets
+from radar_gui import RadarGUI
+t1 = time.perf_counter()
+app = QtWidgets.QApplication(sys.argv)
+window = RadarGUI()
+window.show()
+app.processEvents()
+t2 = time.perf_counter()
+from radar_daemon import memory_usage_mb
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'ready_ms': (t2 - t0) * 1000, 'rss_mb': memory_usage_mb()}))
+window.alarm_monitor.stop()
+""",
+}
+
+
+def bench_startup(repeats=3):
+    """无界面与界面方式的启动耗时和常驻内存，total_ms 含解释器启动，取多次中的最小值"""
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [code_dir, os.environ.get('PYTHONPATH')])))
+    results = {}
+    for name, script in STARTUP_SCRIPTS.items():
+        runs = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            output = subprocess.check_output([sys.executable, '-c', script], env=env,
+                                             stderr=subprocess.DEVNULL, text=True)
+            run = json.loads(output.strip().splitlines()[-1])
+            run['total_ms'] = (time.perf_counter() - t0) * 1000
+            runs.append(run)
+        results[name] = {key: min(run[key] for run in runs) for key in runs[0] if runs[0][key] is not None}
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline):
+    """打印与基线结果的对比（比值>1表示变慢）"""
+    print(f"\n与基线 {baseline.get('revision')} 对比:")
+    for stage, stats in current['stages_ms'].items():
+        base = baseline.get('stages_ms', {}).get(stage, {})
+        for key in ('p50', 'p99'):
+            if key in stats and base.get(key):
+                print(f"  {stage:15s} {key}: {stats[key]:8.3f} ms  基线 {base[key]:8.3f} ms  "
+                      f"比值 {stats[key] / base[key]:.2f}")
+    rate, base_rate = current['messages']['per_second'], baseline.get('messages', {}).get('per_second')
+    if base_rate:
+        print(f"  报文吞吐: {rate:.0f}/s  基线 {base_rate:.0f}/s  比值 {rate / base_rate:.2f}")
+
+
+def print_report(report):
+    cfg = report['config']
+    print(f"目标数 {cfg['targets']}  帧率 {cfg['rate']} Hz  时长 {cfg['duration']} s")
+    for stage, stats in report['stages_ms'].items():
+        if stats['count']:
+            print(f"  {stage:15s} n={stats['count']:6d}  p50 {stats['p50']:8.3f}  "
+                  f"p90 {stats['p90']:8.3f}  p99 {stats['p99']:8.3f}  max {stats['max']:8.3f} ms")
+    print(f"  帧: {report['frames']}")
+    print(f"  报文: {report['messages']}")
+    print(f"  CPU(s): {report['cpu_s']}")
+    dec = report['decoder']
+    print(f"  解析 {dec['payloads']} 条: 逐条 {dec['scalar_ms']:.3f} ms, 批量 {dec['vectorized_ms']:.3f} ms, "
+          f"加速 {dec['speedup']:.1f}x, 结果一致: {dec['results_match']}")
+    for count, stats in report.get('tracker', {}).items():
+        print(f"  跟踪 {count:>4s} 个目标: p50 {stats['p50']:.3f}  p99 {stats['p99']:.3f} ms/帧  "
+              f"确认航迹 {stats['confirmed']}")
+    for name, stats in report.get('startup', {}).items():
+        memory = f"  内存 {stats['rss_mb']:.1f} MB" if 'rss_mb' in stats else ""
+        print(f"  启动({name}): 导入 {stats['import_ms']:.0f} ms  就绪 {stats['ready_ms']:.0f} ms  "
+              f"含解释器 {stats['total_ms']:.0f} ms{memory}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SR111流水线性能测试")
+    parser.add_argument('--targets', type=int, default=100, help="每帧目标数 (1-256)")
+    parser.add_argument('--rate', type=float, default=50, help="雷达帧率 (Hz)")
+    parser.add_argument('--duration', type=float, default=10, help="测试时长 (s)")
+    parser.add_argument('--refresh-ms', type=int, default=0,
+                        help="固定界面刷新周期 (ms)，0为按新帧到达刷新 (RenderScheduler)")
+    parser.add_argument('--decoder-payloads', type=int, default=100000, help="解析测试的报文条数")
+    parser.add_argument('--output', help="结果JSON文件")
+    parser.add_argument('--baseline', help="用于对比的基线结果JSON文件")
+    args = parser.parse_args(argv)
+    if not 1 <= args.targets <= 256:
+        parser.error("目标ID为8位，--targets 必须在1到256之间")
+
+    report = {
+        'revision': git_revision(),
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'config': {
+            'targets': args.targets,
+            'rate': args.rate,
+            'duration': args.duration,
+            'refresh_ms': args.refresh_ms,
+        },
+    }
+    report.update(bench_pipeline(args.targets, args.rate, args.duration, args.refresh_ms))
+    report['decoder'] = bench_decoder(args.decoder_payloads)
+    report['tracker'] = bench_tracker()
+    report['startup'] = bench_startup()
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
+    return 0 if report['decoder']['results_match'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
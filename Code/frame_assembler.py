@@ -0,0 +1,199 @@
+# frame_assembler.py
+import time
+import numpy as np
+from radar_decoder import KIND_CLUSTER, KIND_TARGET, decode_frame, decode_list_header, empty_frame
+from sensors import SensorConfig
+
+CYCLE_MODULO = 0x10000  # 列表头周期计数为16位
+
+
+class FrameStats:
+    """单个目标列表的组帧统计"""
+
+    def __init__(self):
+        self.frames = 0  # 发出的帧数
+        self.complete = 0  # 收齐列表头所报数量的帧数
+        self.headerless = 0  # 没有列表头、按ID重复或时间窗口结束的帧数
+        self.missing = 0  # 未收到的报文数
+        self.late = 0  # 帧结束后才到达而被丢弃的报文数
+        self.lost_cycles = 0  # 周期计数跳变表明丢失的扫描数
+        self.cycle = None  # 最近一帧的周期计数
+        self.expected = None  # 最近一帧列表头报告的报文数，None表示无列表头
+        self.received = 0  # 最近一帧收到的报文数
+
+    @property
+    def completeness(self):
+        """有列表头的帧中收齐的比例"""
+        with_header = self.frames - self.headerless
+        return self.complete / with_header if with_header else 1.0
+
+    def to_dict(self):
+        return {
+            'frames': self.frames,
+            'complete': self.complete,
+            'headerless': self.headerless,
+            'missing': self.missing,
+            'late': self.late,
+            'lost_cycles': self.lost_cycles,
+            'cycle': self.cycle,
+            'expected': self.expected,
+            'received': self.received,
+            'completeness': self.completeness,
+        }
+
+
+class FrameBuilder:
+    """按扫描收集单个雷达一个目标列表（目标或聚类）的报文负载，结束一帧时批量解析
+
+    收到列表头后按其中的报文数组帧，收齐即发出，之后到达的报文计为迟到；
+    超过 header_window 仍未收齐则按不完整帧发出，列表头报告没有目标时发出空帧。
+    超过 header_timeout 没有列表头时，同一扫描内ID不会重复，ID重复或超过 window
+    即结束一帧。质量报文在同一扫描的目标报文之后发送，按ID合并到当前帧；
+    quality 为True（当前输出模式发送该列表的质量报文）时，质量报文也收齐才发出。
+    输出坐标和速度已按传感器外参转换到世界坐标系。
+    """
+
+    def __init__(self, sensor=None, kind=KIND_TARGET, window=0.05, header_window=0.2, header_timeout=1.0,
+                 quality=False):
+        self.sensor = sensor or SensorConfig()
+        self.kind = kind
+        self.quality = quality
+        self.window = window  # 秒
+        self.header_window = header_window
+        self.header_timeout = header_timeout
+        self.stats = FrameStats()
+        self._payload_buf = np.zeros((256, 8), dtype=np.uint8)  # 当前帧的原始负载
+        self._timestamps = np.zeros(256)
+        self._count = 0
+        self._start = 0.0
+        self._tids = bytearray(256)  # 当前帧已出现的ID
+        self._quality = np.zeros(256, dtype=np.uint8)  # 当前帧的质量等级
+        self._quality_count = 0  # 当前帧收到的质量报文数
+        self._expected = None  # 当前帧列表头报告的报文数
+        self._cycle = None  # 当前帧的周期计数
+        self._header_time = None  # 最近一次列表头的时刻
+        self._waiting = False  # 本周期已发出，等待下一个列表头
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def name(self):
+        return f"{self.sensor.name}/{'聚类' if self.kind == KIND_CLUSTER else '目标'}"
+
+    def header(self, data):
+        """处理列表头报文，返回结束的帧列表: 未收齐的上一帧（不完整帧）和本周期的空帧"""
+        if len(data) < 4:
+            return []
+        expected, cycle = decode_list_header(self.kind, data)
+        finished = []
+        frame = self.flush()
+        if frame is not None:
+            finished.append(frame)
+        if self._cycle is not None:
+            self.stats.lost_cycles += (cycle - self._cycle - 1) % CYCLE_MODULO
+        self._cycle = cycle
+        self._header_time = time.monotonic()
+        self._start = self._header_time
+        if expected == 0:
+            # 本周期没有目标，发出空帧以便界面和报警及时清除该雷达的目标
+            self._count_frame(0, expected)
+            self._waiting = True
+            finished.append(empty_frame(self.sensor.index, self.kind))
+        else:
+            self._expected = expected
+            self._waiting = False
+        return finished
+
+    def add(self, data, timestamp=0.0):
+        """加入一条目标/聚类报文负载，若因此结束了一帧则返回该帧，否则返回None"""
+        if len(data) < 7:
+            return None
+        if self._waiting:
+            if time.monotonic() - self._header_time < self.header_timeout:
+                self.stats.late += 1
+                return None
+            # 列表头已停止，改为按ID组帧
+            self._waiting = False
+        finished = None
+        tid = data[0]
+        if self._tids[tid]:
+            # 列表头丢失或报文数不符，结束当前帧后按ID组帧
+            finished = self.flush()
+        if self._count == 0 and self._expected is None:
+            self._start = time.monotonic()
+        if self._count == len(self._payload_buf):
+            # 点云模式下单帧点数可能超过预分配容量
+            self._payload_buf = np.concatenate((self._payload_buf, np.zeros_like(self._payload_buf)))
+            self._timestamps = np.concatenate((self._timestamps, np.zeros_like(self._timestamps)))
+        row = self._payload_buf[self._count]
+        row[:] = 0
+        row[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+        self._timestamps[self._count] = timestamp
+        self._count += 1
+        self._tids[tid] = 1
+        complete = self._finish_complete()
+        return finished if complete is None else complete
+
+    def add_quality(self, data):
+        """加入一条质量报文，合并到当前帧中ID相同的目标，若因此收齐了一帧则返回该帧"""
+        if len(data) < 7 or self._waiting:
+            return None
+        # 布局见 radar_decoder 中的质量报文说明
+        self._quality[data[0]] = data[6] >> 5
+        self._quality_count += 1
+        return self._finish_complete()
+
+    def _finish_complete(self):
+        """已收齐列表头报告的目标报文（和质量报文）时结束当前帧"""
+        expected = self._expected
+        if expected is None or self._count < expected or (self.quality and self._quality_count < expected):
+            return None
+        frame = self.flush()
+        self._waiting = True
+        return frame
+
+    def expire(self, now=None):
+        """当前帧超过时间窗口时结束并返回该帧，否则返回None"""
+        if self._count == 0:
+            return None
+        now = time.monotonic() if now is None else now
+        window = self.window if self._expected is None else self.header_window
+        if now - self._start < window:
+            return None
+        waiting = self._expected is not None
+        frame = self.flush()
+        self._waiting = waiting
+        return frame
+
+    def flush(self):
+        """批量解析当前帧并清空缓存（包括质量报文），没有数据时返回None"""
+        expected, self._expected = self._expected, None
+        n = self._count
+        frame = None
+        if n:
+            frame = decode_frame(self._payload_buf[:n], self._timestamps[:n], self.kind)
+            frame['quality'] = self._quality[frame['tid']]
+            frame['x'], frame['y'] = self.sensor.to_world(frame['x'], frame['y'])
+            frame['vx'], frame['vy'] = self.sensor.rotate(frame['vx'], frame['vy'])
+            frame['z'] = self.sensor.z
+            frame['sensor'] = self.sensor.index
+            self._count_frame(n, expected)
+            self._count = 0
+            self._tids = bytearray(256)
+        self._quality[:] = 0
+        self._quality_count = 0
+        return frame
+
+    def _count_frame(self, received, expected):
+        stats = self.stats
+        stats.frames += 1
+        stats.received = received
+        stats.expected = expected
+        stats.cycle = self._cycle if expected is not None else None
+        if expected is None:
+            stats.headerless += 1
+        elif received >= expected:
+            stats.complete += 1
+        else:
+            stats.missing += expected - received
@@ -0,0 +1,134 @@
+# frame_ring.py
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from radar_decoder import FRAME_DTYPE, empty_frame, frame_source
+
+# 共享内存布局: 头部 + 帧槽表 + 目标记录环形区
+#   头部 HEADER_DTYPE: 已写入的帧序号、已写入的记录总数(单调递增)、槽数和记录容量
+#   槽表 SLOT_DTYPE[slots]: 第seq帧在 seq % slots 槽，记录在记录区的起始位置(单调值)和点数，
+#   以及帧的传感器序号和目标类型（空帧没有记录，读取时据此重建）
+#   记录区 FRAME_DTYPE[capacity]: 每帧连续存放，放不下时从0开始
+HEADER_DTYPE = np.dtype([
+    ('seq', np.uint64),  # 最新完整写入的帧序号，从1开始，0表示尚无数据
+    ('end', np.uint64),  # 已写入的记录总数（含跳过的尾部），覆盖旧记录前先更新
+    ('slots', np.uint64),
+    ('capacity', np.uint64),
+])
+SLOT_DTYPE = np.dtype([
+    ('seq', np.uint64),  # 写入时先清零，写完后置为帧序号
+    ('pos', np.uint64),  # 起始记录的单调位置，记录区下标为 pos % capacity
+    ('count', np.uint32),
+    ('sensor', np.uint8),
+    ('kind', np.uint8),
+    ('written', np.float64),  # 写入时刻 time.monotonic()
+])
+
+
+def copy_frame(frame):
+    """复制一帧 FRAME_DTYPE 数据
+
+    FRAME_DTYPE 为紧凑（非对齐）结构，ndarray.copy() 逐字段复制，按字节整体复制快得多。
+    """
+    copy = np.empty(len(frame), dtype=frame.dtype)
+    copy.view(np.uint8)[:] = frame.view(np.uint8)
+    return copy
+
+
+class FrameRing:
+    """跨进程传递整帧目标数据(FRAME_DTYPE)的共享内存环形缓冲区
+
+    单个写进程(write)、任意个读进程(read)，不加锁。read 返回记录区上的NumPy视图，
+    不复制也不经过管道序列化；写入方绕回后视图中的数据会被覆盖，读取方需在
+    valid(seq) 仍为True时用完，需要长期保存时用 copy_frame 复制。读取不及时被覆盖的帧计入 dropped。
+    """
+
+    def __init__(self, name=None, slots=256, capacity=65536):
+        create = name is None
+        size = HEADER_DTYPE.itemsize + slots * SLOT_DTYPE.itemsize + capacity * FRAME_DTYPE.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create  # 创建方负责释放（unlink）
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        if create:
+            self.header['slots'] = slots
+            self.header['capacity'] = capacity
+        slots, capacity = int(self.header['slots']), int(self.header['capacity'])
+        offset = HEADER_DTYPE.itemsize
+        self.slots = np.ndarray(slots, dtype=SLOT_DTYPE, buffer=self.shm.buf, offset=offset)
+        offset += slots * SLOT_DTYPE.itemsize
+        self.records = np.ndarray(capacity, dtype=FRAME_DTYPE, buffer=self.shm.buf, offset=offset)
+        self.read_seq = int(self.header['seq'])  # 本读取方已读到的帧序号
+        self.dropped = 0  # 读取方未及时读取而丢失的帧数
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def capacity(self):
+        return len(self.records)
+
+    def write(self, frame):
+        """写入一帧，返回帧序号；单帧超过容量时只保留最后 capacity 个点"""
+        capacity = self.capacity
+        frame = frame[-capacity:]
+        n = len(frame)
+        seq = int(self.header['seq']) + 1
+        pos = int(self.header['end'])
+        if pos % capacity + n > capacity:
+            # 尾部放不下，跳到记录区开头
+            pos += capacity - pos % capacity
+        # 先公布新的写入位置，读取方据此判断视图是否已被覆盖
+        self.header['end'] = pos + n
+        start = pos % capacity
+        # 按字节复制，见 copy_frame
+        self.records[start:start + n].view(np.uint8)[:] = np.ascontiguousarray(frame, dtype=FRAME_DTYPE).view(np.uint8)
+        slot = self.slots[seq % len(self.slots)]
+        slot['seq'] = 0
+        slot['pos'] = pos
+        slot['count'] = n
+        slot['sensor'], slot['kind'] = frame_source(frame) or (0, 0)
+        slot['written'] = time.monotonic()
+        slot['seq'] = seq
+        self.header['seq'] = seq
+        return seq
+
+    def read(self):
+        """读取上次读取之后的新帧，返回 [(帧序号, FRAME_DTYPE视图)]"""
+        latest = int(self.header['seq'])
+        first = max(self.read_seq + 1, latest - len(self.slots) + 1)
+        self.dropped += first - self.read_seq - 1
+        frames = []
+        for seq in range(first, latest + 1):
+            slot = self.slots[seq % len(self.slots)]
+            start = int(slot['pos']) % self.capacity
+            count = int(slot['count'])
+            view = self.records[start:start + count] if count else empty_frame(int(slot['sensor']), int(slot['kind']))
+            if self.valid(seq):
+                frames.append((seq, view))
+            else:
+                self.dropped += 1
+        self.read_seq = latest
+        return frames
+
+    def valid(self, seq):
+        """第seq帧的槽和记录是否仍未被覆盖"""
+        slot = self.slots[seq % len(self.slots)]
+        return (int(slot['seq']) == seq and
+                int(self.header['end']) - int(slot['pos']) <= self.capacity)
+
+    def latency(self, seq, now=None):
+        """第seq帧从写入到现在的时间 (秒)"""
+        now = time.monotonic() if now is None else now
+        return now - float(self.slots[seq % len(self.slots)]['written'])
+
+    def close(self):
+        # 释放numpy视图后才能关闭共享内存
+        self.header = self.slots = self.records = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # 仍有读取方持有视图，映射在进程退出时释放
+            pass
+        if self.owner:
+            self.shm.unlink()
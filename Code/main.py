@@ -1,21 +1,25 @@
 # main.py
 import sys
-from PyQt5 import QtWidgets
-from PyQt5.QtCore import QTimer
-from radar_gui import RadarGUI
 
-if __name__ == "__main__":
+
+def run_gui():
     # 确保中文显示正常
     import matplotlib
     matplotlib.use('Agg')  # 在Linux下使用Agg后端
-    
+    from PyQt5 import QtWidgets
+    from radar_gui import RadarGUI
+
     app = QtWidgets.QApplication(sys.argv)
     window = RadarGUI()
     window.show()
-    
-    # 创建定时器，定时刷新图表
-    timer = QTimer()
-    timer.timeout.connect(window.refresh_plots)
-    timer.start(50)  # 50ms刷新周期
-    
-    sys.exit(app.exec_())
\ No newline at end of file
+    # 图表由 RadarGUI.render_scheduler 在收到新帧时刷新
+
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    if '--headless' in sys.argv[1:]:
+        # 无界面运行，不导入Qt，参数见 radar_daemon.py
+        import radar_daemon
+        sys.exit(radar_daemon.main([arg for arg in sys.argv[1:] if arg != '--headless']))
+    sys.exit(run_gui())
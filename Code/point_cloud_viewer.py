@@ -1,9 +1,29 @@
 # point_cloud_viewer.py
+import time
+import pyqtgraph as pg
 import pyqtgraph.opengl as gl
 import numpy as np
+from PyQt5.QtCore import QTimer
+
+# 按数值着色的模式: (颜色表, 下限, 上限)
+COLOR_MAPS = {
+    'range': ('turbo', 0.0, 70.0),  # 距离 (m)
+    'velocity': ('CET-D1', -20.0, 20.0),  # 径向速度 (m/s)，负值为接近
+    'rcs': ('viridis', -20.0, 30.0),  # dBsm
+}
+COLOR_MODES = ['sensor', *COLOR_MAPS]  # sensor: 按雷达颜色
+
 
 class PointCloudViewer(gl.GLViewWidget):
-    def __init__(self):
+    """3D点云视图
+
+    坐标和颜色写入预分配的float32缓冲区，无效的点透明（叠加混合下不可见）。
+    每次传给GLScatterPlotItem的都是同一对缓冲区，大小不变时只覆盖写入显存而
+    不重新分配。只显示最新一帧时前 count 个点有效，单帧点数超过容量时容量翻倍；
+    累积模式下缓冲区为固定容量的环形缓冲区，见 set_accumulation。
+    """
+
+    def __init__(self, capacity=1024, alpha=0.8):
         super().__init__()
         self.setWindowTitle('3D点云视图')
         self.setCameraPosition(distance=50)
@@ -17,13 +37,190 @@ class PointCloudViewer(gl.GLViewWidget):
         self.addItem(self.scatter)
         self.filter_enabled = False
         self.filter_distance = 70  # 默认70米
+        self.alpha = alpha
+        self.color_mode = 'sensor'
+        self.count = 0  # 缓冲区中已写入的点数
+        self._single_capacity = capacity
+        # 按时间累积时的淡出定时器，只在有未过期的点时运行
+        self._fade_timer = QTimer(self)
+        self._fade_timer.setInterval(50)
+        self._fade_timer.timeout.connect(self._on_fade_timer)
+        self._luts = {}
+        for mode, (name, lo, hi) in COLOR_MAPS.items():
+            lut = pg.colormap.get(name).getLookupTable(nPts=256, alpha=True, mode='float').astype(np.float32)
+            lut[:, 3] = alpha
+            self._luts[mode] = (lut, lo, 255 / (hi - lo))
+        self.set_sensors([])
+        self.set_accumulation(None)
+
+    @property
+    def capacity(self):
+        return len(self.pos)
+
+    def set_sensors(self, sensors, colors=None):
+        """设置各雷达的颜色和安装位置（计算径向速度用），按SensorConfig.index排列"""
+        count = max((s.index for s in sensors), default=-1) + 1
+        self.sensor_xy = np.zeros((max(count, 1), 2), dtype=np.float32)
+        for s in sensors:
+            self.sensor_xy[s.index] = s.x, s.y
+        if colors is None:
+            colors = np.tile(np.array([1.0, 0.0, 0.0, self.alpha]), (len(self.sensor_xy), 1))
+        self.sensor_colors = np.asarray(colors, dtype=np.float32)
+
+    def set_color_mode(self, mode):
+        if mode not in COLOR_MODES:
+            raise ValueError(f"不支持的着色方式: {mode}")
+        self.color_mode = mode
+
+    @property
+    def accumulating(self):
+        return self.accumulate_mode is not None
+
+    def set_accumulation(self, mode=None, limit=0, capacity=16384):
+        """设置多帧累积显示
+
+        mode: None 只显示最新一帧；'frames' 保留最近 limit 帧；'seconds' 保留最近 limit 秒。
+        累积的点写入容量为 capacity 的环形缓冲区，超出时覆盖最旧的点；点的透明度
+        随帧龄线性衰减到0。内存和每帧耗时只与 capacity 有关，与运行时长无关。
+        """
+        if mode not in (None, 'frames', 'seconds'):
+            raise ValueError(f"不支持的累积方式: {mode}")
+        self.accumulate_mode = mode
+        self.accumulate_limit = limit
+        self.count = 0
+        self._fade_timer.stop()
+        if mode is None:
+            self.pos = np.zeros((0, 3), dtype=np.float32)
+            self.color = np.zeros((0, 4), dtype=np.float32)
+            self._reserve(self._single_capacity)
+            self._stamp = self._age = None
+        else:
+            self.pos = np.zeros((capacity, 3), dtype=np.float32)
+            self.color = np.zeros((capacity, 4), dtype=np.float32)
+            self._stamp = np.full(capacity, -np.inf)  # 每个点所属帧的序号或时刻
+            self._age = np.empty(capacity)
+            self._head = 0  # 下一个写入位置
+            self._frame_no = 0
+            self._newest = -np.inf  # 最新一帧的序号或时刻
+        self.scatter.setData(pos=self.pos, color=self.color)
+
+    def update_frame(self, frame):
+        """更新点云数据 frame: FRAME_DTYPE结构化数组（世界坐标系）"""
+        if self.accumulating:
+            self.add_frames([frame])
+            return
+        keep = self._filter(frame)
+        n = len(frame) if keep is None else len(keep)
+        if n > self.capacity:
+            self._reserve(max(n, 2 * self.capacity))
+            self._single_capacity = self.capacity
+        self._fill(frame, keep, self.pos[:n], self.color[:n])
+        if n < self.count:
+            # 上一帧多出的点设为透明
+            self.color[n:self.count, 3] = 0
+        self.count = n
+        self.scatter.setData(pos=self.pos, color=self.color)
+
+    def add_frames(self, frames, now=None):
+        """累积模式下追加若干帧，写入环形缓冲区后统一更新透明度并上传一次"""
+        now = time.monotonic() if now is None else now
+        capacity = len(self.pos)
+        for frame in frames:
+            self._frame_no += 1
+            stamp = self._frame_no if self.accumulate_mode == 'frames' else now
+            self._newest = stamp
+            keep = self._filter(frame)
+            n = len(frame) if keep is None else len(keep)
+            if n > capacity:
+                # 单帧超过容量时只保留最后 capacity 个点
+                keep = np.arange(len(frame))[-capacity:] if keep is None else keep[-capacity:]
+                n = capacity
+            # 环形写入，跨越末尾时分两段
+            first = min(n, capacity - self._head)
+            for lo, hi, start in ((0, first, self._head), (first, n, 0)):
+                if hi > lo:
+                    part = (frame[lo:hi], None) if keep is None else (frame, keep[lo:hi])
+                    dst = slice(start, start + hi - lo)
+                    self._fill(*part, self.pos[dst], self.color[dst])
+                    self._stamp[dst] = stamp
+            self._head = (self._head + n) % capacity
+            self.count = min(self.count + n, capacity)
+        self._fade(now)
+        if self.accumulate_mode == 'seconds' and not self._fade_timer.isActive():
+            self._fade_timer.start()
+
+    def clear(self):
+        self.color[:, 3] = 0
+        self.count = 0
+        if self._stamp is not None:
+            self._stamp[:] = -np.inf
+        self.scatter.setData(pos=self.pos, color=self.color)
+
+    def _fade(self, now=None):
+        """按帧龄更新全部点的透明度: alpha * (1 - 帧龄 / limit)，过期的点为0"""
+        if self.accumulate_mode == 'frames':
+            now = self._frame_no
+        elif now is None:
+            now = time.monotonic()
+        age = np.subtract(now, self._stamp, out=self._age)
+        np.multiply(age, -self.alpha / max(self.accumulate_limit, 1e-9), out=age)
+        np.add(age, self.alpha, out=age)
+        np.clip(age, 0, self.alpha, out=self.color[:, 3], casting='unsafe')
+        self.scatter.setData(pos=self.pos, color=self.color)
+
+    def _on_fade_timer(self):
+        """按时间累积时，没有新帧也要继续淡出，全部淡出后停止定时器"""
+        now = time.monotonic()
+        self._fade(now)
+        if now - self._newest >= self.accumulate_limit:
+            self._fade_timer.stop()
+
+    def _filter(self, frame):
+        """距离滤波，返回保留的点序号，未启用时返回None"""
+        if not self.filter_enabled or not len(frame):
+            return None
+        # 比较距离的平方避免开方
+        xs, ys, zs = frame['x'], frame['y'], frame['z']
+        return np.flatnonzero(xs * xs + ys * ys + zs * zs <= np.float32(self.filter_distance) ** 2)
+
+    def _fill(self, frame, keep, pos, color):
+        """将 frame[keep] 的坐标和颜色写入 pos/color"""
+        for i, name in enumerate(('x', 'y', 'z')):
+            self._gather(frame[name], keep, pos[:, i])
+        if self.color_mode == 'sensor':
+            self._gather(self.sensor_colors, keep, color, frame['sensor'])
+        else:
+            self._map_colors(frame, keep, color)
+
+    def _reserve(self, capacity):
+        """扩大缓冲区，已有数据保留"""
+        pos = np.zeros((capacity, 3), dtype=np.float32)
+        color = np.zeros((capacity, 4), dtype=np.float32)
+        pos[:self.count] = self.pos[:self.count]
+        color[:self.count] = self.color[:self.count]
+        self.pos, self.color = pos, color
+
+    @staticmethod
+    def _gather(values, keep, out, index=None):
+        """将 values[keep]（给定index时为 values[index[keep]]，按行查表）直接写入out"""
+        if index is not None:
+            index = index if keep is None else index[keep]
+            np.take(values, index, axis=0, out=out, mode='clip')
+        elif keep is None:
+            out[...] = values
+        else:
+            np.take(values, keep, out=out)
 
-    def update_points(self, points):
-        """更新点云数据 points: [[x,y,z], ...]"""
-        if self.filter_enabled and len(points) > 0:
-            # 应用距离滤波
-            distances = np.linalg.norm(points, axis=1)
-            filtered = points[distances <= self.filter_distance]
-            self.scatter.setData(pos=filtered)
+    def _map_colors(self, frame, keep, out):
+        rows = frame if keep is None else frame[keep]
+        if self.color_mode == 'velocity':
+            # 速度沿雷达到目标方向，与相对雷达的位置做点积得到带符号的径向速度
+            origin = self.sensor_xy[np.minimum(rows['sensor'], len(self.sensor_xy) - 1)]
+            dx, dy = rows['x'] - origin[:, 0], rows['y'] - origin[:, 1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.nan_to_num((rows['vx'] * dx + rows['vy'] * dy) / rows['range'])
         else:
-            self.scatter.setData(pos=points)
\ No newline at end of file
+            values = rows[self.color_mode]
+        lut, lo, scale = self._luts[self.color_mode]
+        index = np.clip((values - lo) * scale, 0, 255).astype(np.intp)
+        np.take(lut, index, axis=0, out=out)
@@ -1,105 +1,293 @@
 # radar_config.py
-import can
-from datetime import datetime
+import time
+from contextlib import contextmanager
+from sensors import sensor_message_id
+
+# 配置报文ID（传感器ID为0时），总线上的报文ID按目标雷达的传感器ID偏移
+SENSOR_ID_CFG = 0x200
+DISTANCE_CFG = 0x201
+RESOLUTION_CFG = 0x202
+MEASUREMENT_CFG = 0x203
+OUTPUT_CFG = 0x204
+RATE_CFG = 0x205
+CLUSTER_CFG = 0x206
+TARGET_CFG = 0x207
+
+DISTANCE_CODES = {15: 0, 25: 1, 50: 2, 70: 3}  # 探测距离(m) -> 配置值
+RATE_CODES = {10: 0, 20: 1, 25: 2, 33: 3, 50: 4}  # 更新频率(Hz) -> 配置值
+
+# 界面组合框选项对应的参数值，保存的配置文件中记录的是选项序号
+DISTANCES = list(DISTANCE_CODES)  # 米
+RESOLUTIONS = [0.4, 0.2]  # 度
+RATES = list(RATE_CODES)  # Hz
+
+# 可通过雷达状态报文回读的配置: {配置报文ID: 状态字段}
+READBACK_FIELDS = {OUTPUT_CFG: 'output_type'}
+
+CONFIG_NAMES = {
+    SENSOR_ID_CFG: "传感器ID",
+    DISTANCE_CFG: "探测距离",
+    RESOLUTION_CFG: "角度分辨率",
+    MEASUREMENT_CFG: "测量模式",
+    OUTPUT_CFG: "输出模式",
+    RATE_CFG: "更新频率",
+    CLUSTER_CFG: "聚类配置",
+    TARGET_CFG: "目标配置",
+}
+
+
+class ConfigTransaction:
+    """一次配置下发: 一批寄存器报文、发送结果和状态报文回读确认
+
+    由接收线程按顺序发送（sent_time/errors 在发送线程中写入，发送完成后通过信号
+    交给界面线程），之后由 RadarConfig.on_status 对照回读值确认。
+    """
+
+    def __init__(self, registers, expected, timeout, target_id=0):
+        self.registers = registers  # {报文ID: bytes}，按发送顺序
+        self.target_id = target_id  # 目标雷达当前的传感器ID
+        self.expected = expected  # {状态字段: 期望值}
+        self.timeout = timeout  # 发送完成后等待回读的时间 (秒)
+        self.created = time.monotonic()
+        self.sent_time = None  # 全部发送完成的时刻
+        self.errors = {}  # {报文ID: 错误信息}，报文ID均为未偏移的配置报文ID
+        self.latencies = {}  # {报文ID: 入队到发送完成的时间 (秒)}
+        self.confirmed = set()  # 已回读确认的状态字段
+        self.failed = set()  # 回读超时的状态字段
+        self.done = False
+
+    def __len__(self):
+        return len(self.registers)
+
+    def messages(self):
+        """待发送的 (报文ID, 数据)"""
+        return list(self.registers.items())
+
+    def message_id(self, can_id):
+        """配置报文在总线上的ID"""
+        return sensor_message_id(can_id, self.target_id)
+
+    @property
+    def ok(self):
+        return self.done and not self.errors and not self.failed
+
+    @property
+    def elapsed(self):
+        """从提交到发送完成的时间 (秒)"""
+        return None if self.sent_time is None else self.sent_time - self.created
+
+    def describe(self):
+        names = '、'.join(CONFIG_NAMES.get(can_id, f"0x{can_id:03X}") for can_id in self.registers)
+        text = f"下发 {names}"
+        if self.elapsed is not None:
+            text += f" ({self.elapsed * 1000:.1f} ms)"
+        if self.errors:
+            text += "；发送失败: " + '、'.join(
+                f"{CONFIG_NAMES.get(i, hex(i))}({e})" for i, e in self.errors.items())
+        fields = {field: CONFIG_NAMES[can_id] for can_id, field in READBACK_FIELDS.items()}
+        if self.confirmed:
+            text += "；回读确认: " + '、'.join(fields.get(f, f) for f in sorted(self.confirmed))
+        if self.failed:
+            text += "；回读超时: " + '、'.join(fields.get(f, f) for f in sorted(self.failed))
+        return text
+
 
 class RadarConfig:
-    """SR111雷达配置参数管理类"""
-    
-    def __init__(self, can_bus):
-        self.can_bus = can_bus
-        self.sensor_id = 0
+    """SR111雷达配置参数管理类
+
+    set_* 只修改期望配置，提交时与上次下发的寄存器比较，只发送有变化的报文。
+    在 transaction() 中的多次修改合并为一次提交。报文通过 sender（接收线程的
+    send_config）在持有总线的线程中发送；未连接时只记录期望配置，连接后
+    由 reset_applied() + commit() 全部下发。
+    配置报文发给传感器ID为 target_id 的雷达（多雷达共用总线时报文ID按其偏移）。
+    修改传感器ID会改变雷达的报文ID，不属于全部下发的寄存器，只由 set_sensor_id 单独下发。
+    """
+
+    def __init__(self, sender=None, readback_timeout=1.0):
+        self.sender = sender  # sender(ConfigTransaction)，None表示未连接
+        self.readback_timeout = readback_timeout
+        self.target_id = 0  # 目标雷达当前的传感器ID
+        self.sensor_id = 0  # 最近一次要求目标雷达改用的传感器ID
         self.distance_range = 70  # 默认70米
         self.angle_resolution = 0.4  # 默认0.4度
         self.measurement_mode = 0  # 默认标准模式
         self.output_mode = 1  # 默认仅输出目标
         self.update_rate = 20  # 默认20Hz
         self.rcs_threshold = 0  # 默认不过滤
-        
+        self.applied = {}  # {报文ID: bytes} 已下发（或正在下发）的寄存器
+        self.pending = []  # 等待发送完成或回读确认的ConfigTransaction
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """在with块中修改多项配置，结束时一次提交"""
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+        self.commit()
+
     def set_sensor_id(self, id):
-        """设置雷达传感器ID"""
+        """把目标雷达的传感器ID改为id，与目标雷达当前ID相同或未连接时不下发"""
         self.sensor_id = id
-        self._send_config_message(0x200, [id & 0xFF, 0, 0, 0, 0, 0, 0, 0])
-        
+        if self.sender is None or id == self.target_id:
+            return None
+        return self._send({SENSOR_ID_CFG: bytes([id, 0, 0, 0, 0, 0, 0, 0])})
+
     def set_distance_range(self, range_meters):
         """设置雷达探测距离范围"""
         self.distance_range = range_meters
-        # 计算对应的距离配置值
-        range_values = {15: 0, 25: 1, 50: 2, 70: 3}
-        range_code = range_values.get(range_meters, 1)
-        self._send_config_message(0x201, [range_code, 0, 0, 0, 0, 0, 0, 0])
-        
+        return self.commit()
+
     def set_angle_resolution(self, resolution_degrees):
         """设置角度分辨率"""
         self.angle_resolution = resolution_degrees
-        # 0.4° = 0, 0.2° = 1
-        res_code = 0 if resolution_degrees >= 0.4 else 1
-        self._send_config_message(0x202, [res_code, 0, 0, 0, 0, 0, 0, 0])
-        
+        return self.commit()
+
     def set_measurement_mode(self, mode):
         """设置测量模式: 0=标准, 1=高精度, 2=远距离"""
         self.measurement_mode = mode
-        self._send_config_message(0x203, [mode, 0, 0, 0, 0, 0, 0, 0])
-        
+        return self.commit()
+
     def set_output_mode(self, mode):
-        """设置输出模式: 0=仅聚类, 1=仅目标, 2=聚类和目标, 3=仅聚类质量, 
+        """设置输出模式: 0=仅聚类, 1=仅目标, 2=聚类和目标, 3=仅聚类质量,
                         4=仅目标质量, 5=聚类和目标质量, 6=扩展目标, 7=点云"""
         self.output_mode = mode
-        self._send_config_message(0x204, [mode, 0, 0, 0, 0, 0, 0, 0])
-        
+        return self.commit()
+
     def set_update_rate(self, rate_hz):
         """设置数据更新频率(Hz)"""
         self.update_rate = rate_hz
-        # 计算对应的更新率配置值
-        rate_values = {10: 0, 20: 1, 25: 2, 33: 3, 50: 4}
-        rate_code = rate_values.get(rate_hz, 1)
-        self._send_config_message(0x205, [rate_code, 0, 0, 0, 0, 0, 0, 0])
-        
+        return self.commit()
+
     def set_cluster_config(self):
-        """设置聚类配置参数"""
-        # 启用聚类，设置默认聚类参数
-        data = [
-            1,  # 聚类使能
-            0,  # 聚类算法选择
-            0,  # 聚类质量阈值
-            0,  # 聚类距离阈值
-            0,  # 聚类角度阈值
-            0,  # 聚类最小点数
-            0,  # 聚类最大点数
-            0   # 保留
-        ]
-        self._send_config_message(0x206, data)
-        
+        """设置聚类配置参数（使用默认值，随每次全部下发发送）"""
+        return self.commit()
+
     def set_target_config(self, rcs_threshold=0):
         """设置目标配置参数"""
         self.rcs_threshold = rcs_threshold
-        # RCS阈值: 0-15 (0=无过滤，15=最高过滤)
-        data = [
-            1,          # 目标使能
-            0,          # 目标分类模式
-            rcs_threshold,  # RCS阈值
-            0,          # 最小相对速度
-            0,          # 最大相对速度
-            0,          # 最小距离
-            0,          # 最大距离
-            0           # 保留
-        ]
-        self._send_config_message(0x207, data)
-        
-    def _send_config_message(self, can_id, data):
-        """发送配置消息到雷达"""
-        if not self.can_bus:
-            return
-            
-        try:
-            msg = can.Message(
-                arbitration_id=can_id,
-                data=data,
-                is_extended_id=False
-            )
-            self.can_bus.send(msg)
-            timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            print(f"[{timestamp}] 发送配置: ID=0x{can_id:03X}, Data={data}")
-        except can.CanError as e:
-            print(f"发送配置失败 (CAN错误): {e}")
-        except Exception as e:
-            print(f"发送配置失败: {e}")
\ No newline at end of file
+        return self.commit()
+
+    def registers(self):
+        """期望配置对应的全部寄存器报文 {报文ID: bytes}，不含传感器ID"""
+        return {
+            DISTANCE_CFG: bytes([DISTANCE_CODES.get(self.distance_range, 1), 0, 0, 0, 0, 0, 0, 0]),
+            # 0.4° = 0, 0.2° = 1
+            RESOLUTION_CFG: bytes([0 if self.angle_resolution >= 0.4 else 1, 0, 0, 0, 0, 0, 0, 0]),
+            MEASUREMENT_CFG: bytes([self.measurement_mode, 0, 0, 0, 0, 0, 0, 0]),
+            OUTPUT_CFG: bytes([self.output_mode, 0, 0, 0, 0, 0, 0, 0]),
+            RATE_CFG: bytes([RATE_CODES.get(self.update_rate, 1), 0, 0, 0, 0, 0, 0, 0]),
+            CLUSTER_CFG: bytes([
+                1,  # 聚类使能
+                0,  # 聚类算法选择
+                0,  # 聚类质量阈值
+                0,  # 聚类距离阈值
+                0,  # 聚类角度阈值
+                0,  # 聚类最小点数
+                0,  # 聚类最大点数
+                0   # 保留
+            ]),
+            # RCS阈值: 0-15 (0=无过滤，15=最高过滤)
+            TARGET_CFG: bytes([
+                1,  # 目标使能
+                0,  # 目标分类模式
+                self.rcs_threshold,  # RCS阈值
+                0,  # 最小相对速度
+                0,  # 最大相对速度
+                0,  # 最小距离
+                0,  # 最大距离
+                0   # 保留
+            ]),
+        }
+
+    def apply_settings(self, settings):
+        """按界面保存的配置文件(dict，组合框为选项序号)设置全部参数，合并为一次提交"""
+        with self.transaction():
+            self.set_distance_range(DISTANCES[settings.get('distance', DISTANCES.index(self.distance_range))])
+            self.set_angle_resolution(RESOLUTIONS[settings.get('resolution', RESOLUTIONS.index(self.angle_resolution))])
+            self.set_measurement_mode(settings.get('mode', self.measurement_mode))
+            self.set_output_mode(settings.get('output', self.output_mode))
+            self.set_update_rate(RATES[settings.get('rate', RATES.index(self.update_rate))])
+            self.set_cluster_config()
+            self.set_target_config(rcs_threshold=settings.get('rcs', self.rcs_threshold))
+
+    def readback_values(self):
+        """可回读配置的期望状态值 {报文ID: (状态字段, 期望值)}"""
+        return {OUTPUT_CFG: (READBACK_FIELDS[OUTPUT_CFG], self.output_mode)}
+
+    def changed(self):
+        """与上次下发不同的寄存器"""
+        return {can_id: data for can_id, data in self.registers().items() if self.applied.get(can_id) != data}
+
+    def reset_applied(self):
+        """雷达状态未知（如重新连接）时调用，下次提交发送全部寄存器"""
+        self.applied.clear()
+        self.pending.clear()
+
+    def commit(self):
+        """提交有变化的寄存器，返回ConfigTransaction；在事务中、未连接或没有变化时返回None"""
+        if self._depth or self.sender is None:
+            return None
+        registers = self.changed()
+        if not registers:
+            return None
+        return self._send(registers)
+
+    def _send(self, registers):
+        expected = {field: value for can_id, (field, value) in self.readback_values().items()
+                    if can_id in registers}
+        transaction = ConfigTransaction(registers, expected, self.readback_timeout, self.target_id)
+        # 先按已下发记录，发送失败或回读超时后撤销，使下次提交重发
+        self.applied.update(registers)
+        self.pending.append(transaction)
+        self.sender(transaction)
+        return transaction
+
+    def on_sent(self, transaction):
+        """发送线程完成一次下发后调用，没有需要回读的配置时该次下发结束"""
+        for can_id in transaction.errors:
+            self._revoke(transaction, can_id)
+            # 发送失败的配置不再等待回读
+            transaction.expected.pop(READBACK_FIELDS.get(can_id), None)
+        if not transaction.expected:
+            self._finish(transaction)
+
+    def on_status(self, status):
+        """收到雷达状态报文时调用，返回因此确认完成的下发"""
+        finished = []
+        for transaction in list(self.pending):
+            if transaction.sent_time is None:
+                continue
+            for field, value in transaction.expected.items():
+                if status.get(field) == value:
+                    transaction.confirmed.add(field)
+            if transaction.confirmed >= set(transaction.expected):
+                self._finish(transaction)
+                finished.append(transaction)
+        return finished
+
+    def check_timeouts(self, now=None):
+        """回读超时的下发记为失败并撤销对应寄存器，返回超时的下发"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        for transaction in list(self.pending):
+            if transaction.sent_time is None or now - transaction.sent_time < transaction.timeout:
+                continue
+            transaction.failed = set(transaction.expected) - transaction.confirmed
+            for can_id, field in READBACK_FIELDS.items():
+                if field in transaction.failed:
+                    self._revoke(transaction, can_id)
+            self._finish(transaction)
+            expired.append(transaction)
+        return expired
+
+    def _revoke(self, transaction, can_id):
+        if self.applied.get(can_id) == transaction.registers.get(can_id):
+            del self.applied[can_id]
+
+    def _finish(self, transaction):
+        transaction.done = True
+        if transaction in self.pending:
+            self.pending.remove(transaction)
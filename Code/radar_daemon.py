@@ -0,0 +1,235 @@
+# radar_daemon.py
+"""无界面运行: 接收、解析、报警判断和录制，不导入PyQt5/pyqtgraph/OpenGL/matplotlib
+
+用法:
+    python radar_daemon.py --channel can0 --config radar.json --record capture.srcap
+    python radar_daemon.py --channel capture.srcap --replay-speed 0  # 回放录制文件，回放结束后退出
+    python main.py --headless ...  # 同上
+
+--config 使用界面"保存配置"生成的文件，其中的雷达参数、多雷达配置(sensors)和
+报警区域(alarm_zones/alarm_dwell/alarm_hold)都会生效。报警事件追加写入 --alarm-log
+（默认 ~/.sr111/alarm_events.csv）并输出到标准输出，每 --stats-interval 秒输出一次统计。
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from alarm_engine import DEFAULT_LOG_PATH, AlarmMonitor
+from alarm_zones import ZoneSet
+from radar_config import RadarConfig
+from radar_receiver import RadarReceiver
+from recorder import CaptureRecorder
+from sensors import SensorConfig, group_by_channel, load_sensors
+
+
+def memory_usage_mb():
+    """当前进程的常驻内存 (MB)，不支持的平台返回None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # 没有/proc时使用峰值内存: macOS下单位为字节，其他系统为KB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+class RadarDaemon:
+    """无界面的雷达接收服务，每个CAN通道一个 RadarReceiver 线程
+
+    settings: 界面保存的配置(dict)，为空时使用 channel 上的单个雷达和默认参数。
+    configure 为True时启动后按 settings 下发雷达配置（第一个通道的第一个雷达，不修改传感器ID），
+    结果输出到日志。
+    """
+
+    def __init__(self, channel='can0', settings=None, interface=None, record_path=None,
+                 alarm_log=DEFAULT_LOG_PATH, replay_speed=1.0, configure=True, output=print):
+        self.settings = settings or {}
+        self.output = output  # 日志输出函数
+        sensors = load_sensors(self.settings.get('sensors', []))
+        groups = group_by_channel(sensors) if sensors else {channel: [SensorConfig(channel=channel)]}
+        self.recorder = CaptureRecorder(record_path) if record_path else None
+        self.alarm_monitor = AlarmMonitor(
+            log_path=alarm_log,
+            dwell=self.settings.get('alarm_dwell', 0.0),
+            hold=self.settings.get('alarm_hold', 0.0),
+            on_event=self.on_alarm_events
+        )
+        self.alarm_monitor.set_zones(ZoneSet(self.settings.get('alarm_zones', [])))
+        self.frames = 0
+        self.targets = 0
+        self.alarm_events = 0
+        self.active_zones = set()
+        self.frame_stats = {}  # 各目标列表的组帧统计 {列表名: dict}
+        self.receivers = []
+        for channel, group in groups.items():
+            receiver = RadarReceiver(
+                channel,
+                batch_frames=True,
+                replay_speed=replay_speed,
+                interface=interface,
+                output_mode=self.settings.get('output', 1),
+                raw_streaming=False,
+                sensors=group
+            )
+            receiver.on_frame = self.on_frame
+            receiver.on_status = self.on_status
+            receiver.on_no_data = lambda channel=channel: self.output(f"[{channel}] 5秒内没有收到数据")
+            receiver.on_radar_status = self.on_radar_status
+            receiver.on_config_sent = self.on_config_sent
+            receiver.on_frame_stats = self.frame_stats.update
+            receiver.recorder = self.recorder
+            receiver.alarm_monitor = self.alarm_monitor
+            self.receivers.append(receiver)
+        self.radar_config = RadarConfig()
+        self.configure = configure
+        self._config_lock = threading.Lock()  # 配置结果在接收线程中回调
+        self._threads = []
+
+    def start(self):
+        if self.recorder:
+            self.recorder.start()
+        self.alarm_monitor.start()
+        for receiver in self.receivers:
+            thread = threading.Thread(target=receiver.run, name=f"RadarReceiver-{receiver.channel}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.configure:
+            with self._config_lock:
+                # 与界面一致，配置第一个通道的第一个雷达
+                self.radar_config.target_id = self.receivers[0].sensors[0].sensor_id
+                self.radar_config.sender = self.receivers[0].send_config
+                self.radar_config.apply_settings(self.settings)
+
+    def stop(self):
+        for receiver in self.receivers:
+            receiver.running = False
+        for thread in self._threads:
+            thread.join(2.0)
+        self.alarm_monitor.stop()
+        if self.recorder:
+            self.recorder.stop()
+            self.output(f"[录制] 写入 {self.recorder.written_chunks} 块，丢弃 {self.recorder.dropped_chunks} 块")
+
+    @property
+    def finished(self):
+        """全部接收线程已退出，或回放文件已全部读完"""
+        return all(not thread.is_alive() or getattr(receiver.can_bus, 'finished', False)
+                   for thread, receiver in zip(self._threads, self.receivers))
+
+    def on_frame(self, frame):
+        self.frames += 1
+        self.targets += len(frame)
+
+    def on_status(self, status):
+        if status in ('connected', 'error'):
+            self.output(f"[状态] {status}")
+
+    def on_alarm_events(self, events):
+        """报警线程回调"""
+        for event in events:
+            self.alarm_events += 1
+            if event.kind == 'enter':
+                self.active_zones.add(event.zone)
+                self.output(f"[报警] 区域{event.zone + 1} 目标进入 {event.targets}")
+            else:
+                self.active_zones.discard(event.zone)
+                self.output(f"[报警] 区域{event.zone + 1} 报警解除")
+
+    def on_config_sent(self, transaction):
+        with self._config_lock:
+            self.radar_config.on_sent(transaction)
+        if transaction.done:
+            self.output(f"[配置] {transaction.describe()}")
+
+    def on_radar_status(self, status):
+        # 与界面一致，只用第一个通道第一个雷达的状态确认配置
+        if status.get('sensor') != self.receivers[0].sensors[0].index:
+            return
+        with self._config_lock:
+            finished = self.radar_config.on_status(status)
+        for transaction in finished:
+            self.output(f"[配置] {transaction.describe()}")
+
+    def check_config_timeouts(self):
+        with self._config_lock:
+            expired = self.radar_config.check_timeouts()
+        for transaction in expired:
+            self.output(f"[配置] {transaction.describe()}")
+
+    def stats(self):
+        stats = {
+            'frames': self.frames,
+            'targets': self.targets,
+            'alarm_events': self.alarm_events,
+            'active_zones': sorted(zone + 1 for zone in self.active_zones),
+            'alarm_dropped_frames': self.alarm_monitor.dropped_frames,
+            'memory_mb': memory_usage_mb(),
+        }
+        missing = sum(s['missing'] for s in list(self.frame_stats.values()))
+        if missing:
+            stats['missing'] = missing
+        return stats
+
+
+def main(argv=None):
+    start = time.perf_counter()  # 启动耗时从解析参数开始计算，模块导入耗时见 benchmark.py
+    parser = argparse.ArgumentParser(description="SR111雷达无界面接收")
+    parser.add_argument('--channel', default='can0', help="CAN通道或录制文件（多雷达时使用配置中的通道）")
+    parser.add_argument('--interface', help="python-can接口类型，默认按系统和通道自动选择")
+    parser.add_argument('--config', help="界面保存的配置文件(json)")
+    parser.add_argument('--record', help="连续录制到该文件(.srcap)")
+    parser.add_argument('--alarm-log', default=DEFAULT_LOG_PATH, help="报警事件日志，默认 %(default)s")
+    parser.add_argument('--replay-speed', type=float, default=1.0, help="回放倍速，0为尽快回放")
+    parser.add_argument('--no-configure', action='store_true', help="启动时不下发雷达配置")
+    parser.add_argument('--duration', type=float, default=0, help="运行时间(秒)，0为直到收到退出信号")
+    parser.add_argument('--stats-interval', type=float, default=10.0, help="统计输出间隔(秒)")
+    args = parser.parse_args(argv)
+
+    settings = {}
+    if args.config:
+        with open(args.config, 'r') as f:
+            settings = json.load(f)
+
+    def output(text):
+        print(text, flush=True)
+
+    daemon = RadarDaemon(args.channel, settings, interface=args.interface, record_path=args.record,
+                         alarm_log=args.alarm_log, replay_speed=args.replay_speed,
+                         configure=not args.no_configure, output=output)
+    stop = threading.Event()
+    for name in ('SIGINT', 'SIGTERM'):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), lambda signum, frame: stop.set())
+
+    daemon.start()
+    memory = memory_usage_mb()
+    output(f"[启动] {len(daemon.receivers)}个通道，耗时 {(time.perf_counter() - start) * 1000:.0f} ms"
+           + ("" if memory is None else f"，内存 {memory:.1f} MB"))
+
+    started = time.monotonic()
+    next_stats = started + args.stats_interval
+    try:
+        while not stop.wait(0.1):
+            now = time.monotonic()
+            daemon.check_config_timeouts()
+            if now >= next_stats:
+                next_stats = now + args.stats_interval
+                output(f"[统计] {json.dumps(daemon.stats(), ensure_ascii=False)}")
+            if (args.duration and now - started >= args.duration) or daemon.finished:
+                break
+    finally:
+        daemon.stop()
+        output(f"[统计] {json.dumps(daemon.stats(), ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+# radar_decoder.py
+import math
+import numpy as np
+from sensors import sensor_message_id
+
+# 目标报文ID: 0x60A为目标列表头（不使用列表头时也按目标解析），0x60B为目标信息
+OBJECT_STATUS_ID = 0x60A
+OBJECT_GENERAL_ID = 0x60B
+TARGET_IDS = (OBJECT_STATUS_ID, OBJECT_GENERAL_ID)
+
+# 雷达输出的其它报文ID
+RADAR_STATUS_ID = 0x201  # 雷达状态
+CLUSTER_STATUS_ID = 0x600  # 聚类列表头
+CLUSTER_GENERAL_ID = 0x701  # 聚类信息
+CLUSTER_QUALITY_ID = 0x702  # 聚类质量
+OBJECT_QUALITY_ID = 0x60C  # 目标质量
+OBJECT_EXTENDED_ID = 0x60D  # 扩展目标，尚未解析，不加入接收过滤
+
+_CLUSTER_IDS = (CLUSTER_STATUS_ID, CLUSTER_GENERAL_ID)
+_CLUSTER_QUALITY_IDS = _CLUSTER_IDS + (CLUSTER_QUALITY_ID,)
+_OBJECT_QUALITY_IDS = TARGET_IDS + (OBJECT_QUALITY_ID,)
+
+# 各输出模式(RadarConfig.set_output_mode)下雷达发送的报文ID
+OUTPUT_MODE_IDS = {
+    0: _CLUSTER_IDS,  # 仅聚类
+    1: TARGET_IDS,  # 仅目标
+    2: _CLUSTER_IDS + TARGET_IDS,  # 聚类和目标
+    3: _CLUSTER_QUALITY_IDS,  # 仅聚类质量
+    4: _OBJECT_QUALITY_IDS,  # 仅目标质量
+    5: _CLUSTER_QUALITY_IDS + _OBJECT_QUALITY_IDS,  # 聚类和目标质量
+    6: _OBJECT_QUALITY_IDS,  # 扩展目标（0x60D未解析，只接收目标和质量）
+    7: TARGET_IDS,  # 点云
+}
+
+# 目标类型
+KIND_TARGET = 0  # 目标 (0x60A/0x60B)
+KIND_CLUSTER = 1  # 聚类 (0x701)
+
+# 携带目标位置的报文和对应的目标类型，两类报文负载布局相同
+GENERAL_KINDS = {OBJECT_GENERAL_ID: KIND_TARGET, CLUSTER_GENERAL_ID: KIND_CLUSTER}
+# 列表头报文，每个扫描周期在该列表的目标报文之前发送
+LIST_HEADER_KINDS = {OBJECT_STATUS_ID: KIND_TARGET, CLUSTER_STATUS_ID: KIND_CLUSTER}
+# 质量报文和对应的目标类型，按ID合并到同一帧的目标中
+QUALITY_KINDS = {OBJECT_QUALITY_ID: KIND_TARGET, CLUSTER_QUALITY_ID: KIND_CLUSTER}
+
+# 目标/聚类报文负载 (字节序号d0-d7):
+#   d0                ID
+#   d1, d2[7:3]       距离      (d1<<5 | d2&0xF8) * 0.2 - 500 (m)
+#   d2[2:0], d3       径向速度  11位 * 0.1 - 102.4 (m/s，远离为正)
+#   d4                RCS       * 0.5 - 64 (dBsm)
+#   d5, d6            方位角    16位 * 0.1 - 180 (度)
+#   d7[2:0]           动态属性  0运动 1静止 2来向 3可能静止 4未知 5横穿静止 6横穿运动 7停止
+# 目标列表头负载:
+#   d0                目标数
+#   d1, d2            周期计数 (16位)
+# 聚类列表头负载:
+#   d0, d1            近距离/远距离聚类数
+#   d2, d3            周期计数 (16位)
+# 质量报文负载:
+#   d0                ID
+#   d6[7:5]           存在概率等级 0无效 1<25% 2<50% 3<75% 4<90% 5<99% 6<99.9% 7<=100%
+
+# 整帧目标数据的结构化类型
+# x/y/z/vx/vy为世界坐标系（已按传感器外参转换），range/azimuth为雷达自身坐标系
+FRAME_DTYPE = np.dtype([
+    ('x', np.float32),
+    ('y', np.float32),
+    ('z', np.float32),
+    ('tid', np.uint8),  # 目标/聚类ID
+    ('sensor', np.uint8),  # 传感器序号(SensorConfig.index)
+    ('kind', np.uint8),  # KIND_TARGET / KIND_CLUSTER
+    ('dyn_prop', np.uint8),  # 动态属性
+    ('quality', np.uint8),  # 存在概率等级，0为无效或未收到质量报文
+    ('range', np.float32),  # 距离 (m)
+    ('azimuth', np.float32),  # 方位角 (度)
+    ('vx', np.float32),  # 径向速度在x/y方向的分量 (m/s)
+    ('vy', np.float32),
+    ('rcs', np.float32),  # dBsm
+    ('timestamp', np.float64),  # 报文接收时间戳 (s)
+])
+
+
+def empty_frame(sensor, kind):
+    """没有目标的一帧扫描: 零长度数组，传感器序号和目标类型记录在dtype的元数据中"""
+    return np.zeros(0, dtype=np.dtype(FRAME_DTYPE, metadata={'sensor': sensor, 'kind': kind}))
+
+
+def frame_source(frame):
+    """返回一帧的 (传感器序号, 目标类型)，未知来源的空帧返回None"""
+    if len(frame):
+        return int(frame['sensor'][0]), int(frame['kind'][0])
+    metadata = frame.dtype.metadata
+    if metadata and 'sensor' in metadata:
+        return metadata['sensor'], metadata['kind']
+    return None
+
+
+def can_filters_for_mode(output_mode, extra_ids=(), sensor_ids=(0,)):
+    """生成输出模式对应的python-can接收过滤器(can_filters)
+
+    sensor_ids: 总线上的传感器ID，报文ID按 SENSOR_ID_STRIDE 偏移
+    SocketCAN会将过滤器下发到内核，PCAN/Kvaser由驱动或python-can在软件中过滤。
+    """
+    base_ids = set(OUTPUT_MODE_IDS.get(output_mode, TARGET_IDS))
+    base_ids.add(RADAR_STATUS_ID)
+    base_ids.update(i for i in extra_ids if i is not None)
+    ids = {sensor_message_id(i, sensor_id) for i in base_ids for sensor_id in sensor_ids}
+    return [{'can_id': i, 'can_mask': 0x7FF, 'extended': False} for i in sorted(ids)]
+
+
+def decode_target(data):
+    """解析单条目标报文 data: 8字节负载，返回 (target_id, x, y)"""
+    target_id = data[0]
+    distance = (data[1] << 5 | (data[2] & 0xF8)) * 0.2 - 500
+    angle = math.radians((data[5] << 8 | data[6]) * 0.1 - 180)
+    return target_id, distance * math.cos(angle), distance * math.sin(angle)
+
+
+def _as_payloads(payloads):
+    """(N, 8) 的uint8数组或连续的 N*8 字节缓冲区 -> (N, 8) uint8数组"""
+    if isinstance(payloads, (bytes, bytearray, memoryview)):
+        payloads = np.frombuffer(payloads, dtype=np.uint8)
+    return np.asarray(payloads, dtype=np.uint8).reshape(-1, 8)
+
+
+def _decode_polar(payloads):
+    """返回 (ID, 距离, 方位角(度))"""
+    # 提升为int32后再移位，避免uint8溢出
+    raw_distance = (payloads[:, 1].astype(np.int32) << 5) | (payloads[:, 2] & 0xF8)
+    raw_angle = (payloads[:, 5].astype(np.int32) << 8) | payloads[:, 6]
+    return payloads[:, 0], raw_distance * 0.2 - 500, raw_angle * 0.1 - 180
+
+
+def decode_targets(payloads):
+    """批量解析目标报文
+
+    payloads: N条8字节负载，可为 (N, 8) 的uint8数组或连续的 N*8 字节缓冲区
+    返回 (target_id, x, y) 三个长度为N的数组
+    """
+    target_id, distance, azimuth = _decode_polar(_as_payloads(payloads))
+    angle = np.deg2rad(azimuth)
+    return target_id, distance * np.cos(angle), distance * np.sin(angle)
+
+
+def decode_frame(payloads, timestamps=0.0, kind=KIND_TARGET):
+    """批量解析目标/聚类报文的全部字段，返回FRAME_DTYPE数组（雷达坐标系）
+
+    timestamps、kind 可为标量或长度为N的数组
+    """
+    payloads = _as_payloads(payloads)
+    frame = np.zeros(len(payloads), dtype=FRAME_DTYPE)
+    target_id, distance, azimuth = _decode_polar(payloads)
+    angle = np.deg2rad(azimuth)
+    cos, sin = np.cos(angle), np.sin(angle)
+    speed = (((payloads[:, 2].astype(np.int32) & 0x07) << 8) | payloads[:, 3]) * 0.1 - 102.4
+    frame['tid'] = target_id
+    frame['kind'] = kind
+    frame['range'] = distance
+    frame['azimuth'] = azimuth
+    frame['x'] = distance * cos
+    frame['y'] = distance * sin
+    frame['vx'] = speed * cos
+    frame['vy'] = speed * sin
+    frame['rcs'] = payloads[:, 4] * 0.5 - 64
+    frame['dyn_prop'] = payloads[:, 7] & 0x07
+    frame['timestamp'] = timestamps
+    return frame
+
+
+def decode_list_header(kind, data):
+    """解析列表头报文，返回 (本周期报文数, 周期计数)"""
+    if kind == KIND_CLUSTER:
+        return data[0] + data[1], (data[2] << 8) | data[3]
+    return data[0], (data[1] << 8) | data[2]
+
+
+def decode_quality(payloads):
+    """批量解析质量报文，返回 (ID, 存在概率等级)"""
+    payloads = _as_payloads(payloads)
+    return payloads[:, 0], payloads[:, 6] >> 5
@@ -1,17 +1,38 @@
 # radar_gui.py
 import sys
 import json
+import time
+from collections import deque
 import pyqtgraph as pg
 from PyQt5 import QtWidgets, QtCore, QtGui
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal
 from PyQt5.QtWidgets import QMessageBox, QScrollArea, QSizePolicy
 import numpy as np
 from constants import TITLE_FONT, LABEL_FONT, BUTTON_STYLE, COMBOBOX_STYLE, TEXTEDIT_STYLE, SLIDER_STYLE
-from point_cloud_viewer import PointCloudViewer
+from point_cloud_viewer import COLOR_MODES, PointCloudViewer
 from radar_worker import RadarWorker
-from radar_config import RadarConfig
+from radar_process import RadarProcess, RemoteRecorder
+from radar_decoder import FRAME_DTYPE, KIND_CLUSTER, KIND_TARGET, frame_source
+from radar_config import DISTANCES, RATES, RESOLUTIONS, RadarConfig
+from raw_log import RawFrameLog
+from recorder import CaptureRecorder
+from render_scheduler import RenderScheduler
+from alarm_engine import DEFAULT_LOG_PATH, AlarmMonitor
+from alarm_zones import ZoneSet, describe_zone, is_polygon
+from track_store import TrackStore
+from tracker import TargetTracker
+from track_view import TrackLines
+from sensors import MAX_SENSOR_ID, SensorConfig, group_by_channel, load_sensors, sensor_color_array
 
 class RadarGUI(QtWidgets.QMainWindow):
+    REPLAY_CHANNEL = "回放文件..."
+    REPLAY_SPEEDS = [1, 2, 5, 10, 0]  # 与回放速度组合框对应，0为尽快回放
+    ALARM_LOG_PATH = DEFAULT_LOG_PATH  # 报警事件日志
+    RAW_LOG_CAPACITY = 2_000_000  # 原始报文最多保留条数，缓冲区按需增长
+    CLOUD_ACCUMULATION = [(None, 0), ('frames', 5), ('frames', 10), ('frames', 20),
+                          ('seconds', 1), ('seconds', 3), ('seconds', 5)]  # 与点云累积组合框对应
+    alarm_events = pyqtSignal(object)  # 报警线程产生的事件 [AlarmEvent]
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("SR111 PCAN/Kvaser/SocketCAN 500KB上位机")
@@ -20,14 +41,51 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.init_ui()
         self.points_3d = []  # 存储3D点云数据
         self.points_2d = []  # 存储2D点云数据
-        self.target_tracks = {}  # 目标轨迹 {target_id: [ (x, y) ]}
+        self.sensor_frames = {}  # 各雷达各列表最近一帧 {(传感器序号, 目标类型): (FRAME_DTYPE数组, 接收时刻)}
+        self.frame_pending = False  # 是否有未绘制的新帧
+        self.cloud_frames = deque(maxlen=64)  # 点云累积模式下未绘制的新帧
+        self.frame_stats = {}  # 各目标列表的组帧统计 {列表名: dict}
+        # 收到新数据时才重绘，频率不超过显示器刷新率，窗口不可见时暂停
+        self.render_scheduler = RenderScheduler(self, self.refresh_plots)
+        self.sensor_timeout = 1.0  # 超过该时间(秒)未更新的雷达不参与融合显示
+        self.sensors = []  # 多雷达配置(SensorConfig列表)，为空时使用所选通道的单个雷达
+        self.radar_threads = []  # 每个CAN通道一个接收线程
+        self.set_sensor_colors([SensorConfig()])
         self.track_length = 50  # 每条轨迹最大点数
+        self.target_tracks = TrackStore(track_length=self.track_length)  # 目标轨迹
+        self.track_lines = TrackLines(self.plot_2d, self.target_tracks)  # 每条轨迹一条常驻曲线
+        # 按位置关联的卡尔曼跟踪，轨迹使用航迹ID而非雷达的8位目标ID；目标和聚类分别跟踪
+        self.trackers = {KIND_TARGET: TargetTracker(), KIND_CLUSTER: TargetTracker()}
+        self.track_clock = None  # 本次接收跟踪使用的时钟: 'capture' 报文时间戳 / 'monotonic'
         self.data_received = False
-        self.original_raw_text = ""  # 用于保存原始的CAN报文数据
-        self.radar_config = None
-        self.alarm_zones = []  # 报警区域列表 [(x1,y1,x2,y2)]
+        self.raw_log = RawFrameLog(self.RAW_LOG_CAPACITY)  # 原始CAN报文环形缓冲区
+        self.filter_seqs = None  # 过滤结果的报文序号，None表示实时显示
+        self.filter_page = 0
+        self.raw_page_size = 200  # 每页显示的报文条数
+        self.raw_text.document().setMaximumBlockCount(self.raw_page_size)
+        self.raw_displayed_seq = 0  # 实时视图已显示到的报文序号
+        # 实时视图合并刷新，只格式化最后一屏的报文
+        self.raw_view_timer = QTimer(self)
+        self.raw_view_timer.setSingleShot(True)
+        self.raw_view_timer.setInterval(100)
+        self.raw_view_timer.timeout.connect(self.refresh_raw_view)
+        self.radar_config = RadarConfig()  # 未连接时只记录期望配置，启动后全部下发
+        self.recorder = None  # 连续录制器
+        self.can_interface = None  # 指定python-can接口类型，None时按系统自动选择
+        self.alarm_zones = []  # 报警区域列表，矩形(x1,y1,x2,y2)或多边形[[x,y],...]
         self.alarm_rects = []  # 存储报警区域ROI对象
+        self.alarm_zone_set = ZoneSet()  # 用于检测的报警区域
         self.alarm_active = False
+        self.active_zones = set()  # 正在报警的区域序号
+        # 报警判断在独立线程中对每帧解析结果进行，不受界面刷新影响
+        self.alarm_events.connect(self.handle_alarm_events)
+        self.alarm_monitor = AlarmMonitor(
+            log_path=self.ALARM_LOG_PATH,
+            dwell=self.alarm_dwell_spin.value(),
+            hold=self.alarm_hold_spin.value(),
+            on_event=self.alarm_events.emit
+        )
+        self.alarm_monitor.start()
         self.track_visible = False  # 轨迹是否显示（默认不显示）
 
     def init_ui(self):
@@ -49,6 +107,9 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.toggle_tracks_action = QtWidgets.QAction("显示目标轨迹", self, checkable=True, checked=False)
         self.toggle_tracks_action.triggered.connect(self.toggle_tracks)
         view_menu.addAction(self.toggle_tracks_action)
+        self.tracking_action = QtWidgets.QAction("目标跟踪滤波", self, checkable=True, checked=True)
+        self.tracking_action.triggered.connect(self.toggle_tracking)
+        view_menu.addAction(self.tracking_action)
         
         help_menu = menubar.addMenu("帮助")
         about_action = QtWidgets.QAction("关于", self)
@@ -97,6 +158,7 @@ class RadarGUI(QtWidgets.QMainWindow):
                 'PCAN_USBBUS1', 'PCAN_USBBUS2', 'PCAN_USBBUS3',
                 'Kvaser_0', 'Kvaser_1', 'Kvaser_2'
             ])
+        self.channel_combo.addItem(self.REPLAY_CHANNEL)
         self.btn_toggle = QtWidgets.QPushButton("启 动")
         self.btn_toggle.setStyleSheet(BUTTON_STYLE)
         self.btn_toggle.setCheckable(True)
@@ -121,12 +183,52 @@ class RadarGUI(QtWidgets.QMainWindow):
         control_group_layout.addWidget(channel_box)
         control_group_layout.addLayout(status_box)
 
+        # 多雷达配置状态（通过加载配置文件中的sensors设置）
+        self.sensor_label = QtWidgets.QLabel("多雷达: 未配置")
+        self.sensor_label.setFont(LABEL_FONT)
+        control_group_layout.addWidget(self.sensor_label)
+
+        # 组帧统计（按列表头检查每帧是否收齐）
+        self.frame_stats_label = QtWidgets.QLabel("帧完整率: --")
+        self.frame_stats_label.setFont(LABEL_FONT)
+        control_group_layout.addWidget(self.frame_stats_label)
+
+        # 发送队列统计（配置报文等）
+        self.tx_stats_label = QtWidgets.QLabel("发送: --")
+        self.tx_stats_label.setFont(LABEL_FONT)
+        control_group_layout.addWidget(self.tx_stats_label)
+
+        # 回放速度
+        replay_box = QtWidgets.QWidget()
+        replay_layout = QtWidgets.QHBoxLayout(replay_box)
+        replay_layout.setContentsMargins(0, 0, 0, 0)
+        replay_label = QtWidgets.QLabel("回放速度:")
+        replay_label.setFont(LABEL_FONT)
+        replay_layout.addWidget(replay_label)
+        self.replay_speed_combo = QtWidgets.QComboBox()
+        self.replay_speed_combo.setStyleSheet(COMBOBOX_STYLE)
+        self.replay_speed_combo.addItems(["1x", "2x", "5x", "10x", "最快"])
+        replay_layout.addWidget(self.replay_speed_combo)
+        control_group_layout.addWidget(replay_box)
+
+        # 接收、解析和录制在子进程中运行，不受界面绘图影响（下次启动时生效）
+        self.process_check = QtWidgets.QCheckBox("独立进程接收")
+        self.process_check.setFont(LABEL_FONT)
+        control_group_layout.addWidget(self.process_check)
+
         # 数据保存按钮
         self.btn_save = QtWidgets.QPushButton("保存数据")
         self.btn_save.setStyleSheet(BUTTON_STYLE)
         self.btn_save.clicked.connect(self.save_data)
         control_group_layout.addWidget(self.btn_save)
 
+        # 连续录制按钮
+        self.btn_record = QtWidgets.QPushButton("开始录制")
+        self.btn_record.setStyleSheet(BUTTON_STYLE)
+        self.btn_record.setCheckable(True)
+        self.btn_record.clicked.connect(self.toggle_recording)
+        control_group_layout.addWidget(self.btn_record)
+
         # 数据过滤框
         filter_box = QtWidgets.QWidget()
         filter_layout = QtWidgets.QHBoxLayout(filter_box)
@@ -137,6 +239,7 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.filter_input = QtWidgets.QLineEdit()
         self.filter_input.setStyleSheet(TEXTEDIT_STYLE)
         self.filter_input.setMinimumWidth(100)
+        self.filter_input.setPlaceholderText("如 60A,60B")
         self.btn_filter = QtWidgets.QPushButton("过滤")
         self.btn_filter.setStyleSheet(BUTTON_STYLE)
         self.btn_filter.clicked.connect(self.apply_filter)
@@ -144,6 +247,41 @@ class RadarGUI(QtWidgets.QMainWindow):
         filter_layout.addWidget(self.btn_filter)
         control_group_layout.addWidget(filter_box)
 
+        # 过滤时间范围（相对第一条报文的秒数）
+        time_box = QtWidgets.QWidget()
+        time_layout = QtWidgets.QHBoxLayout(time_box)
+        time_layout.setContentsMargins(0, 0, 0, 0)
+        time_label = QtWidgets.QLabel("时间范围 (s):")
+        time_label.setFont(LABEL_FONT)
+        time_layout.addWidget(time_label)
+        self.filter_start_input = QtWidgets.QLineEdit()
+        self.filter_start_input.setStyleSheet(TEXTEDIT_STYLE)
+        self.filter_start_input.setPlaceholderText("起始")
+        self.filter_end_input = QtWidgets.QLineEdit()
+        self.filter_end_input.setStyleSheet(TEXTEDIT_STYLE)
+        self.filter_end_input.setPlaceholderText("结束")
+        time_layout.addWidget(self.filter_start_input)
+        time_layout.addWidget(QtWidgets.QLabel("~"))
+        time_layout.addWidget(self.filter_end_input)
+        control_group_layout.addWidget(time_box)
+
+        # 过滤结果翻页
+        page_box = QtWidgets.QWidget()
+        page_layout = QtWidgets.QHBoxLayout(page_box)
+        page_layout.setContentsMargins(0, 0, 0, 0)
+        self.btn_prev_page = QtWidgets.QPushButton("上一页")
+        self.btn_prev_page.setStyleSheet(BUTTON_STYLE)
+        self.btn_prev_page.clicked.connect(lambda: self.show_filter_page(self.filter_page - 1))
+        self.page_label = QtWidgets.QLabel("实时显示")
+        self.page_label.setAlignment(Qt.AlignCenter)
+        self.btn_next_page = QtWidgets.QPushButton("下一页")
+        self.btn_next_page.setStyleSheet(BUTTON_STYLE)
+        self.btn_next_page.clicked.connect(lambda: self.show_filter_page(self.filter_page + 1))
+        page_layout.addWidget(self.btn_prev_page)
+        page_layout.addWidget(self.page_label, 1)
+        page_layout.addWidget(self.btn_next_page)
+        control_group_layout.addWidget(page_box)
+
         # 可视化参数调整
         size_box = QtWidgets.QWidget()
         size_layout = QtWidgets.QHBoxLayout(size_box)
@@ -161,9 +299,21 @@ class RadarGUI(QtWidgets.QMainWindow):
         control_group_layout.addWidget(size_box)
 
         # 原始数据框
+        raw_header = QtWidgets.QHBoxLayout()
         raw_label = QtWidgets.QLabel("原始CAN报文:")
         raw_label.setFont(LABEL_FONT)
-        control_group_layout.addWidget(raw_label)
+        raw_header.addWidget(raw_label)
+        raw_header.addStretch()
+        # 默认只接收雷达报文，勾选后接收总线上全部报文
+        self.receive_all_check = QtWidgets.QCheckBox("显示非雷达报文")
+        self.receive_all_check.stateChanged.connect(self.toggle_receive_all)
+        raw_header.addWidget(self.receive_all_check)
+        # 高负载时可关闭原始报文的实时传输
+        self.raw_stream_check = QtWidgets.QCheckBox("实时接收")
+        self.raw_stream_check.setChecked(True)
+        self.raw_stream_check.stateChanged.connect(self.toggle_raw_streaming)
+        raw_header.addWidget(self.raw_stream_check)
+        control_group_layout.addLayout(raw_header)
         self.raw_text = QtWidgets.QTextEdit()
         self.raw_text.setStyleSheet(TEXTEDIT_STYLE + " font-size: 10px;")
         self.raw_text.setReadOnly(True)
@@ -208,9 +358,9 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
         config_layout.addWidget(create_config_row("测量模式:", self.mode_combo))
 
-        # 传感器ID配置
+        # 传感器ID配置，修改时单独下发给配置目标雷达
         self.id_spin = QtWidgets.QSpinBox()
-        self.id_spin.setRange(0, 255)
+        self.id_spin.setRange(0, MAX_SENSOR_ID)
         self.id_spin.setValue(0)
         self.id_spin.setStyleSheet(TEXTEDIT_STYLE)
         self.id_spin.setMaximumWidth(80)
@@ -224,6 +374,7 @@ class RadarGUI(QtWidgets.QMainWindow):
             "仅聚类", "仅目标", "聚类和目标", "仅聚类质量", 
             "仅目标质量", "聚类和目标质量", "扩展目标", "点云"
         ])
+        self.output_combo.setCurrentIndex(1)  # 与RadarConfig默认一致：仅目标
         self.output_combo.currentIndexChanged.connect(self.on_output_changed)
         config_layout.addWidget(create_config_row("输出模式:", self.output_combo))
 
@@ -264,7 +415,7 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.cloud_filter_check.stateChanged.connect(self.toggle_cloud_filter)
         self.cloud_filter_slider = QtWidgets.QSlider(Qt.Horizontal)
         self.cloud_filter_slider.setStyleSheet(SLIDER_STYLE)
-        self.cloud_filter_slider.setRange(0.2, 70)
+        self.cloud_filter_slider.setRange(1, 70)  # QSlider只接受整数
         self.cloud_filter_slider.setValue(70)
         self.cloud_filter_slider.setMinimumWidth(70)
         self.cloud_filter_slider.valueChanged.connect(self.update_cloud_filter)
@@ -275,6 +426,22 @@ class RadarGUI(QtWidgets.QMainWindow):
         cloud_filter_layout.addWidget(self.cloud_filter_value)
         config_layout.addWidget(cloud_filter_box)
 
+        # 点云着色
+        self.cloud_color_combo = QtWidgets.QComboBox()
+        self.cloud_color_combo.setStyleSheet(COMBOBOX_STYLE)
+        self.cloud_color_combo.addItems(["按雷达", "按距离", "按径向速度", "按RCS"])  # 与COLOR_MODES对应
+        self.cloud_color_combo.currentIndexChanged.connect(self.on_cloud_color_changed)
+        config_layout.addWidget(create_config_row("点云着色:", self.cloud_color_combo))
+
+        # 点云多帧累积
+        self.cloud_accumulate_combo = QtWidgets.QComboBox()
+        self.cloud_accumulate_combo.setStyleSheet(COMBOBOX_STYLE)
+        self.cloud_accumulate_combo.addItems(
+            ["关闭" if mode is None else f"{limit}{'帧' if mode == 'frames' else '秒'}"
+             for mode, limit in self.CLOUD_ACCUMULATION])
+        self.cloud_accumulate_combo.currentIndexChanged.connect(self.on_cloud_accumulate_changed)
+        config_layout.addWidget(create_config_row("点云累积:", self.cloud_accumulate_combo))
+
         # 应用配置按钮
         self.apply_config_btn = QtWidgets.QPushButton("应用配置")
         self.apply_config_btn.setStyleSheet(BUTTON_STYLE)
@@ -322,6 +489,27 @@ class RadarGUI(QtWidgets.QMainWindow):
         alarm_btn_layout.addWidget(self.btn_clear_zones)
         
         alarm_layout.addWidget(alarm_btn_row)
+
+        # 报警持续时间和解除延时，防止目标在区域边缘反复触发
+        self.alarm_dwell_spin = QtWidgets.QDoubleSpinBox()
+        self.alarm_dwell_spin.setRange(0, 10)
+        self.alarm_dwell_spin.setSingleStep(0.1)
+        self.alarm_dwell_spin.setValue(0.2)
+        self.alarm_dwell_spin.setSuffix(" s")
+        self.alarm_dwell_spin.setStyleSheet(TEXTEDIT_STYLE)
+        self.alarm_dwell_spin.setMaximumWidth(80)
+        self.alarm_dwell_spin.valueChanged.connect(self.on_alarm_times_changed)
+        alarm_layout.addWidget(create_config_row("报警持续时间:", self.alarm_dwell_spin))
+
+        self.alarm_hold_spin = QtWidgets.QDoubleSpinBox()
+        self.alarm_hold_spin.setRange(0, 10)
+        self.alarm_hold_spin.setSingleStep(0.1)
+        self.alarm_hold_spin.setValue(1.0)
+        self.alarm_hold_spin.setSuffix(" s")
+        self.alarm_hold_spin.setStyleSheet(TEXTEDIT_STYLE)
+        self.alarm_hold_spin.setMaximumWidth(80)
+        self.alarm_hold_spin.valueChanged.connect(self.on_alarm_times_changed)
+        alarm_layout.addWidget(create_config_row("解除延时:", self.alarm_hold_spin))
         
         # 清除轨迹按钮
         self.btn_clear_tracks = QtWidgets.QPushButton("清除目标轨迹")
@@ -357,9 +545,6 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.plot_2d.setLabel('bottom', 'X坐标 (m)')
         self.scatter_2d = pg.ScatterPlotItem(size=10)
         self.plot_2d.addItem(self.scatter_2d)
-        
-        # 存储轨迹线对象
-        self.track_lines = []
 
         # 3D可视化
         self.point_cloud.setMinimumSize(400, 300)
@@ -394,42 +579,117 @@ class RadarGUI(QtWidgets.QMainWindow):
     def toggle_can_connection(self):
         """切换CAN连接状态"""
         if self.btn_toggle.isChecked():
+            channel = self.select_channel()
+            if not channel:
+                self.btn_toggle.setChecked(False)
+                return
             self.set_status_color("connected")  # 启动时显示连接中
-            self.start_radar()
+            self.start_radar(channel)
             self.btn_toggle.setText("停 止")
             self.channel_combo.setEnabled(False)
         else:
             self.set_status_color("disconnected")  # 停止时恢复灰色
             self.stop_radar()
             self.btn_toggle.setText("启 动")
-            self.channel_combo.setEnabled(True)
+            self.channel_combo.setEnabled(not self.sensors)
 
-    def start_radar(self):
-        """启动雷达线程"""
-        if hasattr(self, 'radar_thread') and self.radar_thread.isRunning():
+    def select_channel(self):
+        """返回当前选择的通道，回放模式下弹出文件选择框，取消时返回None"""
+        channel = self.channel_combo.currentText()
+        if channel != self.REPLAY_CHANNEL:
+            return channel
+        file_path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "选择回放文件", "",
+            "CAN记录 (*.srcap *.asc *.blf *.log *.csv *.trc);;所有文件 (*)"
+        )
+        return file_path or None
+
+    def start_radar(self, channel=None):
+        """启动雷达线程，多雷达模式下每个CAN通道启动一个线程"""
+        if any(worker.isRunning() for worker in self.radar_threads):
             return
 
         self.data_received = False
-        self.radar_thread = RadarWorker(self.channel_combo.currentText())
-        self.radar_thread.new_target.connect(self.update_data)
-        self.radar_thread.raw_data.connect(self.update_raw_display)
-        self.radar_thread.no_data.connect(self.show_no_data_warning)
-        self.radar_thread.status_signal.connect(self.handle_status_change)
-        self.radar_thread.radar_status.connect(self.update_radar_status)
-        self.radar_thread.start()
-        
-        # 创建雷达配置实例
-        self.radar_config = RadarConfig(self.radar_thread.can_bus)
-        
-        # 应用默认配置
+        self.sensor_frames.clear()
+        self.frame_stats.clear()
+        # 重新接收（如重新回放）时时间基准可能改变，清除航迹和轨迹
+        self.track_lines.clear()
+        for tracker in self.trackers.values():
+            tracker.clear()
+        self.track_clock = None
+        if self.sensors:
+            groups = group_by_channel(self.sensors)
+        else:
+            channel = channel or self.channel_combo.currentText()
+            groups = {channel: [SensorConfig(channel=channel)]}
+        self.set_sensor_colors([sensor for group in groups.values() for sensor in group])
+
+        worker_args = [dict(
+            channel=channel,
+            batch_frames=True,
+            replay_speed=self.REPLAY_SPEEDS[self.replay_speed_combo.currentIndex()],
+            interface=self.can_interface,
+            output_mode=self.output_combo.currentIndex(),
+            receive_all=self.receive_all_check.isChecked(),
+            raw_streaming=self.raw_stream_check.isChecked(),
+            sensors=sensors
+        ) for channel, sensors in groups.items()]
+        if self.process_check.isChecked():
+            # 全部通道在一个子进程中接收
+            self.radar_threads = [RadarProcess(worker_args)]
+        else:
+            self.radar_threads = [RadarWorker(**args) for args in worker_args]
+        for worker in self.radar_threads:
+            worker.new_target.connect(self.update_data)
+            worker.new_frame.connect(self.update_frame)
+            worker.raw_frames.connect(self.update_raw_frames)
+            worker.no_data.connect(self.show_no_data_warning)
+            worker.status_signal.connect(self.handle_status_change)
+            worker.radar_status.connect(self.update_radar_status)
+            worker.frame_stats.connect(self.update_frame_stats)
+            worker.config_sent.connect(self.on_config_sent)
+            worker.tx_stats.connect(self.update_tx_stats)
+            worker.recorder = self.recorder
+            worker.alarm_monitor = self.alarm_monitor
+            worker.start()
+        self.process_check.setEnabled(False)
+        
+        # 配置报文交给第一个通道的接收线程发送给该通道的第一个雷达，总线打开后依次发出
+        target = self.radar_threads[0].sensors[0]
+        self.radar_config.target_id = target.sensor_id
+        self.set_id_spin(target.sensor_id)
+        self.radar_config.sender = self.radar_threads[0].send_config
+        self.radar_config.reset_applied()
         self.apply_config()
 
     def stop_radar(self):
         """停止雷达线程"""
-        if hasattr(self, 'radar_thread'):
-            self.radar_thread.running = False
-            self.radar_thread.wait(1000)
-            self.radar_thread.quit()
+        self.radar_config.sender = None
+        for worker in self.radar_threads:
+            worker.running = False
+        for worker in self.radar_threads:
+            worker.wait(1000)
+            worker.quit()
+        self.process_check.setEnabled(not self.recorder)
+
+    def set_sensors(self, sensors):
+        """设置多雷达配置，空列表表示单雷达模式"""
+        self.sensors = sensors
+        if sensors:
+            channels = ', '.join(group_by_channel(sensors))
+            self.sensor_label.setText(f"多雷达: {len(sensors)}个 ({channels})")
+        else:
+            self.sensor_label.setText("多雷达: 未配置")
+        self.channel_combo.setEnabled(not sensors and not self.btn_toggle.isChecked())
+
+    def set_sensor_colors(self, sensors):
+        """按传感器序号准备2D画刷和3D颜色"""
+        self.sensor_colors = sensor_color_array(sensors)
+        brushes = np.empty(len(self.sensor_colors), dtype=object)
+        for i, color in enumerate(self.sensor_colors):
+            brushes[i] = pg.mkBrush([int(c * 255) for c in color[:3]])
+        self.sensor_brushes = brushes
+        self.point_cloud.set_sensors(sensors, self.sensor_colors)
 
     def handle_status_change(self, status):
         if status == "connected":
@@ -447,80 +707,119 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.points_3d.append([x, y, z])
         
         # 目标轨迹追踪
-        if tid not in self.target_tracks:
-            self.target_tracks[tid] = []
-        self.target_tracks[tid].append((x, y))
-        if len(self.target_tracks[tid]) > self.track_length:
-            self.target_tracks[tid].pop(0)
+        self.target_tracks.append(tid, x, y, time.monotonic())
+        self.render_scheduler.request()
+
+    def update_frame(self, frame):
+        """接收一帧完整扫描 frame: FRAME_DTYPE结构化数组，没有目标的扫描为空帧"""
+        self.data_received = True
+        source = frame_source(frame)
+        if source is None:
+            return
+        # 每个雷达只保留最新一帧用于绘制（空帧清除该雷达的目标），轨迹则记录每一帧
+        self.sensor_frames[source] = (frame, time.monotonic())
+        self.frame_pending = True
+        if self.point_cloud.accumulating:
+            self.cloud_frames.append(frame)
+        self.render_scheduler.request()
+        if len(frame) == 0:
+            return
+        kind = source[1]
+        if self.tracking_action.isChecked():
+            # 只记录已确认航迹的滤波后位置，轨迹按 (航迹ID, 目标类型) 区分
+            timestamp = float(frame['timestamp'][-1])
+            if self.track_clock is None:
+                # 按第一帧选定时钟，同一次接收中不混用报文时间戳和本机时间
+                self.track_clock = 'capture' if timestamp else 'monotonic'
+            t = timestamp if self.track_clock == 'capture' else time.monotonic()
+            if not t:
+                return
+            ids, confirmed, xs, ys = self.trackers[kind].update(frame['x'], frame['y'], t, frame['vx'], frame['vy'])
+            keys = (ids[confirmed] << 1) | kind
+            self.target_tracks.extend(keys.tolist(), xs[confirmed], ys[confirmed], time.monotonic())
+            return
+        # 不同雷达、目标和聚类的ID会重复，轨迹按 (目标类型, 传感器序号, ID) 区分
+        keys = (frame['kind'].astype(np.int32) << 16) | (frame['sensor'].astype(np.int32) << 8) | frame['tid']
+        self.target_tracks.extend(keys.tolist(), frame['x'], frame['y'], time.monotonic())
+
+    def take_frame(self):
+        """取出待绘制的一帧数据（各雷达最新一帧融合），没有新数据时返回None"""
+        if self.frame_pending:
+            self.frame_pending = False
+            now = time.monotonic()
+            for key, (_, received) in list(self.sensor_frames.items()):
+                if now - received > self.sensor_timeout:
+                    del self.sensor_frames[key]
+            frames = [frame for frame, _ in self.sensor_frames.values()]
+            # 逐目标模式下残留的点并入同一帧，避免重复绘制
+            self.points_2d.clear()
+            self.points_3d.clear()
+            if not frames:
+                return None
+            return frames[0] if len(frames) == 1 else np.concatenate(frames)
+        if not self.points_2d:
+            return None
+        frame = np.zeros(len(self.points_2d), dtype=FRAME_DTYPE)
+        frame['x'] = [p['x'] for p in self.points_2d]
+        frame['y'] = [p['y'] for p in self.points_2d]
+        frame['z'] = [p[2] for p in self.points_3d]
+        frame['tid'] = [p['tid'] for p in self.points_2d]
+        self.points_2d.clear()
+        self.points_3d.clear()
+        if self.point_cloud.accumulating:
+            self.cloud_frames.append(frame)
+        return frame
 
     def refresh_plots(self):
+        frame = self.take_frame()
         # 更新2D视图
-        if self.points_2d:
+        if frame is not None:
+            xs, ys = frame['x'], frame['y']
+            sensors = frame['sensor']
             self.scatter_2d.setData(
-                x=[p['x'] for p in self.points_2d],
-                y=[p['y'] for p in self.points_2d],
-                brush=pg.mkBrush('r')
+                x=xs,
+                y=ys,
+                brush=self.sensor_brushes[sensors] if len(self.sensor_brushes) > 1 else self.sensor_brushes[0]
             )
             
-            # 清除之前的轨迹线
-            for line in self.track_lines:
-                self.plot_2d.removeItem(line)
-            self.track_lines = []
+            # 只更新有新点的轨迹线，过期轨迹自动移除
+            self.track_lines.redraw()
             
-            # 绘制目标轨迹（如果开启）
-            if self.track_visible and self.target_tracks:
-                for tid, track in self.target_tracks.items():
-                    if len(track) > 1:
-                        # 使用不同颜色区分不同目标
-                        color = pg.intColor(tid % 10, hues=10, maxValue=200)
-                        # 绘制轨迹线
-                        line = self.plot_2d.plot(
-                            [p[0] for p in track],
-                            [p[1] for p in track],
-                            pen=pg.mkPen(color, width=1),
-                            connect="all"
-                        )
-                        self.track_lines.append(line)
-            
-            # 检查报警区域
-            alarm_triggered = False
-            for point in self.points_2d:
-                x, y = point['x'], point['y']
-                for zone in self.alarm_zones:
-                    if zone[0] <= x <= zone[2] and zone[1] <= y <= zone[3]:
-                        alarm_triggered = True
-                        break
-                if alarm_triggered:
-                    break
-            
-            # 更新报警状态
-            if alarm_triggered != self.alarm_active:
-                self.alarm_active = alarm_triggered
-                self.set_alarm_color(alarm_triggered)
-                if alarm_triggered:
-                    # 播放报警声音
-                    QtWidgets.QApplication.beep()
-            
-            # 清空当前帧
-            self.points_2d.clear()
-
-        # 更新3D视图
-        if self.points_3d:
-            self.point_cloud.update_points(np.array(self.points_3d))
-            self.points_3d.clear()
+            # 更新3D视图
+            if self.point_cloud.accumulating:
+                # 累积模式下每帧只加入一次
+                self.point_cloud.add_frames(self.cloud_frames)
+                self.cloud_frames.clear()
+            else:
+                self.point_cloud.update_frame(frame)
 
-    def update_raw_display(self, text):
+    def update_raw_frames(self, records):
+        """接收一批原始报文 records: RAW_FRAME_DTYPE结构化数组"""
         self.data_received = True
-        self.raw_text.append(text)
-        if not self.original_raw_text:
-            self.original_raw_text = text
-        else:
-            self.original_raw_text += '\n' + text
-        if self.raw_text.document().blockCount() > 200:
-            cursor = self.raw_text.textCursor()
-            cursor.movePosition(QtGui.QTextCursor.Start)
-            cursor.select(QtGui.QTextCursor.BlockUnderCursor)
-            cursor.removeSelectedText()
+        self.raw_log.extend(records)
+        if self.filter_seqs is None and not self.raw_view_timer.isActive():
+            self.raw_view_timer.start()
+
+    def refresh_raw_view(self):
+        """将新报文追加到实时视图，只格式化能显示出来的最后一屏"""
+        if self.filter_seqs is not None:
+            # 正在查看过滤结果，不追加实时报文
+            return
+        if not self.raw_text.isVisible() or self.raw_text.visibleRegion().isEmpty() or self.isMinimized():
+            return
+        total = self.raw_log.total
+        start = max(self.raw_displayed_seq, total - self.raw_page_size, self.raw_log.first_seq)
+        self.raw_displayed_seq = total
+        if start >= total:
+            return
+        rows = self.raw_log.format_rows(self.raw_log.get(np.arange(start, total)))
+        cursor = self.raw_text.textCursor()
+        cursor.movePosition(QtGui.QTextCursor.End)
+        if not self.raw_text.document().isEmpty():
+            rows.insert(0, '')
+        cursor.insertText('\n'.join(rows))
+        scrollbar = self.raw_text.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
 
     def show_no_data_warning(self):
         msg = "未检测到CAN数据，请检查:\n"
@@ -576,110 +875,288 @@ class RadarGUI(QtWidgets.QMainWindow):
                 with open(file_path, 'w', encoding='utf-8') as f:
                     # 保存原始 CAN 报文
                     f.write("原始 CAN 报文:\n")
-                    f.write(self.original_raw_text)
-                    # 保存解析后的目标数据
-                    f.write("\n解析后的目标数据:\n")
-                    # 这里可以添加保存解析后目标数据的逻辑
+                    for i, chunk in enumerate(self.raw_log.iter_text()):
+                        if i:
+                            f.write('\n')
+                        f.write(chunk)
+                    # 保存各雷达最新一帧解析后的目标，连续的目标数据使用"开始录制"保存
+                    f.write("\n解析后的目标数据（各雷达最新一帧，连续数据请使用录制功能）:\n")
+                    f.write("传感器,类型,ID,x,y,z,距离,方位角,vx,vy,RCS,质量,时间戳\n")
+                    fields = ('sensor', 'kind', 'tid', 'x', 'y', 'z', 'range', 'azimuth', 'vx', 'vy', 'rcs',
+                              'quality', 'timestamp')
+                    for frame, _ in list(self.sensor_frames.values()):
+                        for r in zip(*(frame[name].tolist() for name in fields)):
+                            f.write(f"{r[0]},{'聚类' if r[1] == KIND_CLUSTER else '目标'},{r[2]},"
+                                    + ','.join(f"{v:.2f}" for v in r[3:11]) + f",{r[11]},{r[12]:.6f}\n")
             except Exception as e:
                 QMessageBox.warning(self, "保存失败", f"保存数据时出现错误: {e}")
 
-    def apply_filter(self):
-        filter_text = self.filter_input.text()
-        if filter_text:
+    def toggle_recording(self):
+        """开始/停止连续录制原始报文和目标数据"""
+        if self.btn_record.isChecked():
+            file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "录制数据", "", "录制文件 (*.srcap)")
+            if not file_path:
+                self.btn_record.setChecked(False)
+                return
             try:
-                filter_id = int(filter_text, 16)
-                filtered_text = '\n'.join(
-                    [line for line in self.original_raw_text.split('\n') if f"ID:{filter_id:04X}" in line])
-                self.raw_text.setPlainText(filtered_text)
-            except ValueError:
-                QMessageBox.warning(self, "输入错误", "请输入有效的十六进制 CAN ID。")
+                # 独立进程接收时由子进程录制；保存对话框已确认覆盖，清空已有文件
+                recorder_class = RemoteRecorder if self.process_check.isChecked() else CaptureRecorder
+                self.recorder = recorder_class(file_path, overwrite=True)
+                self.recorder.start()
+            except OSError as e:
+                self.recorder = None
+                self.btn_record.setChecked(False)
+                QMessageBox.warning(self, "录制失败", f"无法创建录制文件: {e}")
+                return
+            for worker in self.radar_threads:
+                worker.recorder = self.recorder
+            self.process_check.setEnabled(False)
+            self.btn_record.setText("停止录制")
+            self.raw_text.append(f"[录制] 开始录制到: {file_path}")
         else:
-            # 清空过滤条件，显示全部数据
-            self.raw_text.setPlainText(self.original_raw_text)
+            self.stop_recording()
+
+    def stop_recording(self):
+        if not self.recorder:
+            return
+        for worker in self.radar_threads:
+            worker.recorder = None
+        self.recorder.stop()
+        self.raw_text.append(f"[录制] 已停止，写入 {self.recorder.written_chunks} 块，"
+                             f"丢弃 {self.recorder.dropped_chunks} 块")
+        self.recorder = None
+        self.process_check.setEnabled(not any(worker.isRunning() for worker in self.radar_threads))
+        self.btn_record.setChecked(False)
+        self.btn_record.setText("开始录制")
+
+    def apply_filter(self):
+        filter_text = self.filter_input.text().replace(',', ' ').split()
+        try:
+            filter_ids = [int(t, 16) for t in filter_text] or None
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "请输入有效的十六进制 CAN ID。")
+            return
+        try:
+            start_text = self.filter_start_input.text().strip()
+            end_text = self.filter_end_input.text().strip()
+            start = float(start_text) if start_text else None
+            end = float(end_text) if end_text else None
+        except ValueError:
+            QMessageBox.warning(self, "输入错误", "请输入有效的时间范围（秒）。")
+            return
+
+        if filter_ids is None and start is None and end is None:
+            # 清空过滤条件，恢复实时显示最新一页
+            self.filter_seqs = None
+            self.page_label.setText("实时显示")
+            records = self.raw_log.slice(-self.raw_page_size)
+            self.raw_text.setPlainText('\n'.join(self.raw_log.format_rows(records)))
+            self.raw_displayed_seq = self.raw_log.total
+            return
+
+        # 时间范围相对第一条报文
+        base = self.raw_log.start_time or 0.0
+        self.filter_seqs = self.raw_log.query(
+            filter_ids,
+            start_time=base + start if start is not None else None,
+            end_time=base + end if end is not None else None,
+        )
+        self.show_filter_page(0)
+
+    def show_filter_page(self, page):
+        """显示过滤结果的指定页，只格式化该页的报文"""
+        if self.filter_seqs is None:
+            return
+        # 丢弃已被环形缓冲区覆盖的记录
+        first_seq = self.raw_log.first_seq
+        if len(self.filter_seqs) and self.filter_seqs[0] < first_seq:
+            self.filter_seqs = self.filter_seqs[np.searchsorted(self.filter_seqs, first_seq):]
+        count = len(self.filter_seqs)
+        pages = max(1, -(-count // self.raw_page_size))
+        self.filter_page = min(max(page, 0), pages - 1)
+        start = self.filter_page * self.raw_page_size
+        records = self.raw_log.get(self.filter_seqs[start:start + self.raw_page_size])
+        self.raw_text.setPlainText('\n'.join(self.raw_log.format_rows(records)))
+        self.page_label.setText(f"第 {self.filter_page + 1}/{pages} 页 (共 {count} 条)")
 
     def update_point_size(self, size):
         self.scatter_2d.setSize(size)
         self.point_cloud.scatter.setData(size=size)
 
     def on_distance_changed(self, index):
-        if self.radar_config:
-            distances = [15, 25, 50, 70]  # 修正：按照组合框的顺序，单位是米
-            self.radar_config.set_distance_range(distances[index])
-            
+        self.radar_config.set_distance_range(DISTANCES[index])
+        
     def on_resolution_changed(self, index):
-        if self.radar_config:
-            resolutions = [0.4, 0.2]
-            self.radar_config.set_angle_resolution(resolutions[index])
-            
+        self.radar_config.set_angle_resolution(RESOLUTIONS[index])
+        
     def on_mode_changed(self, index):
-        if self.radar_config:
-            self.radar_config.set_measurement_mode(index)
-            
+        self.radar_config.set_measurement_mode(index)
+        
     def on_id_changed(self, value):
-        if self.radar_config:
-            self.radar_config.set_sensor_id(value)
-            
+        if self.radar_config.set_sensor_id(value):
+            self.raw_text.append(f"\n[配置] 雷达传感器ID改为 {value}，需在多雷达配置中使用新ID并重新启动")
+
+    def set_id_spin(self, value):
+        """显示传感器ID而不下发"""
+        self.id_spin.blockSignals(True)
+        self.id_spin.setValue(value)
+        self.id_spin.blockSignals(False)
+        self.radar_config.sensor_id = value
+        
     def on_output_changed(self, index):
-        if self.radar_config:
-            self.radar_config.set_output_mode(index)
+        for worker in self.radar_threads:
+            worker.set_output_mode(index)
+        self.radar_config.set_output_mode(index)
+
+    def toggle_raw_streaming(self, state):
+        for worker in self.radar_threads:
+            worker.raw_streaming = (state == Qt.Checked)
+
+    def toggle_receive_all(self, state):
+        for worker in self.radar_threads:
+            worker.set_receive_all(state == Qt.Checked)
             
     def on_rate_changed(self, index):
-        if self.radar_config:
-            rates = [10, 20, 25, 33, 50]  # 注意：组合框有5个选项，对应5个值
-            self.radar_config.set_update_rate(rates[index])
-            
+        self.radar_config.set_update_rate(RATES[index])
+        
     def on_rcs_changed(self, value):
         self.rcs_value.setText(str(value))
-        if self.radar_config:
-            self.radar_config.set_target_config(rcs_threshold=value)
+        self.radar_config.set_target_config(rcs_threshold=value)
             
     def apply_config(self):
-        if not self.radar_config:
+        """按界面上的全部配置提交一次下发，只发送与上次下发不同的寄存器"""
+        config = self.radar_config
+        with config.transaction():
+            config.set_distance_range(DISTANCES[self.distance_combo.currentIndex()])
+            config.set_angle_resolution(RESOLUTIONS[self.resolution_combo.currentIndex()])
+            config.set_measurement_mode(self.mode_combo.currentIndex())
+            config.set_output_mode(self.output_combo.currentIndex())
+            config.set_update_rate(RATES[self.rate_combo.currentIndex()])
+            config.set_cluster_config()
+            config.set_target_config(rcs_threshold=self.rcs_slider.value())
+            changed = len(config.changed())
+
+        if config.sender is None:
+            self.raw_text.append("\n[配置] 雷达未启动，配置将在启动后下发")
+        elif not changed:
+            self.raw_text.append("\n[配置] 配置无变化")
+
+    def on_config_sent(self, transaction):
+        """一次配置下发发送完成，等待状态报文回读确认"""
+        self.radar_config.on_sent(transaction)
+        if transaction.done:
+            self.raw_text.append(f"\n[配置] {transaction.describe()}")
+        else:
+            QTimer.singleShot(int(transaction.timeout * 1000) + 10, self.check_config_timeouts)
+
+    def check_config_timeouts(self):
+        for transaction in self.radar_config.check_timeouts():
+            self.raw_text.append(f"\n[配置] {transaction.describe()}")
+
+    def update_tx_stats(self, stats):
+        """显示发送队列统计"""
+        text = f"发送: {stats['sent']}条  失败: {stats['failed']}  重试: {stats['retries']}"
+        if stats['rejected']:
+            text += f"  队列满: {stats['rejected']}"
+        if 'latency_p50_ms' in stats:
+            text += f"  延迟: p50 {stats['latency_p50_ms']:.1f} / p99 {stats['latency_p99_ms']:.1f} ms"
+        self.tx_stats_label.setText(text)
+
+    def update_frame_stats(self, stats):
+        """显示各接收线程汇总的组帧统计"""
+        self.frame_stats.update(stats)
+        items = self.frame_stats.values()
+        with_header = sum(s['frames'] - s['headerless'] for s in items)
+        if not with_header:
+            self.frame_stats_label.setText("帧完整率: -- (无列表头)")
             return
-            
-        # 应用所有当前配置
-        distances = [15, 25, 50, 70]
-        self.radar_config.set_distance_range(distances[self.distance_combo.currentIndex()])
-        
-        resolutions = [0.4, 0.2]
-        self.radar_config.set_angle_resolution(resolutions[self.resolution_combo.currentIndex()])
-        
-        self.radar_config.set_measurement_mode(self.mode_combo.currentIndex())
-        self.radar_config.set_sensor_id(self.id_spin.value())
-        self.radar_config.set_output_mode(self.output_combo.currentIndex())
-        
-        rates = [10, 20, 25, 33, 50]
-        self.radar_config.set_update_rate(rates[self.rate_combo.currentIndex()])
-        
-        self.radar_config.set_cluster_config()
-        self.radar_config.set_target_config(rcs_threshold=self.rcs_slider.value())
-        
-        # 显示配置成功消息
-        self.raw_text.append("\n[配置] 已应用所有雷达配置参数")
-        
+        complete = sum(s['complete'] for s in items)
+        self.frame_stats_label.setText(
+            f"帧完整率: {complete / with_header:.1%}  缺失: {sum(s['missing'] for s in items)}"
+            f"  迟到: {sum(s['late'] for s in items)}  丢周期: {sum(s['lost_cycles'] for s in items)}")
+
     def update_radar_status(self, status):
-        # 状态更新函数保留但不再使用
-        pass
+        """状态报文用于确认配置下发，只使用配置目标雷达（第一个通道的第一个雷达）的状态"""
+        if not self.radar_threads or status.get('sensor') != self.radar_threads[0].sensors[0].index:
+            return
+        for transaction in self.radar_config.on_status(status):
+            self.raw_text.append(f"\n[配置] {transaction.describe()}")
         
     def add_alarm_zone(self):
         """添加矩形报警区域"""
         # 默认在原点附近一个矩形
         zone = (-10, -5, 10, 5)  # (x_min, y_min, x_max, y_max)
-        self.alarm_zones.append(zone)
+        self.add_zone_roi(zone)
+        self.update_alarm_zones()
         
-        # 在2D图上绘制区域
-        rect = pg.RectROI(
-            [zone[0], zone[1]], 
-            [zone[2]-zone[0], zone[3]-zone[1]],
-            pen=pg.mkPen('r', width=2),
-            movable=True,  # 允许用户移动区域
-            resizable=True  # 允许用户调整大小
-        )
+        self.raw_text.append(f"添加报警区域: {describe_zone(zone)}")
+
+    def add_zone_roi(self, zone):
+        """记录报警区域并在2D图上绘制，矩形用RectROI，多边形用PolyLineROI"""
+        self.alarm_zones.append(zone)
+        if is_polygon(zone):
+            rect = pg.PolyLineROI(
+                zone,
+                closed=True,
+                pen=pg.mkPen('r', width=2),
+                movable=True
+            )
+        else:
+            rect = pg.RectROI(
+                [zone[0], zone[1]], 
+                [zone[2]-zone[0], zone[3]-zone[1]],
+                pen=pg.mkPen('r', width=2),
+                movable=True,  # 允许用户移动区域
+                resizable=True  # 允许用户调整大小
+            )
         rect.setZValue(-10)  # 确保在点之下
+        # 拖动或调整大小结束后以ROI的实际位置更新报警区域
+        rect.sigRegionChangeFinished.connect(self.on_zone_roi_changed)
         self.plot_2d.addItem(rect)
         self.alarm_rects.append(rect)  # 保存ROI对象以便后续删除
-        
-        self.raw_text.append(f"添加报警区域: X={zone[0]}~{zone[2]}m, Y={zone[1]}~{zone[3]}m")
+
+    def zone_from_roi(self, rect):
+        """从ROI当前状态得到报警区域（2D图坐标）"""
+        if isinstance(rect, pg.PolyLineROI):
+            points = [rect.mapToParent(handle.pos()) for handle in rect.getHandles()]
+            return [[round(p.x(), 3), round(p.y(), 3)] for p in points]
+        pos, size = rect.pos(), rect.size()
+        x1, y1 = pos.x(), pos.y()
+        x2, y2 = x1 + size.x(), y1 + size.y()
+        return tuple(round(v, 3) for v in (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+
+    def on_zone_roi_changed(self, rect):
+        """报警区域ROI被编辑后更新区域并重建索引"""
+        if rect not in self.alarm_rects:
+            return
+        self.alarm_zones[self.alarm_rects.index(rect)] = self.zone_from_roi(rect)
+        self.update_alarm_zones()
+
+    def update_alarm_zones(self):
+        """报警区域改变后重建检测用的区域集合和空间索引"""
+        self.alarm_zone_set = ZoneSet(self.alarm_zones)
+        self.alarm_monitor.set_zones(self.alarm_zone_set)
+
+    def on_alarm_times_changed(self, value):
+        if hasattr(self, 'alarm_monitor'):
+            self.alarm_monitor.set_times(self.alarm_dwell_spin.value(), self.alarm_hold_spin.value())
+
+    def handle_alarm_events(self, events):
+        """处理报警线程产生的事件，更新指示灯并记录"""
+        for event in events:
+            if event.kind == 'enter':
+                self.active_zones.add(event.zone)
+                self.raw_text.append(f"[报警] 区域{event.zone + 1} 目标进入 {event.targets}")
+            else:
+                self.active_zones.discard(event.zone)
+                self.raw_text.append(f"[报警] 区域{event.zone + 1} 报警解除")
+        alarm_triggered = bool(self.active_zones)
+        if alarm_triggered != self.alarm_active:
+            self.alarm_active = alarm_triggered
+            self.set_alarm_color(alarm_triggered)
+            if alarm_triggered:
+                # 播放报警声音
+                QtWidgets.QApplication.beep()
 
     def remove_last_alarm_zone(self):
         """删除最近添加的报警区域"""
@@ -690,8 +1167,9 @@ class RadarGUI(QtWidgets.QMainWindow):
         zone = self.alarm_zones.pop()
         rect = self.alarm_rects.pop()
         self.plot_2d.removeItem(rect)
+        self.update_alarm_zones()
         
-        self.raw_text.append(f"删除报警区域: X={zone[0]}~{zone[2]}m, Y={zone[1]}~{zone[3]}m")
+        self.raw_text.append(f"删除报警区域: {describe_zone(zone)}")
         
     def clear_all_alarm_zones(self):
         """清除所有报警区域"""
@@ -704,23 +1182,18 @@ class RadarGUI(QtWidgets.QMainWindow):
             rect = self.alarm_rects.pop()
             self.plot_2d.removeItem(rect)
         self.alarm_zones.clear()
+        self.update_alarm_zones()
         
         self.raw_text.append(f"已清除所有报警区域 ({count}个)")
         
     def clear_target_tracks(self):
         """清除所有目标轨迹"""
-        # 清除轨迹线
-        for line in self.track_lines:
-            self.plot_2d.removeItem(line)
-        self.track_lines = []
-        
-        # 清除轨迹数据
-        if self.target_tracks:
+        if len(self.target_tracks):
             count = len(self.target_tracks)
-            self.target_tracks.clear()
+            self.track_lines.clear()
+            for tracker in self.trackers.values():
+                tracker.clear()
             self.raw_text.append(f"已清除所有目标轨迹 ({count}条)")
-            # 刷新显示
-            self.refresh_plots()
         else:
             self.raw_text.append("无目标轨迹可清除")
 
@@ -731,11 +1204,26 @@ class RadarGUI(QtWidgets.QMainWindow):
         self.point_cloud.filter_distance = value
         self.cloud_filter_value.setText(f"{value}m")
         
+    def on_cloud_color_changed(self, index):
+        self.point_cloud.set_color_mode(COLOR_MODES[index])
+        self.frame_pending = bool(self.sensor_frames)
+        self.render_scheduler.request()
+
+    def on_cloud_accumulate_changed(self, index):
+        self.point_cloud.set_accumulation(*self.CLOUD_ACCUMULATION[index])
+        self.cloud_frames.clear()
+
     def toggle_tracks(self):
         self.track_visible = self.toggle_tracks_action.isChecked()
-        # 刷新显示
-        self.refresh_plots()
+        self.track_lines.set_visible(self.track_visible)
         
+    def toggle_tracking(self):
+        """切换轨迹来源（跟踪航迹/雷达目标ID），两者的轨迹ID不同，切换时清除现有轨迹"""
+        self.track_lines.clear()
+        for tracker in self.trackers.values():
+            tracker.clear()
+        self.track_clock = None
+
     def save_config(self):
         config = {
             'distance': self.distance_combo.currentIndex(),
@@ -748,8 +1236,15 @@ class RadarGUI(QtWidgets.QMainWindow):
             'point_size': self.size_slider.value(),
             'cloud_filter_enabled': self.cloud_filter_check.isChecked(),
             'cloud_filter_distance': self.cloud_filter_slider.value(),
+            'cloud_color': COLOR_MODES[self.cloud_color_combo.currentIndex()],
+            'cloud_accumulation': self.CLOUD_ACCUMULATION[self.cloud_accumulate_combo.currentIndex()],
             'track_visible': self.toggle_tracks_action.isChecked(),
-            'alarm_zones': self.alarm_zones  # 保存报警区域配置
+            'tracking': self.tracking_action.isChecked(),
+            'receive_process': self.process_check.isChecked(),
+            'alarm_zones': self.alarm_zones,  # 保存报警区域配置
+            'alarm_dwell': self.alarm_dwell_spin.value(),
+            'alarm_hold': self.alarm_hold_spin.value(),
+            'sensors': [sensor.to_dict() for sensor in self.sensors]  # 多雷达配置
         }
         
         file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
@@ -774,18 +1269,29 @@ class RadarGUI(QtWidgets.QMainWindow):
                 with open(file_path, 'r') as f:
                     config = json.load(f)
                 
-                # 应用配置到UI
-                self.distance_combo.setCurrentIndex(config['distance'])
-                self.resolution_combo.setCurrentIndex(config['resolution'])
-                self.mode_combo.setCurrentIndex(config['mode'])
-                self.id_spin.setValue(config['id'])
-                self.output_combo.setCurrentIndex(config['output'])
-                self.rate_combo.setCurrentIndex(config['rate'])
-                self.rcs_slider.setValue(config['rcs'])
+                # 应用配置到UI，雷达参数的变化合并为一次下发
+                with self.radar_config.transaction():
+                    self.distance_combo.setCurrentIndex(config['distance'])
+                    self.resolution_combo.setCurrentIndex(config['resolution'])
+                    self.mode_combo.setCurrentIndex(config['mode'])
+                    self.set_id_spin(min(config['id'], MAX_SENSOR_ID))
+                    self.output_combo.setCurrentIndex(config['output'])
+                    self.rate_combo.setCurrentIndex(config['rate'])
+                    self.rcs_slider.setValue(config['rcs'])
                 self.size_slider.setValue(config['point_size'])
                 self.cloud_filter_check.setChecked(config['cloud_filter_enabled'])
                 self.cloud_filter_slider.setValue(config['cloud_filter_distance'])
+                if config.get('cloud_color') in COLOR_MODES:
+                    self.cloud_color_combo.setCurrentIndex(COLOR_MODES.index(config['cloud_color']))
+                accumulation = tuple(config.get('cloud_accumulation', ()))
+                if accumulation in self.CLOUD_ACCUMULATION:
+                    self.cloud_accumulate_combo.setCurrentIndex(self.CLOUD_ACCUMULATION.index(accumulation))
                 self.toggle_tracks_action.setChecked(config['track_visible'])
+                if config.get('tracking', True) != self.tracking_action.isChecked():
+                    self.tracking_action.setChecked(config.get('tracking', True))
+                    self.toggle_tracking()
+                if self.process_check.isEnabled():
+                    self.process_check.setChecked(config.get('receive_process', False))
                 
                 # 更新点云滤波
                 self.toggle_cloud_filter(self.cloud_filter_check.checkState())
@@ -798,20 +1304,20 @@ class RadarGUI(QtWidgets.QMainWindow):
                     self.clear_all_alarm_zones()
                     # 添加新区域
                     for zone in config['alarm_zones']:
-                        self.alarm_zones.append(zone)
-                        rect = pg.RectROI(
-                            [zone[0], zone[1]], 
-                            [zone[2]-zone[0], zone[3]-zone[1]],
-                            pen=pg.mkPen('r', width=2),
-                            movable=True,
-                            resizable=True
-                        )
-                        rect.setZValue(-10)
-                        self.plot_2d.addItem(rect)
-                        self.alarm_rects.append(rect)
+                        self.add_zone_roi(zone)
+                    self.update_alarm_zones()
                     
                     self.raw_text.append(f"加载报警区域: {len(config['alarm_zones'])}个")
+                if 'alarm_dwell' in config:
+                    self.alarm_dwell_spin.setValue(config['alarm_dwell'])
+                    self.alarm_hold_spin.setValue(config['alarm_hold'])
                 
+                # 加载多雷达配置（下次启动时生效）
+                if 'sensors' in config:
+                    self.set_sensors(load_sensors(config['sensors']))
+                    if self.sensors:
+                        self.raw_text.append(f"加载多雷达配置: {len(self.sensors)}个传感器")
+
                 # 应用配置到雷达
                 self.apply_config()
                 
@@ -821,4 +1327,6 @@ class RadarGUI(QtWidgets.QMainWindow):
 
     def closeEvent(self, event):
         self.stop_radar()
+        self.stop_recording()
+        self.alarm_monitor.stop()
         super().closeEvent(event)
\ No newline at end of file
@@ -0,0 +1,316 @@
+# radar_process.py
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from PyQt5.QtCore import QObject, pyqtSignal
+from frame_ring import FrameRing, copy_frame
+from radar_receiver import RadarReceiver
+from recorder import CaptureRecorder
+
+# 子进程 -> 界面进程的事件: (类型, 参数...)
+#   ('frames',) 环形缓冲区有新帧；('status', str)；('no_data',)；('raw', RAW_FRAME_DTYPE数组)
+#   ('radar_status', dict)；('frame_stats', dict)；('tx_stats', dict)
+#   ('config_sent', 序号, errors, latencies, sent_time)；('recording', 路径, 写入块数, 丢弃块数, 错误)
+#   ('exit',) 子进程结束
+# 界面进程 -> 子进程的命令:
+#   ('output_mode', int)；('receive_all', bool)；('raw_streaming', bool)；('config', 序号, ConfigTransaction)
+#   ('record', 路径或None)；('stop',)
+
+
+def _receiver_main(ring_name, worker_args, commands, events):
+    """子进程入口: 每个CAN通道一个接收线程，解析后的帧写入共享内存，其他数据经事件队列返回
+
+    子进程只使用不依赖Qt的 RadarReceiver，回调在接收线程中直接调用。
+    """
+    ring = FrameRing(ring_name)
+    ring_lock = threading.Lock()  # 多个接收线程共用一个写入方
+    workers = [RadarReceiver(**args) for args in worker_args]
+    transactions = {}  # {ConfigTransaction: 界面进程中的序号}
+    recorder = None
+
+    def on_frame(frame):
+        with ring_lock:
+            ring.write(frame)
+        events.put(('frames',))
+
+    def on_config_sent(transaction):
+        key = transactions.pop(transaction)
+        events.put(('config_sent', key, transaction.errors, transaction.latencies, transaction.sent_time))
+
+    def stop_recorder():
+        if recorder:
+            for worker in workers:
+                worker.recorder = None
+            recorder.stop()
+            events.put(('recording', recorder.path, recorder.written_chunks, recorder.dropped_chunks, None))
+
+    for worker in workers:
+        worker.on_frame = on_frame
+        worker.on_raw_frames = lambda records: events.put(('raw', records))
+        worker.on_no_data = lambda: events.put(('no_data',))
+        worker.on_status = lambda status: events.put(('status', status))
+        worker.on_radar_status = lambda status: events.put(('radar_status', status))
+        worker.on_frame_stats = lambda stats: events.put(('frame_stats', stats))
+        worker.on_tx_stats = lambda stats: events.put(('tx_stats', stats))
+        worker.on_config_sent = on_config_sent
+    threads = [threading.Thread(target=worker.run, name=f"RadarReceiver-{worker.channel}", daemon=True)
+               for worker in workers]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while any(thread.is_alive() for thread in threads):
+            try:
+                command, *args = commands.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if command == 'stop':
+                break
+            elif command == 'output_mode':
+                for worker in workers:
+                    worker.set_output_mode(args[0])
+            elif command == 'receive_all':
+                for worker in workers:
+                    worker.set_receive_all(args[0])
+            elif command == 'raw_streaming':
+                for worker in workers:
+                    worker.raw_streaming = args[0]
+            elif command == 'config':
+                key, transaction = args
+                transactions[transaction] = key
+                workers[0].send_config(transaction)
+            elif command == 'record':
+                stop_recorder()
+                recorder = None
+                if args[0]:
+                    try:
+                        recorder = CaptureRecorder(args[0])
+                        recorder.start()
+                    except OSError as e:
+                        recorder = None
+                        events.put(('recording', args[0], 0, 0, str(e)))
+                    for worker in workers:
+                        worker.recorder = recorder
+    finally:
+        for worker in workers:
+            worker.running = False
+        for thread in threads:
+            thread.join(2.0)
+        stop_recorder()
+        ring.close()
+        events.put(('exit',))
+
+
+class RadarProcess(QObject):
+    """在子进程中运行全部CAN通道的接收、解析和录制，界面进程中的替身
+
+    信号和 running/recorder/alarm_monitor/send_config/set_output_mode 等接口与
+    RadarWorker 一致，可直接替换界面的接收线程。子进程不受界面绘图占用GIL的影响，
+    按时接收报文；解析出的帧经 FrameRing 共享内存传回，本进程的读取线程复制后
+    提交报警线程并发出 new_frame（见 _take_frames），原始报文、其他数据和命令经
+    multiprocessing 队列序列化传递。
+    """
+
+    new_target = pyqtSignal(list)  # 子进程只工作在整帧模式，不发出逐目标信号
+    new_frame = pyqtSignal(object)
+    raw_frames = pyqtSignal(object)
+    no_data = pyqtSignal()
+    status_signal = pyqtSignal(str)
+    radar_status = pyqtSignal(dict)
+    frame_stats = pyqtSignal(dict)
+    config_sent = pyqtSignal(object)
+    tx_stats = pyqtSignal(dict)
+
+    def __init__(self, worker_args, ring_slots=256, ring_capacity=65536):
+        """worker_args: 每个通道的 RadarReceiver 参数字典，batch_frames 固定为True"""
+        super().__init__()
+        self.worker_args = [dict(args, batch_frames=True) for args in worker_args]
+        self.sensors = [sensor for args in self.worker_args for sensor in args.get('sensors') or []]
+        self.ring = FrameRing(slots=ring_slots, capacity=ring_capacity)
+        self.alarm_monitor = None
+        self.latencies = []  # 最近帧从子进程写入到本进程取出的时间 (秒)
+        self._raw_streaming = self.worker_args[0].get('raw_streaming', True)
+        self._recorder = None
+        self._recorders = {}  # {路径: 已通知子进程录制、尚未收到结果的录制器}
+        self._transactions = {}  # {序号: ConfigTransaction}
+        self._keys = itertools.count()
+        context = multiprocessing.get_context('spawn')  # 界面进程有Qt线程，不能fork
+        self._commands = context.Queue()
+        self._events = context.Queue()
+        self._process = context.Process(
+            target=_receiver_main, name="RadarReceiver", daemon=True,
+            args=(self.ring.name, self.worker_args, self._commands, self._events))
+        self._reader = threading.Thread(target=self._read_events, name="RadarProcessReader", daemon=True)
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._process.start()
+        self._reader.start()
+        if self._recorder:
+            self._send_record(self._recorder)
+
+    def isRunning(self):
+        return self._reader.is_alive()
+
+    def wait(self, msecs=None):
+        self._reader.join(None if msecs is None else msecs / 1000)
+        return not self._reader.is_alive()
+
+    def quit(self):
+        if self._process.is_alive():
+            self._process.join(1.0)
+        if self._process.is_alive():
+            self._process.terminate()
+
+    @property
+    def running(self):
+        return self._running
+
+    @running.setter
+    def running(self, value):
+        if self._running and not value:
+            self._commands.put(('stop',))
+        self._running = value
+
+    @property
+    def raw_streaming(self):
+        return self._raw_streaming
+
+    @raw_streaming.setter
+    def raw_streaming(self, enabled):
+        self._raw_streaming = enabled
+        self._commands.put(('raw_streaming', enabled))
+
+    @property
+    def recorder(self):
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, recorder):
+        """录制在子进程中进行，这里只把文件路径交给子进程（recorder 为 RemoteRecorder）"""
+        self._recorder = recorder
+        if self._process.is_alive():
+            self._send_record(recorder)
+
+    def _send_record(self, recorder):
+        if recorder is not None:
+            self._recorders[recorder.path] = recorder
+            recorder.attach()
+        self._commands.put(('record', recorder.path if recorder else None))
+
+    def set_output_mode(self, mode):
+        self._commands.put(('output_mode', mode))
+
+    def set_receive_all(self, enabled):
+        self._commands.put(('receive_all', enabled))
+
+    def send_config(self, transaction):
+        """配置下发交给子进程中第一个通道的接收线程，发送结果写回原ConfigTransaction"""
+        key = next(self._keys)
+        self._transactions[key] = transaction
+        self._commands.put(('config', key, transaction))
+
+    def _read_events(self):
+        """读取线程: 取出新帧和子进程事件，转换为信号"""
+        while True:
+            try:
+                event, *args = self._events.get(timeout=1.0)
+            except queue.Empty:
+                if self._process.exitcode is None:
+                    continue
+                break  # 子进程异常退出
+            if event == 'frames':
+                self._take_frames()
+            elif event == 'exit':
+                self._take_frames()
+                break
+            elif event == 'raw':
+                if self._raw_streaming:
+                    self.raw_frames.emit(args[0])
+            elif event == 'status':
+                self.status_signal.emit(args[0])
+            elif event == 'no_data':
+                self.no_data.emit()
+            elif event == 'radar_status':
+                self.radar_status.emit(args[0])
+            elif event == 'frame_stats':
+                self.frame_stats.emit(args[0])
+            elif event == 'tx_stats':
+                self.tx_stats.emit(args[0])
+            elif event == 'config_sent':
+                key, errors, latencies, sent_time = args
+                transaction = self._transactions.pop(key)
+                transaction.errors.update(errors)
+                transaction.latencies.update(latencies)
+                transaction.sent_time = sent_time  # time.monotonic() 为系统时钟，跨进程可比
+                self.config_sent.emit(transaction)
+            elif event == 'recording':
+                recorder = self._recorders.pop(args[0], None)
+                if recorder is not None:
+                    recorder.finished(*args[1:])
+        self._running = False
+        for recorder in self._recorders.values():
+            recorder.finished(0, 0, "接收进程已退出")
+        self._recorders.clear()
+        self.ring.close()
+
+    def _take_frames(self):
+        """读取共享内存中的新帧
+
+        共享内存只省去了目标帧的序列化和管道传输，交给界面的并不是零拷贝视图：
+        报警线程和界面都会保留帧（界面保存各雷达最新帧用于融合显示，报警队列和点云
+        累积各最多保留64帧），写入方不知道读取方何时用完，绕回后视图会被覆盖，
+        无法做到只在被覆盖时才复制，因此在这里每帧按字节复制一次；复制前后帧都有效才发出。
+        原始报文('raw')和其他事件仍经 multiprocessing 队列序列化传递。
+        """
+        now = time.monotonic()
+        for seq, view in self.ring.read():
+            frame = copy_frame(view)
+            if not self.ring.valid(seq):
+                self.ring.dropped += 1
+                continue
+            self.latencies.append(self.ring.latency(seq, now))
+            monitor = self.alarm_monitor
+            if monitor:
+                monitor.submit(frame)
+            self.new_frame.emit(frame)
+        del self.latencies[:-256]
+
+
+class RemoteRecorder:
+    """子进程录制时界面进程中的替身，接口与 CaptureRecorder 的 start/stop 一致
+
+    start 只检查文件能否创建（overwrite 为True时清空已有文件）；录制由接收子进程完成
+    （追加写入，重新启动接收后继续），stop 等待子进程报告写入的块数。接收未启动时只记录路径。
+    """
+
+    def __init__(self, path, timeout=2.0, overwrite=False):
+        self.path = path
+        self.overwrite = overwrite
+        self.timeout = timeout  # stop 等待子进程结束录制的时间 (秒)
+        self.written_chunks = 0
+        self.dropped_chunks = 0
+        self.error = None
+        self._finished = threading.Event()
+        self._finished.set()
+
+    def start(self):
+        open(self.path, 'wb' if self.overwrite else 'ab').close()
+
+    def stop(self):
+        """等待子进程报告录制结果，调用前应已将接收进程的 recorder 置为None"""
+        self._finished.wait(self.timeout)
+
+    def attach(self):
+        """RadarProcess 通知子进程开始录制时调用"""
+        self._finished.clear()
+
+    def finished(self, written, dropped, error):
+        """读取线程收到子进程的录制结果时调用"""
+        self.written_chunks += written
+        self.dropped_chunks += dropped
+        self.error = error
+        self._finished.set()
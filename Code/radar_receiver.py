@@ -0,0 +1,354 @@
+# radar_receiver.py
+import can
+from datetime import datetime
+import sys
+import time
+from frame_assembler import FrameBuilder
+from radar_decoder import (GENERAL_KINDS, KIND_CLUSTER, KIND_TARGET, LIST_HEADER_KINDS, OBJECT_STATUS_ID,
+                           OUTPUT_MODE_IDS, QUALITY_KINDS, RADAR_STATUS_ID, TARGET_IDS, can_filters_for_mode,
+                           decode_frame)
+from raw_log import RawFrameBatch
+from replay import ReplayBus, is_replay_source
+from sensors import SensorConfig, sensor_message_id
+from tx_queue import TxQueue
+
+
+class RadarReceiver:
+    """CAN接收、组帧解析和发送循环，不依赖Qt
+
+    run() 在调用线程中阻塞运行，running 置为False后退出。解析结果通过回调交给使用方，
+    回调在接收线程中调用，不能阻塞:
+        on_target([x, y, z, tid])  逐条模式下的单个目标
+        on_frame(FRAME_DTYPE数组)  整帧模式下的一帧扫描
+        on_raw_frames(RAW_FRAME_DTYPE数组)  原始报文批量
+        on_no_data()  长时间无数据
+        on_status(str)  connected/active/inactive/error
+        on_radar_status(dict)  雷达状态报文
+        on_frame_stats({列表名: FrameStats.to_dict()})  组帧统计，每秒一次
+        on_config_sent(ConfigTransaction)  一次配置下发发送完成
+        on_tx_stats(TxStats.to_dict())  发送队列统计，有发送时每秒一次
+    两种模式都按列表头组帧，整帧交给报警线程(alarm_monitor)和录制器(recorder)；
+    batch_frames 只决定界面收到整帧(on_frame)还是逐条目标(on_target)。
+    界面中由 RadarWorker 包装为Qt信号，无界面时由 radar_daemon 直接使用。
+    """
+
+    def __init__(self, channel='PCAN_USBBUS1', bitrate=500000,
+                 batch_frames=False, list_header=True, frame_window=0.05, replay_speed=1.0,
+                 interface=None, output_mode=1, receive_all=False,
+                 raw_streaming=True, raw_interval=0.1, sensors=None):
+        # 解析接口类型
+        self.bitrate = bitrate
+        self.running = True
+        self.can_bus = None
+        self.last_message_time = None
+
+        # 本通道上的雷达(SensorConfig列表)，报文ID按传感器ID偏移区分
+        self.sensors = sensors or [SensorConfig(channel=channel)]
+
+        # 组帧: 按列表头中的报文数收齐一帧；没有列表头时目标ID重复或
+        # 超过时间窗口即结束一帧。每个雷达的目标列表和聚类列表分别组帧，
+        # batch_frames为True时整帧发送给界面，否则逐条发送
+        # list_header为False时0x60A按目标报文解析（不发送列表头的旧固件）
+        self.batch_frames = batch_frames
+        self.list_header = list_header
+        self.frame_window = frame_window  # 秒
+        general_kinds = dict(GENERAL_KINDS)
+        header_kinds = dict(LIST_HEADER_KINDS)
+        if not list_header:
+            general_kinds[OBJECT_STATUS_ID] = header_kinds.pop(OBJECT_STATUS_ID)
+        self._builders = []
+        self._target_ids = {}  # {目标/聚类报文ID: FrameBuilder}
+        self._quality_ids = {}  # {质量报文ID: FrameBuilder}
+        self._header_ids = {}  # {列表头报文ID: FrameBuilder}
+        self._status_ids = {}  # {状态报文ID: SensorConfig}
+        for sensor in self.sensors:
+            builders = {kind: FrameBuilder(sensor, kind, frame_window) for kind in (KIND_TARGET, KIND_CLUSTER)}
+            self._builders.extend(builders.values())
+            for ids, kinds in ((self._target_ids, general_kinds), (self._quality_ids, QUALITY_KINDS),
+                               (self._header_ids, header_kinds)):
+                for base_id, kind in kinds.items():
+                    ids[sensor_message_id(base_id, sensor.sensor_id)] = builders[kind]
+            self._status_ids[sensor_message_id(RADAR_STATUS_ID, sensor.sensor_id)] = sensor
+        self.stats_interval = 1.0  # 秒
+        self.idle_time = 0.1  # 超过该时间没有报文显示为无数据 (秒)
+        self.no_data_time = 5.0  # 超过该时间没有报文时提示检查连接 (秒)
+        self._stats_time = 0.0
+
+        # 录制器(CaptureRecorder)，由界面线程设置，None表示不录制
+        self.recorder = None
+        # 报警判断线程(AlarmMonitor)，每帧解析完成后直接提交，不经过界面线程
+        self.alarm_monitor = None
+        self.replay_speed = replay_speed  # 回放倍速，0为尽快回放
+
+        # 接收过滤: 默认只接收当前输出模式下需要解析的报文ID
+        self.output_mode = output_mode
+        self.receive_all = receive_all  # 是否接收总线上的全部报文（用于原始报文显示）
+        self._filters_changed = False
+        self._update_quality_kinds()
+
+        # 原始报文按批发送给界面，raw_streaming为False时不发送
+        self.raw_streaming = raw_streaming
+        self.raw_interval = raw_interval  # 秒
+        self._raw_batch = RawFrameBatch()
+        self._status = None
+
+        # 发送队列: 其他线程只入队，由本线程在两次recv之间发送，总线只在本线程中访问
+        self.tx_queue = TxQueue()
+        self._tx_reported = None
+
+        self.on_target = None
+        self.on_frame = None
+        self.on_raw_frames = None
+        self.on_no_data = None
+        self.on_status = None
+        self.on_radar_status = None
+        self.on_frame_stats = None
+        self.on_config_sent = None
+        self.on_tx_stats = None
+        
+        # 根据操作系统和通道名称确定接口类型
+        if interface:
+            # 显式指定python-can接口类型，例如测试用的virtual
+            self.interface = interface
+            self.channel = channel
+        elif is_replay_source(channel):
+            # 录制文件回放，不需要CAN硬件
+            self.interface = 'replay'
+            self.channel = channel
+        elif sys.platform.startswith('linux'):
+            # Linux下使用socketcan接口
+            self.interface = 'socketcan'
+            self.channel = channel  # 例如: 'can0'
+        else:
+            # Windows系统
+            if "Kvaser" in channel:
+                self.interface = 'kvaser'
+                self.channel = int(channel.split('_')[-1])  # 提取通道号
+            else:
+                self.interface = 'pcan'
+                self.channel = channel  # PCAN通道名
+
+    def run(self):
+        try:
+            if self.interface == 'replay':
+                # 回放录制文件
+                self.can_bus = ReplayBus(self.channel, speed=self.replay_speed,
+                                         can_filters=self.receive_filters())
+            else:
+                # 动态创建总线实例
+                bus_args = {
+                    'bitrate': self.bitrate,
+                    'can_filters': self.receive_filters()
+                }
+
+                if self.interface == 'socketcan':
+                    # Linux: socketcan
+                    bus_args['interface'] = 'socketcan'
+                    bus_args['channel'] = self.channel
+                    bus_args['receive_own_messages'] = True
+                else:
+                    # Windows: pcan or kvaser，或显式指定的接口
+                    bus_args['interface'] = self.interface
+                    bus_args['channel'] = self.channel
+                    if self.interface == 'kvaser':
+                        bus_args['bus_type'] = "CAN"  # 明确总线类型
+
+                self.can_bus = can.interface.Bus(**bus_args)
+            self.set_status("connected")  # 连接成功
+
+            # 初始检测是否有数据
+            initial_check = True
+            # 有报文待发送时recv会提前返回，无数据判断按实际经过的时间而不是recv次数
+            last_received = last_check = time.monotonic()
+
+            while self.running:
+                if self._filters_changed:
+                    # 过滤器在工作线程中更新，避免与recv并发访问总线
+                    self._filters_changed = False
+                    self.can_bus.set_filters(self.receive_filters())
+                    self._update_quality_kinds()
+                self.tx_queue.drain(self.can_bus)
+                # 有报文待发送时缩短等待，按间隔继续发送
+                wait = self.tx_queue.wait_time()
+                msg = self.can_bus.recv(timeout=0.1 if wait is None else min(wait, 0.1))
+                recorder = self.recorder
+                if msg:
+                    self.last_message_time = datetime.now()
+                    last_received = time.monotonic()
+                    self.set_status("active")  # 数据活跃
+                    # 原始报文以二进制形式批量发送，由界面只格式化显示的行
+                    timestamp = msg.timestamp or time.time()
+                    data = bytes(msg.data)
+                    if self.raw_streaming and self._raw_batch.append(timestamp, msg.arbitration_id, data):
+                        self.flush_raw()
+                    if recorder:
+                        recorder.add_frame(timestamp, msg.arbitration_id, data)
+
+                    builder = self._target_ids.get(msg.arbitration_id)
+                    if builder is not None:
+                        if not self.batch_frames:
+                            # 逐条模式下每条报文立即解析发给界面
+                            record = self.parse_message(data, builder.sensor, timestamp, builder.kind)
+                            if record is not None:
+                                self._notify(self.on_target, [float(record['x'][0]), float(record['y'][0]),
+                                                      float(record['z'][0]), int(record['tid'][0])])
+                        # 先缓存负载，帧结束时批量解析
+                        self.emit_frame(builder.add(data, timestamp))
+                    elif msg.arbitration_id in self._quality_ids:
+                        self.emit_frame(self._quality_ids[msg.arbitration_id].add_quality(data))
+                    elif msg.arbitration_id in self._header_ids:
+                        # 列表头标志新一轮扫描开始
+                        for frame in self._header_ids[msg.arbitration_id].header(data):
+                            self.emit_frame(frame)
+                    elif msg.arbitration_id in self._status_ids and msg.is_rx:  # 0x201为雷达状态消息，忽略本机发送的同ID配置报文
+                        status = self.parse_radar_status(msg.data)
+                        status['sensor'] = self._status_ids[msg.arbitration_id].index
+                        self._notify(self.on_radar_status, status)
+
+                    # 如果初始检测时收到数据，取消初始检测状态
+                    if initial_check:
+                        initial_check = False
+                else:
+                    now = time.monotonic()
+                    if now - last_received >= self.idle_time:
+                        self.set_status("inactive")  # 无数据
+                    # 每5秒检查一次是否有数据
+                    if now - last_check >= self.no_data_time:
+                        last_check = now
+                        if initial_check or now - last_received > self.no_data_time:
+                            self._notify(self.on_no_data)
+
+                if recorder:
+                    recorder.tick()
+                if len(self._raw_batch) and time.monotonic() - self._raw_batch.started >= self.raw_interval:
+                    self.flush_raw()
+
+                # 超过时间窗口仍未结束的帧直接发送
+                now = time.monotonic()
+                for builder in self._builders:
+                    self.emit_frame(builder.expire(now))
+                if now - self._stats_time >= self.stats_interval:
+                    self._stats_time = now
+                    self._notify(self.on_frame_stats, {b.name: b.stats.to_dict() for b in self._builders if b.stats.frames})
+                    self.report_tx_stats()
+
+        except Exception as e:
+            print(f"CAN Error:", e)
+            self.set_status("error")  # 错误状态
+            self._notify(self.on_no_data)
+        finally:
+            self.tx_queue.clear("总线已关闭")
+            self.report_tx_stats()
+            for builder in self._builders:
+                self.emit_frame(builder.flush())
+            self.flush_raw()
+            if self.can_bus:
+                self.can_bus.shutdown()
+
+    @staticmethod
+    def _notify(callback, *args):
+        if callback is not None:
+            callback(*args)
+
+    def set_status(self, status):
+        """状态改变时才通知，避免每条报文都跨线程通知"""
+        if status != self._status:
+            self._status = status
+            self._notify(self.on_status, status)
+
+    def flush_raw(self):
+        """发送已缓存的原始报文"""
+        if len(self._raw_batch) == 0:
+            return
+        records = self._raw_batch.take()
+        if self.raw_streaming:
+            self._notify(self.on_raw_frames, records)
+
+    def receive_filters(self):
+        """当前的接收过滤器，None表示接收全部报文"""
+        if self.receive_all:
+            return None
+        return can_filters_for_mode(self.output_mode, sensor_ids=[sensor.sensor_id for sensor in self.sensors])
+
+    def send(self, message, callback=None):
+        """将报文加入发送队列，可在任意线程调用，不阻塞；队列满时返回False"""
+        return self.tx_queue.put(message, callback)
+
+    def send_config(self, transaction):
+        """提交一次配置下发(ConfigTransaction)，全部报文发送或失败后调用 on_config_sent"""
+        remaining = [len(transaction)]
+
+        def done(can_id, error, latency):
+            if error is not None:
+                transaction.errors[can_id] = error
+            transaction.latencies[can_id] = latency
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                transaction.sent_time = time.monotonic()
+                self._notify(self.on_config_sent, transaction)
+
+        for can_id, data in transaction.messages():
+            # 多雷达共用总线时发给目标雷达的报文ID，结果仍按配置报文ID记录
+            message = can.Message(arbitration_id=transaction.message_id(can_id), data=data, is_extended_id=False)
+            if not self.send(message, lambda message, error, latency, can_id=can_id: done(can_id, error, latency)):
+                done(can_id, "发送队列已满", 0.0)
+
+    def report_tx_stats(self):
+        """有新的发送记录时发送统计"""
+        stats = self.tx_queue.stats
+        counts = (stats.sent, stats.failed, stats.rejected)
+        if any(counts) and counts != self._tx_reported:
+            self._tx_reported = counts
+            self._notify(self.on_tx_stats, stats.to_dict())
+
+    def set_output_mode(self, mode):
+        """雷达输出模式改变时更新接收过滤器"""
+        self.output_mode = mode
+        self._filters_changed = True
+
+    def _update_quality_kinds(self):
+        """按输出模式设置各目标列表是否等待质量报文收齐后才结束一帧，在接收线程中调用"""
+        mode_ids = OUTPUT_MODE_IDS.get(self.output_mode, TARGET_IDS)
+        for quality_id, kind in QUALITY_KINDS.items():
+            for builder in self._builders:
+                if builder.kind == kind:
+                    builder.quality = quality_id in mode_ids
+
+    def set_receive_all(self, enabled):
+        """切换是否接收非雷达报文"""
+        self.receive_all = enabled
+        self._filters_changed = True
+
+    def emit_frame(self, frame):
+        """发送一帧完整扫描并交给报警线程和录制器，frame为None时忽略；逐条模式下不发给界面"""
+        if frame is None:
+            return
+        if self.batch_frames:
+            self._notify(self.on_frame, frame)
+        monitor = self.alarm_monitor
+        if monitor:
+            monitor.submit(frame)
+        recorder = self.recorder
+        if recorder:
+            recorder.add_targets(frame)
+
+    def parse_message(self, data, sensor=None, timestamp=0.0, kind=0):
+        """解析单条目标/聚类报文的全部字段，返回长度为1的FRAME_DTYPE数组"""
+        if len(data) < 7:
+            return None
+        record = decode_frame(bytes(data).ljust(8, b'\0'), timestamp, kind)
+        if sensor is not None:
+            record['x'], record['y'] = sensor.to_world(record['x'], record['y'])
+            record['vx'], record['vy'] = sensor.rotate(record['vx'], record['vy'])
+            record['z'] = sensor.z
+            record['sensor'] = sensor.index
+        return record
+            
+    def parse_radar_status(self, data):
+        """解析雷达状态信息"""
+        return {
+            'temperature': data[0] - 40,  # 温度 (°C)
+            'voltage': data[1] * 0.1,     # 电压 (V)
+            'error_code': data[2],         # 错误代码
+            'output_type': data[3] & 0x0F  # 输出类型
+        }
\ No newline at end of file
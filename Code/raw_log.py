@@ -0,0 +1,240 @@
+# raw_log.py
+from datetime import datetime, timezone
+import struct
+import time
+import numpy as np
+
+# 原始CAN报文记录的二进制结构 (每条21字节)
+RAW_FRAME_DTYPE = np.dtype([
+    ('timestamp', np.float64),
+    ('arbitration_id', np.uint32),
+    ('dlc', np.uint8),
+    ('data', np.uint8, (8,)),
+])
+# 与RAW_FRAME_DTYPE布局相同的打包格式，用于逐条写入
+RAW_FRAME_STRUCT = struct.Struct('<dIB8s')
+
+
+def format_frame(timestamp, arbitration_id, dlc, data):
+    """将一条原始报文格式化为显示文本"""
+    ts = datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    return f"[{ts}] ID:{arbitration_id:04X} Data:{bytes(data[:dlc]).hex()}"
+
+
+class RawFrameBatch:
+    """逐条打包原始报文的缓冲区，攒够一批后整体转换为RAW_FRAME_DTYPE数组"""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._buf = bytearray(capacity * RAW_FRAME_STRUCT.size)
+        self.count = 0
+        self.started = 0.0  # 第一条报文加入的时刻(time.monotonic)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, arbitration_id, data):
+        """加入一条报文，缓冲区已满时返回True"""
+        if self.count == 0:
+            self.started = time.monotonic()
+        RAW_FRAME_STRUCT.pack_into(self._buf, self.count * RAW_FRAME_STRUCT.size,
+                                   timestamp, arbitration_id, len(data), data)
+        self.count += 1
+        return self.count == self.capacity
+
+    def take(self):
+        """取出已缓存的报文记录并清空"""
+        records = np.frombuffer(bytes(self._buf[:self.count * RAW_FRAME_STRUCT.size]), dtype=RAW_FRAME_DTYPE)
+        self.count = 0
+        return records
+
+
+class _IdIndex:
+    """单个CAN ID的报文序号列表，按序号递增保存"""
+
+    def __init__(self):
+        self.seqs = np.empty(64, dtype=np.int64)
+        self.start = 0  # 第一个可能仍有效的位置
+        self.count = 0
+
+    def add(self, seq, first_seq):
+        if self.count == len(self.seqs):
+            # 先丢弃已被环形缓冲区覆盖的序号，空间仍不足时再扩容
+            self.prune(first_seq)
+            live = self.seqs[self.start:self.count]
+            if len(live) * 2 > len(self.seqs):
+                self.seqs = np.empty(len(self.seqs) * 2, dtype=np.int64)
+            self.seqs[:len(live)] = live
+            self.start, self.count = 0, len(live)
+        self.seqs[self.count] = seq
+        self.count += 1
+
+    def extend(self, seqs, first_seq):
+        needed = self.count + len(seqs)
+        if needed > len(self.seqs):
+            self.prune(first_seq)
+            live = self.seqs[self.start:self.count]
+            needed = len(live) + len(seqs)
+            if needed * 2 > len(self.seqs):
+                self.seqs = np.empty(max(len(self.seqs) * 2, needed * 2), dtype=np.int64)
+            self.seqs[:len(live)] = live
+            self.start, self.count = 0, len(live)
+        self.seqs[self.count:self.count + len(seqs)] = seqs
+        self.count += len(seqs)
+
+    def prune(self, first_seq):
+        self.start += int(np.searchsorted(self.seqs[self.start:self.count], first_seq))
+
+    def live(self, first_seq):
+        self.prune(first_seq)
+        return self.seqs[self.start:self.count]
+
+
+class RawFrameLog:
+    """定长环形缓冲区保存原始CAN报文，写满后覆盖最旧的记录
+
+    每条记录按写入顺序分配一个递增的序号，序号 total-len(self) 到 total-1
+    的记录仍在缓冲区中。每个CAN ID另外维护一份序号索引，按ID过滤时只访问
+    匹配的记录。缓冲区按需倍增，写满 capacity 条后才开始覆盖。
+    """
+
+    def __init__(self, capacity=2_000_000, initial=65536):
+        self.capacity = capacity
+        self.records = np.zeros(min(capacity, initial), dtype=RAW_FRAME_DTYPE)
+        self.total = 0  # 累计写入条数，同时是下一条记录的序号
+        self.start_time = None  # 第一条报文的时间戳
+        self._index = {}  # {arbitration_id: _IdIndex}
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def first_seq(self):
+        """缓冲区中最旧记录的序号"""
+        return self.total - len(self)
+
+    def append(self, timestamp, arbitration_id, data):
+        """写入一条报文 data: 最多8字节负载"""
+        self._reserve(self.total + 1)
+        record = self.records[self.total % self.capacity]
+        dlc = len(data)
+        record['timestamp'] = timestamp
+        record['arbitration_id'] = arbitration_id
+        record['dlc'] = dlc
+        record['data'][:dlc] = np.frombuffer(data, dtype=np.uint8)
+        record['data'][dlc:] = 0
+
+        index = self._index.get(arbitration_id)
+        if index is None:
+            index = self._index[arbitration_id] = _IdIndex()
+        index.add(self.total, self.total + 1 - self.capacity)
+        if self.start_time is None:
+            self.start_time = timestamp
+        self.total += 1
+
+    def extend(self, records):
+        """批量写入RAW_FRAME_DTYPE记录数组"""
+        if len(records) == 0:
+            return
+        if self.start_time is None:
+            self.start_time = float(records['timestamp'][0])
+        self._reserve(self.total + len(records))
+        if len(records) > self.capacity:
+            # 超过容量的部分写入后也会立即被覆盖，直接跳过
+            self.total += len(records) - self.capacity
+            records = records[-self.capacity:]
+        n = len(records)
+        pos = self.total % self.capacity
+        head = min(n, self.capacity - pos)
+        self.records[pos:pos + head] = records[:head]
+        self.records[:n - head] = records[head:]
+
+        seqs = np.arange(self.total, self.total + n, dtype=np.int64)
+        self.total += n
+        first_seq = self.total - self.capacity
+        ids = records['arbitration_id']
+        for arbitration_id in np.unique(ids).tolist():
+            index = self._index.get(arbitration_id)
+            if index is None:
+                index = self._index[arbitration_id] = _IdIndex()
+            index.extend(seqs[ids == arbitration_id], first_seq)
+
+    def _reserve(self, count):
+        """未开始覆盖前，保证缓冲区能放下前count条记录"""
+        size = len(self.records)
+        if count <= size or size == self.capacity:
+            return
+        while size < count:
+            size *= 2
+        records = np.zeros(min(size, self.capacity), dtype=RAW_FRAME_DTYPE)
+        records[:self.total] = self.records[:self.total]
+        self.records = records
+
+    def clear(self):
+        self.total = 0
+        self.start_time = None
+        self._index.clear()
+
+    def ids(self):
+        """缓冲区中出现过的CAN ID"""
+        return sorted(self._index)
+
+    def query(self, ids=None, start_time=None, end_time=None):
+        """查询满足条件的记录序号（按时间顺序）
+
+        ids: CAN ID列表，None表示全部；start_time/end_time: 时间戳范围（含边界）
+        只访问匹配ID的索引，开销与匹配条数成正比。
+        """
+        first_seq = self.first_seq
+        if ids is None:
+            lo = self._bisect_time(start_time, first_seq, self.total) if start_time is not None else first_seq
+            hi = self._bisect_time(end_time, lo, self.total, right=True) if end_time is not None else self.total
+            return np.arange(lo, hi, dtype=np.int64)
+
+        parts = [self._index[i].live(first_seq) for i in ids if i in self._index]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        seqs = parts[0].copy() if len(parts) == 1 else np.sort(np.concatenate(parts))
+        if start_time is not None or end_time is not None:
+            timestamps = self.get(seqs)['timestamp']
+            lo = np.searchsorted(timestamps, start_time, 'left') if start_time is not None else 0
+            hi = np.searchsorted(timestamps, end_time, 'right') if end_time is not None else len(seqs)
+            seqs = seqs[lo:hi]
+        return seqs
+
+    def _bisect_time(self, t, lo, hi, right=False):
+        """在序号区间 [lo, hi) 内二分查找时间戳t的位置"""
+        timestamps = self.records['timestamp']
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ts = timestamps[mid % self.capacity]
+            if ts < t or (right and ts == t):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, seqs):
+        """按序号取记录，seqs必须在 [first_seq, total) 范围内"""
+        return self.records[np.asarray(seqs, dtype=np.int64) % self.capacity]
+
+    def slice(self, start=0, stop=None):
+        """按时间顺序取第start到stop条记录（相对最旧记录的位置）"""
+        count = len(self)
+        start, stop, _ = slice(start, stop).indices(count)
+        if start >= stop:
+            return self.records[:0]
+        return self.get(np.arange(self.first_seq + start, self.first_seq + stop))
+
+    def format_rows(self, records):
+        """将记录数组格式化为文本行列表"""
+        return [format_frame(ts, arb_id, dlc, data)
+                for ts, arb_id, dlc, data in zip(records['timestamp'].tolist(),
+                                                 records['arbitration_id'].tolist(),
+                                                 records['dlc'].tolist(),
+                                                 records['data'].tolist())]
+
+    def iter_text(self, chunk_size=10000):
+        """按时间顺序分块生成格式化文本，用于保存数据"""
+        for start in range(0, len(self), chunk_size):
+            yield '\n'.join(self.format_rows(self.slice(start, start + chunk_size)))
@@ -0,0 +1,229 @@
+# recorder.py
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from raw_log import RAW_FRAME_DTYPE
+from radar_decoder import FRAME_DTYPE
+
+# 录制文件格式:
+#   文件头: MAGIC(8字节) + 版本(uint16) + 保留(6字节)
+#   之后是若干数据块，每块为 块头 + 负载，块头为
+#   b'CHNK' + 类型(uint8) + 记录数(uint32) + 负载长度(uint32) + 负载CRC32(uint32)
+#   负载为对应结构化类型记录的原始字节（小端）
+# 每个数据块一次写入并落盘，程序崩溃时最多丢失最后一个未写完的块。
+MAGIC = b'SR111CAP'
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sH6x')
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sBIII')
+
+CHUNK_RAW = 1  # 原始CAN报文
+CHUNK_TARGETS = 2  # 解析后的目标
+
+# 录制文件中的目标记录，包含报文时间戳在内的全部字段
+TARGET_RECORD_DTYPE = FRAME_DTYPE
+
+RECORD_DTYPES = {
+    CHUNK_RAW: RAW_FRAME_DTYPE.newbyteorder('<'),
+    CHUNK_TARGETS: TARGET_RECORD_DTYPE.newbyteorder('<'),
+}
+
+
+class _ChunkBuffer:
+    """预分配的单类型记录缓冲区，写满后整体交给写盘线程"""
+
+    def __init__(self, kind, capacity):
+        self.kind = kind
+        self.records = np.zeros(capacity, dtype=RECORD_DTYPES[kind])
+        self.count = 0
+        self.started = 0.0
+
+    def take(self):
+        """取出已缓存记录的字节并清空"""
+        payload = self.records[:self.count].tobytes()
+        count = self.count
+        self.count = 0
+        return self.kind, count, payload
+
+
+class CaptureRecorder:
+    """连续录制原始报文和解析后的目标到分块二进制文件
+
+    add_frame/add_targets 在接收线程中调用，只写入内存缓冲区；写满一块或
+    超过 flush_interval 秒后交给后台线程写盘，接收循环不会因磁盘IO阻塞。
+    写盘队列满时丢弃数据块并计入 dropped_chunks。
+    overwrite 为True时清空已有文件，否则追加到已有文件末尾的最后一个完整数据块之后。
+    """
+
+    def __init__(self, path, chunk_records=4096, flush_interval=1.0, max_queue_chunks=256, overwrite=False):
+        self.path = path
+        self.overwrite = overwrite
+        self.flush_interval = flush_interval
+        self.dropped_chunks = 0
+        self.written_chunks = 0
+        self._raw = _ChunkBuffer(CHUNK_RAW, chunk_records)
+        self._targets = _ChunkBuffer(CHUNK_TARGETS, chunk_records)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue_chunks)
+        self._file = None
+        self._thread = None
+        self.running = False
+
+    def start(self):
+        self._file = open(self.path, 'wb' if self.overwrite else 'ab')
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            self._file.flush()
+        else:
+            # 追加到已有文件时格式版本必须一致
+            with open(self.path, 'rb') as f:
+                header = f.read(FILE_HEADER.size)
+                valid = header == FILE_HEADER.pack(MAGIC, VERSION)
+                end = _valid_length(f) if valid else 0
+            if not valid:
+                self._file.close()
+                raise ValueError(f"无法追加到不同格式的文件: {self.path}")
+            # 上次录制中断时末尾可能有不完整的块，截掉后再追加，否则新块在读取时会被忽略
+            if end < self._file.tell():
+                self._file.truncate(end)
+        self.running = True
+        self._thread = threading.Thread(target=self._write_loop, name="CaptureRecorder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """写出剩余数据并关闭文件"""
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+            self._submit(self._raw)
+            self._submit(self._targets)
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+    def add_frame(self, timestamp, arbitration_id, data):
+        """缓存一条原始报文"""
+        with self._lock:
+            if not self.running:
+                return
+            buf = self._raw
+            if buf.count == 0:
+                buf.started = time.monotonic()
+            record = buf.records[buf.count]
+            dlc = len(data)
+            record['timestamp'] = timestamp
+            record['arbitration_id'] = arbitration_id
+            record['dlc'] = dlc
+            record['data'][:dlc] = np.frombuffer(data, dtype=np.uint8)
+            record['data'][dlc:] = 0
+            buf.count += 1
+            if buf.count == len(buf.records):
+                self._submit(buf)
+
+    def add_targets(self, frame):
+        """缓存一帧目标 frame: FRAME_DTYPE结构化数组"""
+        with self._lock:
+            if not self.running:
+                return
+            buf = self._targets
+            pos = 0
+            while pos < len(frame):
+                if buf.count == 0:
+                    buf.started = time.monotonic()
+                n = min(len(frame) - pos, len(buf.records) - buf.count)
+                buf.records[buf.count:buf.count + n] = frame[pos:pos + n]
+                buf.count += n
+                pos += n
+                if buf.count == len(buf.records):
+                    self._submit(buf)
+
+    def tick(self):
+        """接收线程空闲时调用，按时间间隔提交未写满的数据块"""
+        now = time.monotonic()
+        with self._lock:
+            if not self.running:
+                return
+            for buf in (self._raw, self._targets):
+                if buf.count and now - buf.started >= self.flush_interval:
+                    self._submit(buf)
+
+    def _submit(self, buf):
+        if buf.count == 0:
+            return
+        try:
+            self._queue.put_nowait(buf.take())
+        except queue.Full:
+            self.dropped_chunks += 1
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            kind, count, payload = item
+            header = CHUNK_HEADER.pack(CHUNK_MAGIC, kind, count, len(payload), zlib.crc32(payload))
+            try:
+                self._file.write(header + payload)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.written_chunks += 1
+            except OSError as e:
+                print(f"录制写入失败: {e}")
+
+
+def _read_chunk(f):
+    """从文件当前位置读取一个数据块，返回 (类型, 记录数, 负载)，不完整或校验失败时返回None"""
+    header = f.read(CHUNK_HEADER.size)
+    if len(header) < CHUNK_HEADER.size:
+        return None
+    chunk_magic, kind, count, length, crc = CHUNK_HEADER.unpack(header)
+    if chunk_magic != CHUNK_MAGIC:
+        return None
+    payload = f.read(length)
+    if len(payload) < length or zlib.crc32(payload) != crc:
+        return None
+    return kind, count, payload
+
+
+def _valid_length(f):
+    """从文件头之后扫描数据块，返回最后一个完整数据块的结束位置"""
+    end = f.tell()
+    while _read_chunk(f) is not None:
+        end = f.tell()
+    return end
+
+
+def read_capture(path):
+    """逐块读取录制文件，生成 (块类型, 记录数组)
+
+    遇到不完整或校验失败的数据块（例如程序崩溃时正在写入的块）即停止。
+    """
+    with open(path, 'rb') as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"不是SR111录制文件: {path}")
+        if version != VERSION:
+            raise ValueError(f"不支持的录制文件版本 {version}: {path}")
+        while True:
+            chunk = _read_chunk(f)
+            if chunk is None:
+                return
+            kind, count, payload = chunk
+            dtype = RECORD_DTYPES.get(kind)
+            if dtype is None:
+                continue  # 跳过未知类型的数据块
+            yield kind, np.frombuffer(payload, dtype=dtype, count=count)
+
+
+def load_capture(path):
+    """读取整个录制文件，返回 (原始报文记录, 目标记录)"""
+    parts = {CHUNK_RAW: [], CHUNK_TARGETS: []}
+    for kind, records in read_capture(path):
+        parts[kind].append(records)
+    return tuple(np.concatenate(parts[kind]) if parts[kind] else np.zeros(0, dtype=RECORD_DTYPES[kind])
+                 for kind in (CHUNK_RAW, CHUNK_TARGETS))
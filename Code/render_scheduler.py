@@ -0,0 +1,63 @@
+# render_scheduler.py
+import time
+from PyQt5 import QtGui
+from PyQt5.QtCore import QEvent, QObject, QTimer
+
+
+class RenderScheduler(QObject):
+    """按新数据到达驱动界面重绘
+
+    request() 在收到新帧时调用，多次请求合并为一次重绘；两次重绘的间隔不小于
+    显示器刷新周期（或 max_fps）。窗口最小化或隐藏时不重绘，恢复显示后补画一次；
+    没有新数据时不产生任何定时器事件。
+    """
+
+    def __init__(self, window, render, max_fps=None):
+        super().__init__(window)
+        self.window = window
+        self.render = render  # 重绘函数
+        if max_fps is None:
+            screen = QtGui.QGuiApplication.primaryScreen()
+            max_fps = screen.refreshRate() if screen else 60
+        self.max_fps = max(1.0, max_fps or 60)
+        self.enabled = True
+        self.rendered = 0  # 已重绘次数
+        self.deferred = 0  # 因窗口不可见推迟的请求数
+        self._pending = False
+        self._last = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+        window.installEventFilter(self)
+
+    @property
+    def min_interval(self):
+        return 1.0 / self.max_fps
+
+    def request(self):
+        """有新数据需要绘制"""
+        self._pending = True
+        if not self.enabled or self._timer.isActive():
+            return
+        if not self._visible():
+            self.deferred += 1
+            return
+        delay = self.min_interval - (time.monotonic() - self._last)
+        self._timer.start(max(0, int(delay * 1000 + 0.5)))
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() in (QEvent.Show, QEvent.WindowStateChange):
+            if self._pending:
+                self.request()
+        return False
+
+    def _visible(self):
+        return self.window.isVisible() and not self.window.isMinimized()
+
+    def _fire(self):
+        if not self._pending or not self._visible():
+            return
+        self._pending = False
+        self._last = time.monotonic()
+        self.rendered += 1
+        self.render()
@@ -0,0 +1,100 @@
+# replay.py
+import time
+import can
+from recorder import CHUNK_RAW, MAGIC, read_capture
+
+# 自有录制文件扩展名，其它格式(asc/blf/log/csv/trc)交给python-can的LogReader
+CAPTURE_SUFFIX = '.srcap'
+REPLAY_SUFFIXES = (CAPTURE_SUFFIX, '.asc', '.blf', '.log', '.csv', '.trc')
+
+
+def is_replay_source(channel):
+    """通道名是否为回放文件"""
+    name = str(channel).lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return name.endswith(REPLAY_SUFFIXES)
+
+
+def iter_capture_messages(path):
+    """按顺序读取自有录制文件中的原始报文"""
+    for kind, records in read_capture(path):
+        if kind != CHUNK_RAW:
+            continue
+        for ts, arb_id, dlc, data in zip(records['timestamp'].tolist(),
+                                         records['arbitration_id'].tolist(),
+                                         records['dlc'].tolist(),
+                                         records['data'].tolist()):
+            yield can.Message(timestamp=ts, arbitration_id=arb_id,
+                              is_extended_id=arb_id > 0x7FF, data=data[:dlc])
+
+
+def iter_log_messages(path):
+    """读取python-can支持的日志文件(asc/blf/candump log等)"""
+    reader = can.LogReader(path)
+    try:
+        yield from reader
+    finally:
+        reader.stop()
+
+
+def iter_messages(path):
+    """根据文件内容或扩展名选择读取方式"""
+    with open(path, 'rb') as f:
+        is_capture = f.read(len(MAGIC)) == MAGIC
+    if is_capture:
+        return iter_capture_messages(path)
+    return iter_log_messages(path)
+
+
+class ReplayBus(can.BusABC):
+    """从录制文件回放CAN报文，可替代 can.interface.Bus 供 RadarWorker 使用
+
+    speed: 回放倍速，1为按原始时间间隔回放，0为不等待尽快回放
+    报文时间戳保持录制时的值；发送的报文被直接丢弃。
+    """
+
+    def __init__(self, channel, speed=1.0, can_filters=None, **kwargs):
+        self.path = channel
+        self.speed = speed
+        self.channel_info = f"Replay: {channel}"
+        self._messages = iter_messages(channel)
+        self._pending = None  # 尚未到回放时间的报文
+        self._log_start = None  # 第一条报文的录制时间戳
+        self._wall_start = None  # 第一条报文的回放时刻
+        self.finished = False
+        super().__init__(channel=channel, can_filters=can_filters, **kwargs)
+
+    def _recv_internal(self, timeout):
+        msg = self._pending
+        if msg is None:
+            msg = next(self._messages, None)
+            if msg is None:
+                # 回放结束，行为与空闲总线一致
+                self.finished = True
+                if timeout:
+                    time.sleep(timeout)
+                return None, False
+
+        if self.speed > 0:
+            now = time.perf_counter()
+            if self._log_start is None:
+                self._log_start, self._wall_start = msg.timestamp, now
+            due = self._wall_start + (msg.timestamp - self._log_start) / self.speed
+            wait = due - now
+            if wait > 0:
+                if timeout is not None and wait > timeout:
+                    # 超时前不会到期，保留到下次接收
+                    self._pending = msg
+                    time.sleep(timeout)
+                    return None, False
+                time.sleep(wait)
+        self._pending = None
+        return msg, False
+
+    def send(self, msg, timeout=None):
+        pass
+
+    def shutdown(self):
+        self._messages.close()
+        super().shutdown()
@@ -0,0 +1,91 @@
+# sensors.py
+import math
+import numpy as np
+
+# 多雷达共用一条总线时，报文ID按传感器ID偏移: ID + sensor_id * SENSOR_ID_STRIDE
+SENSOR_ID_STRIDE = 0x10
+MAX_SENSOR_ID = 7
+
+# 各传感器的默认显示颜色
+SENSOR_COLORS = ['#FF0000', '#0080FF', '#00C000', '#FF8000', '#C000C0', '#00C0C0', '#808000', '#804000']
+
+
+def sensor_message_id(base_id, sensor_id):
+    """传感器sensor_id发送的报文ID"""
+    return base_id + sensor_id * SENSOR_ID_STRIDE
+
+
+class SensorConfig:
+    """单个雷达的通道、传感器ID和安装外参
+
+    x/y/z: 安装位置 (m)，yaw: 安装航向角 (度，逆时针为正)
+    index: 在全部传感器中的序号，用于区分帧数据来源和显示颜色
+    """
+
+    def __init__(self, channel='can0', sensor_id=0, x=0.0, y=0.0, z=0.0, yaw=0.0,
+                 name=None, color=None, index=0):
+        if not 0 <= sensor_id <= MAX_SENSOR_ID:
+            raise ValueError(f"传感器ID必须在0到{MAX_SENSOR_ID}之间: {sensor_id}")
+        self.channel = channel
+        self.sensor_id = sensor_id
+        self.x = x
+        self.y = y
+        self.z = z
+        self.yaw = yaw
+        self.index = index
+        self.name = name or f"{channel}#{sensor_id}"
+        self.color = color or SENSOR_COLORS[index % len(SENSOR_COLORS)]
+
+    def to_dict(self):
+        return {
+            'channel': self.channel,
+            'sensor_id': self.sensor_id,
+            'x': self.x,
+            'y': self.y,
+            'z': self.z,
+            'yaw': self.yaw,
+            'name': self.name,
+            'color': self.color,
+        }
+
+    @classmethod
+    def from_dict(cls, data, index=0):
+        return cls(index=index, **data)
+
+    def rotate(self, xs, ys):
+        """将雷达坐标系下的向量（如速度）旋转到世界坐标系方向"""
+        yaw = math.radians(self.yaw)
+        c, s = math.cos(yaw), math.sin(yaw)
+        return c * xs - s * ys, s * xs + c * ys
+
+    def to_world(self, xs, ys):
+        """将雷达坐标系下的点转换到世界坐标系"""
+        xs, ys = self.rotate(xs, ys)
+        return self.x + xs, self.y + ys
+
+
+def load_sensors(items):
+    """从配置列表创建传感器，按顺序分配index"""
+    sensors = [SensorConfig.from_dict(item, index=i) for i, item in enumerate(items)]
+    keys = [(s.channel, s.sensor_id) for s in sensors]
+    if len(set(keys)) != len(keys):
+        raise ValueError("同一通道上的传感器ID不能重复")
+    return sensors
+
+
+def group_by_channel(sensors):
+    """按CAN通道分组，每个通道由一个接收线程处理"""
+    groups = {}
+    for sensor in sensors:
+        groups.setdefault(sensor.channel, []).append(sensor)
+    return groups
+
+
+def sensor_color_array(sensors, alpha=0.8):
+    """各传感器颜色的RGBA数组 (按index排列，取值0-1)"""
+    count = max((s.index for s in sensors), default=-1) + 1
+    colors = np.tile(np.array([1.0, 0.0, 0.0, alpha]), (max(count, 1), 1))
+    for s in sensors:
+        h = s.color.lstrip('#')
+        colors[s.index, :3] = [int(h[i:i + 2], 16) / 255 for i in (0, 2, 4)]
+    return colors
@@ -0,0 +1,127 @@
+# track_store.py
+import numpy as np
+
+
+class TrackStore:
+    """预分配的目标轨迹存储
+
+    data[slot] 保存一条轨迹最近 track_length 个点的 (x, y, t)。每个点同时写入
+    i 和 i+track_length 两个位置，data[slot, head:head+count] 始终是按时间顺序
+    排列的连续视图，追加和读取都不需要分配内存或移动数据。
+    轨迹ID通过 ID→槽位 映射查找；超过 max_age 秒未更新的轨迹被回收，雷达
+    重新使用的旧ID会开始一条新轨迹。槽位用完时回收最久未更新的轨迹。
+    """
+
+    def __init__(self, max_tracks=512, track_length=50, max_age=2.0):
+        self.max_tracks = max_tracks
+        self.track_length = track_length
+        self.max_age = max_age  # 秒
+        self.data = np.zeros((max_tracks, 2 * track_length, 3))
+        self.head = np.zeros(max_tracks, dtype=np.intp)  # 每条轨迹最早一个点的位置
+        self.count = np.zeros(max_tracks, dtype=np.intp)
+        self.last = np.zeros(max_tracks)  # 最后一次更新的时间
+        self.keys = np.full(max_tracks, -1, dtype=np.int64)  # 槽位对应的轨迹ID，-1为空闲
+        self.dirty = np.zeros(max_tracks, dtype=bool)  # 自上次读取后是否有新点
+        self._pinned = np.zeros(max_tracks, dtype=bool)  # 当前帧已使用、不可回收的槽位
+        self._slots = {}  # {轨迹ID: 槽位}
+        self._free = list(range(max_tracks - 1, -1, -1))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def append(self, key, x, y, t):
+        """为轨迹key追加一个点，返回其槽位"""
+        slot = self._slot(key, t)
+        self._write(np.array([slot]), x, y, t)
+        return slot
+
+    def extend(self, keys, xs, ys, t):
+        """追加一帧中每个目标的点（一帧内轨迹ID不重复），返回槽位数组
+
+        本帧用到的槽位不会被本帧后续的新轨迹回收；一帧的轨迹数超过
+        max_tracks 时多出的新轨迹不保存，槽位为 -1。
+        """
+        slots = np.empty(len(keys), dtype=np.intp)
+        try:
+            for i, key in enumerate(keys):
+                slot = slots[i] = self._slot(key, t)
+                if slot >= 0:
+                    self._pinned[slot] = True
+        finally:
+            self._pinned[:] = False
+        valid = slots >= 0
+        if valid.all():
+            self._write(slots, xs, ys, t)
+        else:
+            self._write(slots[valid], np.asarray(xs)[valid], np.asarray(ys)[valid], t)
+        return slots
+
+    def points(self, key):
+        """轨迹key按时间顺序的点 (N, 3)，为内部缓冲区的视图"""
+        return self.slot_points(self._slots[key])
+
+    def slot_points(self, slot):
+        head = self.head[slot]
+        return self.data[slot, head:head + self.count[slot]]
+
+    def take_dirty(self):
+        """返回有新点的槽位并清除标记"""
+        slots = np.flatnonzero(self.dirty)
+        self.dirty[slots] = False
+        return slots
+
+    def evict(self, now):
+        """回收超过max_age未更新的轨迹，返回被回收的槽位"""
+        stale = np.flatnonzero((self.keys >= 0) & (now - self.last > self.max_age))
+        for slot in stale.tolist():
+            self._release(slot)
+        return stale
+
+    def clear(self):
+        for slot in list(self._slots.values()):
+            self._release(slot)
+
+    def _slot(self, key, t):
+        slot = self._slots.get(key)
+        if slot is not None:
+            if t - self.last[slot] > self.max_age:
+                # ID已被雷达重新分配给新目标，不与旧轨迹相连
+                self.head[slot] = self.count[slot] = 0
+            self.last[slot] = t
+            return slot
+        if not self._free:
+            used = np.flatnonzero((self.keys >= 0) & ~self._pinned)
+            if len(used) == 0:
+                return -1
+            self._release(used[np.argmin(self.last[used])])
+        slot = self._free.pop()
+        self._slots[key] = slot
+        self.keys[slot] = key
+        self.head[slot] = self.count[slot] = 0
+        self.last[slot] = t
+        return slot
+
+    def _write(self, slots, xs, ys, t):
+        length = self.track_length
+        head, count = self.head[slots], self.count[slots]
+        full = count >= length
+        pos = np.where(full, head, head + count) % length
+        self.head[slots] = np.where(full, (head + 1) % length, head)
+        self.count[slots] = np.minimum(count + 1, length)
+        for i in (pos, pos + length):
+            self.data[slots, i, 0] = xs
+            self.data[slots, i, 1] = ys
+            self.data[slots, i, 2] = t
+        self.last[slots] = t
+        self.dirty[slots] = True
+
+    def _release(self, slot):
+        slot = int(slot)
+        del self._slots[int(self.keys[slot])]
+        self.keys[slot] = -1
+        self.count[slot] = 0
+        self.dirty[slot] = False
+        self._free.append(slot)
@@ -0,0 +1,69 @@
+# track_view.py
+import time
+import numpy as np
+import pyqtgraph as pg
+
+
+class TrackLines:
+    """2D视图中的目标轨迹，TrackStore的每个槽位对应一条常驻的PlotDataItem
+
+    只有收到新点的轨迹才调用setData；轨迹被回收后曲线隐藏，槽位分配给
+    新轨迹时直接复用。
+    """
+
+    def __init__(self, plot, store):
+        self.plot = plot
+        self.store = store
+        self.visible = False
+        self._lines = [None] * store.max_tracks
+        self._line_keys = np.full(store.max_tracks, -1, dtype=np.int64)  # 曲线当前显示的轨迹ID
+
+    def redraw(self, now=None):
+        """回收过期轨迹并更新有新点的曲线"""
+        now = time.monotonic() if now is None else now
+        for slot in self.store.evict(now).tolist():
+            self._hide(slot)
+        if not self.visible:
+            return
+        store = self.store
+        for slot in store.take_dirty().tolist():
+            line = self._line(slot)
+            pts = store.slot_points(slot)
+            line.setData(pts[:, 0], pts[:, 1])
+            line.setVisible(len(pts) > 1)
+
+    def set_visible(self, visible):
+        """显示或隐藏全部轨迹"""
+        self.visible = visible
+        for line in self._lines:
+            if line is not None:
+                line.setVisible(False)
+        if visible:
+            # 重新绘制全部现有轨迹
+            self.store.dirty[self.store.keys >= 0] = True
+            self.redraw()
+
+    def clear(self):
+        """清除全部轨迹数据和曲线"""
+        self.store.clear()
+        for slot in range(len(self._lines)):
+            self._hide(slot)
+
+    def _line(self, slot):
+        line = self._lines[slot]
+        if line is None:
+            line = self._lines[slot] = pg.PlotDataItem(connect="all")
+            self.plot.addItem(line)
+        key = self.store.keys[slot]
+        if self._line_keys[slot] != key:
+            # 使用不同颜色区分不同目标
+            self._line_keys[slot] = key
+            line.setPen(pg.mkPen(pg.intColor(int(key) % 10, hues=10, maxValue=200), width=1))
+        return line
+
+    def _hide(self, slot):
+        line = self._lines[slot]
+        if line is not None and line.isVisible():
+            line.setVisible(False)
+            line.setData([], [])
+        self._line_keys[slot] = -1
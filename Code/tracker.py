@@ -0,0 +1,186 @@
+# tracker.py
+import numpy as np
+
+
+class TargetTracker:
+    """多目标跟踪: 匀速模型卡尔曼滤波 + 门限内最近邻关联
+
+    不依赖雷达的8位目标ID（ID会被重复使用或跳变），按位置把每帧的量测关联到
+    已有航迹。全部航迹的预测、马氏距离和更新都按数组一次计算。
+    关联先按门限的外接正方形找出候选配对（按x排序后二分查找），只对候选计算马氏
+    距离；再做互为最近邻的多轮匹配：每轮把 航迹的最近量测 与 量测的最近航迹 一致
+    的配对确定下来，其余在剩余的航迹和量测中继续匹配，直到没有门限内的配对。
+    未关联的量测建立新航迹，连续命中 confirm_hits 次后确认；超过 max_coast 秒
+    没有量测的航迹删除，时间倒退（如重新回放）时全部航迹删除。状态为世界坐标系 [x, y, vx, vy]。
+    """
+
+    def __init__(self, max_tracks=512, gate=9.21, accel_noise=2.0, meas_noise=0.5,
+                 confirm_hits=3, max_coast=0.5):
+        self.max_tracks = max_tracks
+        self.gate = gate  # 马氏距离平方门限，9.21为2自由度卡方分布99%
+        self.accel_noise = accel_noise  # 过程噪声: 加速度标准差 (m/s²)
+        self.meas_noise = meas_noise  # 量测位置标准差 (m)
+        self.confirm_hits = confirm_hits
+        self.max_coast = max_coast  # 秒
+        self.state = np.zeros((max_tracks, 4))
+        self.cov = np.zeros((max_tracks, 4, 4))
+        self.ids = np.full(max_tracks, -1, dtype=np.int64)  # 航迹ID，-1为空闲
+        self.hits = np.zeros(max_tracks, dtype=np.int32)
+        self.time = np.zeros(max_tracks)  # 状态对应的时刻
+        self.updated = np.zeros(max_tracks)  # 最后一次关联到量测的时刻
+        self._next_id = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.ids >= 0))
+
+    @property
+    def confirmed(self):
+        """已确认航迹的槽位"""
+        return np.flatnonzero((self.ids >= 0) & (self.hits >= self.confirm_hits))
+
+    def clear(self):
+        self.ids[:] = -1
+
+    def update(self, xs, ys, t, vxs=None, vys=None):
+        """处理一帧量测，返回 (每个量测的航迹ID, 航迹是否已确认, 滤波后的x, 滤波后的y)
+
+        vxs/vys 为量测的速度（径向速度的分量），只用于初始化新航迹的速度。
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        self._drop_stale(t)
+        active = np.flatnonzero(self.ids >= 0)
+        self._predict(active, t)
+        track_idx, meas_idx = self._associate(active, xs, ys)
+        self._correct(track_idx, xs[meas_idx], ys[meas_idx], t)
+
+        slots = np.full(len(xs), -1, dtype=np.intp)
+        slots[meas_idx] = track_idx
+        new = np.flatnonzero(slots < 0)
+        slots[new] = self._create(xs[new], ys[new], t,
+                                  None if vxs is None else np.asarray(vxs, dtype=float)[new],
+                                  None if vys is None else np.asarray(vys, dtype=float)[new])
+        valid = slots >= 0  # 航迹数达到上限时新量测不建立航迹
+        ids = np.full(len(xs), -1, dtype=np.int64)
+        ids[valid] = self.ids[slots[valid]]
+        confirmed = np.zeros(len(xs), dtype=bool)
+        confirmed[valid] = self.hits[slots[valid]] >= self.confirm_hits
+        fx, fy = xs.copy(), ys.copy()
+        fx[valid] = self.state[slots[valid], 0]
+        fy[valid] = self.state[slots[valid], 1]
+        return ids, confirmed, fx, fy
+
+    def _drop_stale(self, t):
+        dt = t - self.updated
+        self.ids[(self.ids >= 0) & ((dt > self.max_coast) | (dt < 0))] = -1
+
+    def _predict(self, slots, t):
+        """把航迹状态预测到时刻t"""
+        if not len(slots):
+            return
+        dt = np.maximum(t - self.time[slots], 0.0)
+        n = len(slots)
+        F = np.broadcast_to(np.eye(4), (n, 4, 4)).copy()
+        F[:, 0, 2] = F[:, 1, 3] = dt
+        # 白噪声加速度模型的过程噪声
+        q = self.accel_noise ** 2
+        Q = np.zeros((n, 4, 4))
+        Q[:, 0, 0] = Q[:, 1, 1] = q * dt ** 4 / 4
+        Q[:, 0, 2] = Q[:, 2, 0] = Q[:, 1, 3] = Q[:, 3, 1] = q * dt ** 3 / 2
+        Q[:, 2, 2] = Q[:, 3, 3] = q * dt ** 2
+        self.state[slots] = np.einsum('nij,nj->ni', F, self.state[slots])
+        self.cov[slots] = F @ self.cov[slots] @ F.transpose(0, 2, 1) + Q
+        self.time[slots] = t
+
+    def _innovation(self, slots):
+        """新息协方差 S = HPH' + R 及其逆 (n, 2, 2)"""
+        S = self.cov[slots, :2, :2] + np.eye(2) * self.meas_noise ** 2
+        det = S[:, 0, 0] * S[:, 1, 1] - S[:, 0, 1] * S[:, 1, 0]
+        inv = np.empty_like(S)
+        inv[:, 0, 0] = S[:, 1, 1]
+        inv[:, 1, 1] = S[:, 0, 0]
+        inv[:, 0, 1] = -S[:, 0, 1]
+        inv[:, 1, 0] = -S[:, 1, 0]
+        return S, inv / det[:, None, None]
+
+    def _candidates(self, slots, S, xs, ys):
+        """按门限对应的外接正方形找出候选的 (航迹序号, 量测序号)，避免计算完整的距离矩阵"""
+        # 马氏距离门限内的点到预测位置的距离不超过 sqrt(gate * S的最大特征值) <= sqrt(gate * trace(S))
+        radius = np.sqrt(self.gate * (S[:, 0, 0] + S[:, 1, 1]))
+        order = np.argsort(xs)
+        sorted_x = xs[order]
+        px = self.state[slots, 0]
+        lo = np.searchsorted(sorted_x, px - radius, 'left')
+        counts = np.searchsorted(sorted_x, px + radius, 'right') - lo
+        total = int(counts.sum())
+        track_idx = np.repeat(np.arange(len(slots)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        meas_idx = order[np.repeat(lo, counts) + offsets]
+        keep = np.abs(ys[meas_idx] - self.state[slots[track_idx], 1]) <= radius[track_idx]
+        return track_idx[keep], meas_idx[keep]
+
+    def _associate(self, slots, xs, ys):
+        """门限内互为最近邻的多轮匹配，返回 (航迹槽位, 量测序号)"""
+        empty = np.empty(0, dtype=np.intp)
+        if not len(slots) or not len(xs):
+            return empty, empty
+        S, inv = self._innovation(slots)
+        tracks, meas = self._candidates(slots, S, xs, ys)
+        dx = xs[meas] - self.state[slots[tracks], 0]
+        dy = ys[meas] - self.state[slots[tracks], 1]
+        m = inv[tracks]
+        cost = m[:, 0, 0] * dx * dx + (m[:, 0, 1] + m[:, 1, 0]) * dx * dy + m[:, 1, 1] * dy * dy
+        gated = cost <= self.gate
+        order = np.argsort(cost[gated], kind='stable')
+        tracks, meas = tracks[gated][order], meas[gated][order]
+        result_tracks, result_meas = [], []
+        while len(tracks):
+            # 按代价排序后，每个航迹/量测第一次出现的配对即其最近邻
+            _, track_first = np.unique(tracks, return_index=True)
+            _, meas_first = np.unique(meas, return_index=True)
+            mutual = np.intersect1d(track_first, meas_first, assume_unique=True)
+            result_tracks.append(tracks[mutual])
+            result_meas.append(meas[mutual])
+            used_tracks = np.zeros(len(slots), dtype=bool)
+            used_tracks[tracks[mutual]] = True
+            used_meas = np.zeros(len(xs), dtype=bool)
+            used_meas[meas[mutual]] = True
+            remain = ~(used_tracks[tracks] | used_meas[meas])
+            tracks, meas = tracks[remain], meas[remain]
+        if not result_tracks:
+            return empty, empty
+        return slots[np.concatenate(result_tracks)], np.concatenate(result_meas)
+
+    def _correct(self, slots, xs, ys, t):
+        """用关联上的量测更新航迹"""
+        if not len(slots):
+            return
+        _, inv = self._innovation(slots)
+        P = self.cov[slots]
+        K = P[:, :, :2] @ inv  # 卡尔曼增益 (n, 4, 2)
+        y = np.stack((xs - self.state[slots, 0], ys - self.state[slots, 1]), axis=1)
+        self.state[slots] += np.einsum('nij,nj->ni', K, y)
+        self.cov[slots] = P - K @ P[:, :2, :]
+        self.hits[slots] += 1
+        self.updated[slots] = t
+
+    def _create(self, xs, ys, t, vxs=None, vys=None):
+        """为未关联的量测建立航迹，返回槽位（没有空闲槽位时为-1）"""
+        free = np.flatnonzero(self.ids < 0)[:len(xs)]
+        slots = np.full(len(xs), -1, dtype=np.intp)
+        n = len(free)
+        if not n:
+            return slots
+        slots[:n] = free
+        self.state[free, 0] = xs[:n]
+        self.state[free, 1] = ys[:n]
+        self.state[free, 2] = 0.0 if vxs is None else vxs[:n]
+        self.state[free, 3] = 0.0 if vys is None else vys[:n]
+        # 位置方差取量测噪声，速度未知（径向速度不含切向分量）取较大方差
+        self.cov[free] = np.diag([self.meas_noise ** 2, self.meas_noise ** 2, 25.0, 25.0])
+        self.ids[free] = np.arange(self._next_id, self._next_id + n)
+        self._next_id += n
+        self.hits[free] = 1
+        self.time[free] = t
+        self.updated[free] = t
+        return slots
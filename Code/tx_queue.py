@@ -0,0 +1,124 @@
+# tx_queue.py
+import collections
+import threading
+import time
+import can
+import numpy as np
+
+
+class TxStats:
+    """发送队列统计，latencies 为最近发送成功报文的 入队→发送完成 延迟 (秒)"""
+
+    def __init__(self, history=256):
+        self.sent = 0
+        self.failed = 0  # 重试后仍失败的报文数
+        self.retries = 0  # 发送缓冲区满等原因的重试次数
+        self.rejected = 0  # 队列满被拒绝的报文数
+        self.latencies = np.zeros(history)
+        self._count = 0
+
+    def add_latency(self, latency):
+        self.latencies[self._count % len(self.latencies)] = latency
+        self._count += 1
+
+    def to_dict(self):
+        recent = self.latencies[:min(self._count, len(self.latencies))] * 1000
+        result = {
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'rejected': self.rejected,
+        }
+        if len(recent):
+            result.update(latency_p50_ms=float(np.percentile(recent, 50)),
+                          latency_p99_ms=float(np.percentile(recent, 99)),
+                          latency_max_ms=float(recent.max()))
+        return result
+
+
+class TxQueue:
+    """线程安全的CAN发送队列，由持有总线的接收线程在两次recv之间调用drain发送
+
+    put() 可在任意线程调用且不阻塞，队列满时返回False（由调用方决定丢弃或稍后重试）。
+    drain() 每次最多发送 max_burst 条，相邻报文间隔不小于 gap，避免配置报文成批
+    发送时占用接收；发送缓冲区满(CanOperationError)时该报文留在队首，间隔
+    retry_delay 重试，超过 max_retries 次记为失败。报文发送完成或失败时在发送线程中
+    调用其回调 callback(message, error, latency)，error为None表示成功，latency为
+    入队到发送完成的时间 (秒)。
+    """
+
+    def __init__(self, maxsize=256, gap=0.002, max_burst=4, max_retries=3, retry_delay=0.005):
+        self.maxsize = maxsize
+        self.gap = gap  # 秒
+        self.max_burst = max_burst
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay  # 秒
+        self.stats = TxStats()
+        self._items = collections.deque()  # [报文, 回调, 入队时刻, 已重试次数]
+        self._lock = threading.Lock()
+        self._next_time = 0.0  # 下一条报文最早的发送时刻
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, message, callback=None):
+        """加入一条报文，队列满时返回False"""
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                self.stats.rejected += 1
+                return False
+            self._items.append([message, callback, time.monotonic(), 0])
+        return True
+
+    def wait_time(self, now=None):
+        """到下一条报文可发送的时间 (秒)，队列为空时返回None，供recv的超时使用"""
+        if not self._items:
+            return None
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._next_time - now)
+
+    def drain(self, bus):
+        """发送到期的报文，返回本次发送成功的条数"""
+        sent = 0
+        for _ in range(self.max_burst):
+            now = time.monotonic()
+            if not self._items or now < self._next_time:
+                break
+            item = self._items[0]
+            message, callback, queued, attempts = item
+            error = None
+            try:
+                bus.send(message, timeout=0)
+            except can.CanOperationError as e:
+                # 发送缓冲区满，稍后重试
+                if attempts < self.max_retries:
+                    item[3] += 1
+                    self.stats.retries += 1
+                    self._next_time = now + self.retry_delay
+                    break
+                error = str(e)
+            except (can.CanError, NotImplementedError) as e:
+                error = str(e)
+            with self._lock:
+                self._items.popleft()
+            done = time.monotonic()
+            self._next_time = done + self.gap
+            if error is None:
+                sent += 1
+                self.stats.sent += 1
+                self.stats.add_latency(done - queued)
+            else:
+                self.stats.failed += 1
+            if callback:
+                callback(message, error, done - queued)
+        return sent
+
+    def clear(self, error="发送已取消"):
+        """丢弃未发送的报文（如总线关闭时），回调报告失败"""
+        with self._lock:
+            items, self._items = list(self._items), collections.deque()
+        now = time.monotonic()
+        for message, callback, queued, _ in items:
+            self.stats.failed += 1
+            if callback:
+                callback(message, error, now - queued)
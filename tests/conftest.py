@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# 源码为 Code/ 下的平铺模块，按运行时的方式导入
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Code'))
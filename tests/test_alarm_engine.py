@@ -0,0 +1,80 @@
+import numpy as np
+
+from alarm_engine import AlarmEngine, ZONE_ALARM, ZONE_CLEAR, ZONE_PENDING, ZONE_RELEASING
+from alarm_zones import ZoneSet
+from radar_decoder import FRAME_DTYPE, KIND_TARGET, empty_frame
+
+
+def _frame(sensor, points):
+    frame = np.zeros(len(points), dtype=FRAME_DTYPE)
+    frame['sensor'] = sensor
+    frame['kind'] = KIND_TARGET
+    for i, (x, y) in enumerate(points):
+        frame['x'][i], frame['y'][i], frame['tid'][i] = x, y, i + 1
+    return frame
+
+
+def _kinds(events):
+    return [e.kind for e in events]
+
+
+def test_empty_frame_clears_alarm():
+    engine = AlarmEngine(ZoneSet([(-1000, -1000, 1000, 1000)]), sensor_timeout=10.0)
+    assert _kinds(engine.process(_frame(0, [(10, 10)]), now=0.0, wall=0.0)) == ['enter']
+    assert _kinds(engine.process(empty_frame(0, KIND_TARGET), now=0.1, wall=0.1)) == ['leave']
+    assert np.count_nonzero(engine.state) == 0
+
+
+def test_dwell_delays_alarm():
+    engine = AlarmEngine(ZoneSet([(0, 0, 10, 10)]), dwell=1.0, sensor_timeout=10.0)
+    assert engine.process(_frame(0, [(5, 5)]), now=0.0, wall=0.0) == []
+    assert engine.state[0] == ZONE_PENDING
+    assert engine.process(_frame(0, [(5, 5)]), now=0.5, wall=0.5) == []
+    events = engine.process(_frame(0, [(5, 5)]), now=1.0, wall=1.0)
+    assert _kinds(events) == ['enter']
+    assert events[0].targets == [1]
+    assert engine.state[0] == ZONE_ALARM
+
+
+def test_target_leaving_during_dwell_cancels():
+    engine = AlarmEngine(ZoneSet([(0, 0, 10, 10)]), dwell=1.0, sensor_timeout=10.0)
+    engine.process(_frame(0, [(5, 5)]), now=0.0, wall=0.0)
+    assert engine.process(_frame(0, [(50, 50)]), now=0.5, wall=0.5) == []
+    assert engine.state[0] == ZONE_CLEAR
+    # 重新进入后持续时间重新计算
+    engine.process(_frame(0, [(5, 5)]), now=0.8, wall=0.8)
+    assert engine.process(_frame(0, [(5, 5)]), now=1.2, wall=1.2) == []
+    assert _kinds(engine.process(_frame(0, [(5, 5)]), now=1.8, wall=1.8)) == ['enter']
+
+
+def test_hold_delays_release_and_reentry_keeps_alarm():
+    engine = AlarmEngine(ZoneSet([(0, 0, 10, 10)]), hold=1.0, sensor_timeout=10.0)
+    assert _kinds(engine.process(_frame(0, [(5, 5)]), now=0.0, wall=0.0)) == ['enter']
+    assert engine.process(empty_frame(0, KIND_TARGET), now=0.2, wall=0.2) == []
+    assert engine.state[0] == ZONE_RELEASING
+    assert engine.active
+    # 解除延时内目标回来，继续报警，不产生新事件
+    assert engine.process(_frame(0, [(5, 5)]), now=0.5, wall=0.5) == []
+    assert engine.state[0] == ZONE_ALARM
+    assert engine.process(empty_frame(0, KIND_TARGET), now=0.6, wall=0.6) == []
+    assert engine.update(now=1.5, wall=1.5) == []
+    assert _kinds(engine.update(now=1.6, wall=1.6)) == ['leave']
+    assert engine.state[0] == ZONE_CLEAR
+    assert not engine.active
+
+
+def test_sensor_timeout_drops_stale_hits():
+    engine = AlarmEngine(ZoneSet([(0, 0, 10, 10)]), sensor_timeout=0.5)
+    assert _kinds(engine.process(_frame(0, [(5, 5)]), now=0.0, wall=0.0)) == ['enter']
+    assert engine.update(now=0.5, wall=0.5) == []
+    assert _kinds(engine.update(now=0.6, wall=0.6)) == ['leave']
+
+
+def test_hits_from_sensors_are_combined():
+    engine = AlarmEngine(ZoneSet([(0, 0, 10, 10)]), sensor_timeout=10.0)
+    assert _kinds(engine.process(_frame(0, [(5, 5)]), now=0.0, wall=0.0)) == ['enter']
+    # 另一个雷达没有目标不影响第一个雷达的占用
+    assert engine.process(empty_frame(1, KIND_TARGET), now=0.1, wall=0.1) == []
+    assert engine.process(_frame(1, [(6, 6)]), now=0.2, wall=0.2) == []
+    assert engine.process(empty_frame(0, KIND_TARGET), now=0.3, wall=0.3) == []
+    assert _kinds(engine.process(empty_frame(1, KIND_TARGET), now=0.4, wall=0.4)) == ['leave']
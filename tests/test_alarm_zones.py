@@ -0,0 +1,103 @@
+import numpy as np
+
+from alarm_zones import ZoneSet, is_polygon, points_in_polygon, zone_bounds
+
+# 凹多边形（U形），缺口在 x=2~4, y=2~6
+U_SHAPE = [(0, 0), (6, 0), (6, 6), (4, 6), (4, 2), (2, 2), (2, 6), (0, 6)]
+
+
+def _random_zones(rng, count):
+    zones = []
+    for i in range(count):
+        cx, cy = rng.uniform(-50, 50, 2)
+        w, h = rng.uniform(1, 15, 2)
+        if i % 3 == 0:
+            # 凹多边形，缩放平移 U 形
+            zones.append([(cx + x * w / 6, cy + y * h / 6) for x, y in U_SHAPE])
+        elif i % 3 == 1:
+            zones.append([(cx, cy), (cx + w, cy + h / 2), (cx, cy + h)])
+        else:
+            zones.append((cx + w, cy + h, cx, cy))  # 坐标顺序颠倒的矩形
+    return zones
+
+
+def _pair_set(zone_set, xs, ys):
+    zone_idx, point_idx = zone_set.pairs(xs, ys)
+    return set(zip(zone_idx.tolist(), point_idx.tolist()))
+
+
+def test_grid_matches_brute_force():
+    rng = np.random.default_rng(1)
+    zones = _random_zones(rng, 60)
+    xs = rng.uniform(-70, 70, 2000)
+    ys = rng.uniform(-70, 70, 2000)
+    # 部分点正好落在区域外接矩形的边上
+    xs[:60] = [zone_bounds(z)[0] for z in zones]
+    ys[:60] = [zone_bounds(z)[1] for z in zones]
+    grid = ZoneSet(zones, grid_threshold=32)
+    brute = ZoneSet(zones, grid_threshold=10 ** 9)
+    assert grid._grid is not None and brute._grid is None
+    expected = _pair_set(brute, xs, ys)
+    assert expected
+    assert _pair_set(grid, xs, ys) == expected
+    hits, ref = grid.evaluate(xs, ys), brute.evaluate(xs, ys)
+    assert np.array_equal(hits.counts, ref.counts)
+    for a, b in zip(hits.targets, ref.targets):
+        assert sorted(a.tolist()) == sorted(b.tolist())
+
+
+def test_grid_results_sorted_by_zone():
+    rng = np.random.default_rng(2)
+    zone_set = ZoneSet(_random_zones(rng, 40), grid_threshold=32)
+    zone_idx, _ = zone_set.pairs(rng.uniform(-60, 60, 500), rng.uniform(-60, 60, 500))
+    assert np.all(np.diff(zone_idx) >= 0)
+
+
+def test_concave_polygon():
+    xs = np.array([1.0, 3.0, 5.0, 3.0, 3.0, 7.0])
+    ys = np.array([4.0, 4.0, 4.0, 1.0, 2.5, 1.0])
+    inside = points_in_polygon(xs, ys, U_SHAPE)
+    assert inside.tolist() == [True, False, True, True, False, False]
+    hits = ZoneSet([U_SHAPE]).evaluate(xs, ys, ids=[10, 11, 12, 13, 14, 15])
+    assert hits.counts.tolist() == [3]
+    assert hits.targets[0].tolist() == [10, 12, 13]
+
+
+def test_polygon_horizontal_edge_and_vertex():
+    triangle = [(0, 0), (4, 0), (0, 4)]
+    # 水平边所在直线上、顶点高度上的点不能因除零得到错误结果
+    xs = np.array([2.0, 5.0, -1.0, 1.0, 0.5])
+    ys = np.array([0.0, 0.0, 4.0, 1.0, 3.4])
+    inside = points_in_polygon(xs, ys, triangle)
+    assert not inside[1] and not inside[2]
+    assert inside[3] and inside[4]
+
+
+def test_rectangle_edges_inclusive():
+    zone_set = ZoneSet([(0, 0, 10, 5)])
+    hits = zone_set.evaluate([0, 10, 5, 10.001, 5], [0, 5, 2.5, 5, -0.001])
+    assert hits.targets[0].tolist() == [0, 1, 2]
+
+
+def test_nan_coordinates_never_match():
+    rng = np.random.default_rng(3)
+    zones = _random_zones(rng, 40) + [(-1000, -1000, 1000, 1000)]
+    xs = np.array([np.nan, 0.0, np.nan, 1.0])
+    ys = np.array([0.0, np.nan, np.nan, 1.0])
+    for threshold in (32, 10 ** 9):
+        hits = ZoneSet(zones, grid_threshold=threshold).evaluate(xs, ys)
+        matched = set(np.concatenate(hits.targets).tolist())
+        assert matched == {3}
+
+
+def test_empty_inputs():
+    assert len(ZoneSet().evaluate([1.0], [1.0]).counts) == 0
+    hits = ZoneSet([(0, 0, 1, 1)] * 40).evaluate([], [])
+    assert hits.counts.tolist() == [0] * 40
+    assert not hits.active
+
+
+def test_is_polygon():
+    assert is_polygon(U_SHAPE)
+    assert not is_polygon((0, 0, 1, 1))
+    assert zone_bounds((3, 4, 1, 2)) == (1, 2, 3, 4)
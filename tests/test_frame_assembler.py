@@ -0,0 +1,55 @@
+# test_frame_assembler.py
+from frame_assembler import FrameBuilder
+from radar_decoder import KIND_TARGET, frame_source
+from sensors import SensorConfig
+
+
+def _header(count, cycle):
+    return bytes([count, cycle >> 8, cycle & 0xFF, 0, 0, 0, 0, 0])
+
+
+def _target(tid):
+    return bytes([tid, 0x80, 0x00, 0x04, 0x80, 0x20, 0x10, 0x00])
+
+
+def _quality(tid, level):
+    return bytes([tid, 0, 0, 0, 0, 0, level << 5, 0])
+
+
+def _scan(builder, cycle, tids, levels=None):
+    """送入一个扫描周期的报文，返回结束的帧"""
+    frames = builder.header(_header(len(tids), cycle))
+    for tid in tids:
+        frames.append(builder.add(_target(tid)))
+    for tid, level in zip(tids, levels or []):
+        frames.append(builder.add_quality(_quality(tid, level)))
+    return [frame for frame in frames if frame is not None]
+
+
+def test_quality_merged_into_same_scan():
+    builder = FrameBuilder(kind=KIND_TARGET, quality=True)
+    frames = _scan(builder, 1, [1, 2], [3, 5])
+    assert len(frames) == 1
+    assert list(frames[0]['quality']) == [3, 5]
+    frames = _scan(builder, 2, [1, 2], [7, 6])
+    assert list(frames[0]['quality']) == [7, 6]
+    assert builder.stats.complete == 2
+
+
+def test_missing_quality_does_not_leak_into_next_scan():
+    builder = FrameBuilder(kind=KIND_TARGET, quality=True)
+    # 第一个周期只收到一条质量报文，下一个列表头结束该帧
+    assert _scan(builder, 1, [1, 2], [4]) == []
+    frames = _scan(builder, 2, [1, 2])
+    assert list(frames[0]['quality']) == [4, 0]
+    frames = builder.header(_header(0, 3))
+    assert list(frames[0]['quality']) == [0, 0]
+
+
+def test_empty_scan_emits_empty_frame():
+    sensor = SensorConfig(index=2)
+    builder = FrameBuilder(sensor, KIND_TARGET)
+    frames = _scan(builder, 1, [])
+    assert len(frames) == 1 and len(frames[0]) == 0
+    assert frame_source(frames[0]) == (2, KIND_TARGET)
+    assert builder.stats.frames == 1 and builder.stats.complete == 1
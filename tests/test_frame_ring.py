@@ -0,0 +1,71 @@
+# test_frame_ring.py
+import numpy as np
+from frame_ring import FrameRing, copy_frame
+from radar_decoder import FRAME_DTYPE, KIND_CLUSTER, empty_frame, frame_source
+
+
+def _frame(tids, sensor=0):
+    frame = np.zeros(len(tids), dtype=FRAME_DTYPE)
+    frame['tid'] = tids
+    frame['x'] = tids
+    frame['sensor'] = sensor
+    return frame
+
+
+def test_write_and_read_views():
+    ring = FrameRing(slots=4, capacity=16)
+    reader = FrameRing(ring.name)
+    try:
+        ring.write(_frame([1, 2, 3]))
+        ring.write(_frame([4]))
+        frames = reader.read()
+        assert [seq for seq, _ in frames] == [1, 2]
+        assert [list(view['tid']) for _, view in frames] == [[1, 2, 3], [4]]
+        assert reader.read() == []
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_wraparound_drops_overwritten_frames():
+    ring = FrameRing(slots=4, capacity=16)
+    reader = FrameRing(ring.name)
+    try:
+        for i in range(6):
+            ring.write(_frame([i] * 5))  # 每帧5个点，记录区只能保留3帧
+        frames = reader.read()
+        assert [int(view['tid'][0]) for _, view in frames] == [3, 4, 5]
+        assert reader.dropped == 3
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_empty_frame_through_ring():
+    ring = FrameRing(slots=4, capacity=16)
+    reader = FrameRing(ring.name)
+    try:
+        ring.write(_frame([5], sensor=1))
+        ring.write(empty_frame(1, KIND_CLUSTER))
+        frames = [view for _, view in reader.read()]
+        assert [len(frame) for frame in frames] == [1, 0]
+        assert frame_source(frames[1]) == (1, KIND_CLUSTER)
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_copy_frame_matches_view():
+    ring = FrameRing(slots=4, capacity=16)
+    try:
+        frame = _frame([1, 2, 3, 4, 5])
+        frame['timestamp'] = 12.5
+        ring.write(frame)
+        (seq, view), = ring.read()
+        copy = copy_frame(view)
+        ring.write(np.zeros(16, dtype=FRAME_DTYPE))  # 绕回覆盖原视图
+        assert not ring.valid(seq)
+        assert copy.tobytes() == frame.tobytes()
+        copy['x'][0] = 9  # 副本可写
+    finally:
+        ring.close()
@@ -0,0 +1,45 @@
+# test_radar_config.py
+from radar_config import OUTPUT_CFG, RATES, RESOLUTIONS, SENSOR_ID_CFG, RadarConfig
+
+
+def _connect(config, target_id):
+    sent = []
+    config.target_id = target_id
+    config.sender = sent.append
+    return sent
+
+
+def test_messages_offset_by_target_sensor():
+    config = RadarConfig()
+    sent = _connect(config, 2)
+    config.commit()
+    transaction = config.set_output_mode(3)
+    assert sent[-1] is transaction
+    assert [transaction.message_id(can_id) for can_id, _ in transaction.messages()] == [OUTPUT_CFG + 0x20]
+
+
+def test_sensor_id_not_in_full_push():
+    config = RadarConfig()
+    sent = _connect(config, 1)
+    config.reset_applied()
+    transaction = config.commit()
+    assert SENSOR_ID_CFG not in transaction.registers
+    # 与目标雷达当前ID相同时不下发，修改时单独下发
+    assert config.set_sensor_id(1) is None
+    transaction = config.set_sensor_id(4)
+    assert list(transaction.registers) == [SENSOR_ID_CFG]
+    assert transaction.message_id(SENSOR_ID_CFG) == SENSOR_ID_CFG + 0x10
+    config.reset_applied()
+    assert SENSOR_ID_CFG not in config.commit().registers
+    assert len(sent) == 3
+
+
+def test_apply_settings_keeps_missing_values():
+    config = RadarConfig()
+    config.set_angle_resolution(0.2)
+    config.set_update_rate(RATES[-1])
+    config.apply_settings({'rcs': config.rcs_threshold})
+    assert config.angle_resolution == 0.2
+    assert config.update_rate == RATES[-1]
+    config.apply_settings({'resolution': 0})
+    assert config.angle_resolution == RESOLUTIONS[0]
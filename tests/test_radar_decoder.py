@@ -0,0 +1,49 @@
+# test_radar_decoder.py
+import itertools
+import numpy as np
+from radar_decoder import decode_frame, decode_target, decode_targets
+
+
+def _payloads():
+    """随机负载加上每个字节取0x00/0xFF的组合（距离和方位角的最小、最大原始值）"""
+    rng = np.random.default_rng(0)
+    random = rng.integers(0, 256, (2000, 8), dtype=np.uint8)
+    edges = np.array(list(itertools.product((0x00, 0xFF), repeat=8)), dtype=np.uint8)
+    return np.concatenate((random, edges))
+
+
+def test_decode_targets_matches_scalar():
+    payloads = _payloads()
+    expected = np.array([decode_target(bytes(row)) for row in payloads], dtype=np.float64)
+    tids, xs, ys = decode_targets(payloads)
+    np.testing.assert_array_equal(tids, expected[:, 0])
+    np.testing.assert_allclose(xs, expected[:, 1], rtol=0, atol=1e-9)
+    np.testing.assert_allclose(ys, expected[:, 2], rtol=0, atol=1e-9)
+
+
+def test_decode_targets_accepts_bytes():
+    payloads = _payloads()
+    for a, b in zip(decode_targets(payloads), decode_targets(payloads.tobytes())):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_decode_frame_position_matches_scalar():
+    payloads = _payloads()
+    expected = np.array([decode_target(bytes(row)) for row in payloads], dtype=np.float64)
+    frame = decode_frame(payloads)
+    np.testing.assert_array_equal(frame['tid'], expected[:, 0])
+    # 帧中的坐标为float32
+    np.testing.assert_allclose(frame['x'], expected[:, 1], rtol=1e-6, atol=1e-3)
+    np.testing.assert_allclose(frame['y'], expected[:, 2], rtol=1e-6, atol=1e-3)
+
+
+def test_boundary_values():
+    tid, x, y = decode_target(bytes([0xFF] * 8))
+    assert tid == 255
+    # 距离 (0xFF<<5 | 0xF8) * 0.2 - 500，方位角 0xFFFF * 0.1 - 180
+    distance = (0xFF << 5 | 0xF8) * 0.2 - 500
+    angle = np.deg2rad(0xFFFF * 0.1 - 180)
+    assert np.isclose(x, distance * np.cos(angle)) and np.isclose(y, distance * np.sin(angle))
+    # 全0: 距离-500 m，方位角-180度
+    tid, x, y = decode_target(bytes(8))
+    assert tid == 0 and np.isclose(x, 500) and np.isclose(y, 0, atol=1e-9)
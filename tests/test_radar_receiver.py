@@ -0,0 +1,81 @@
+# test_radar_receiver.py
+import threading
+import time
+import can
+from alarm_engine import AlarmMonitor
+from alarm_zones import ZoneSet
+from radar_receiver import RadarReceiver
+
+
+def _start(channel, **kwargs):
+    receiver = RadarReceiver(channel, interface='virtual', **kwargs)
+    statuses, tx_stats = [], []
+    receiver.on_status = statuses.append
+    receiver.on_tx_stats = tx_stats.append
+    thread = threading.Thread(target=receiver.run, daemon=True)
+    thread.start()
+    return receiver, thread, statuses, tx_stats
+
+
+def _stop(receiver, thread):
+    receiver.running = False
+    thread.join(2.0)
+
+
+def test_tx_stats_reported_while_running_without_batch_frames():
+    receiver, thread, _, tx_stats = _start('test_rx_stats', batch_frames=False)
+    receiver.stats_interval = 0.2
+    try:
+        receiver.send(can.Message(arbitration_id=0x200, data=bytes(8), is_extended_id=False))
+        deadline = time.monotonic() + 2.0
+        while not tx_stats and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert tx_stats and tx_stats[-1]['sent'] == 1
+    finally:
+        _stop(receiver, thread)
+
+
+def test_status_steady_while_sending():
+    """有报文待发送时recv提前返回，不应把每次空recv都当作无数据"""
+    receiver, thread, statuses, _ = _start('test_rx_status')
+    receiver.tx_queue.gap = 0.02
+    peer = can.interface.Bus('test_rx_status', interface='virtual')
+    try:
+        for _ in range(40):
+            receiver.send(can.Message(arbitration_id=0x7FF, data=bytes(8), is_extended_id=False))
+        for i in range(25):
+            peer.send(can.Message(arbitration_id=0x60B, data=bytes([i, 0x80, 0, 0x04, 0x80, 0x20, 0x10, 0]),
+                                  is_extended_id=False))
+            time.sleep(0.03)
+        assert 'active' in statuses
+        assert 'inactive' not in statuses[statuses.index('active'):]
+    finally:
+        _stop(receiver, thread)
+        peer.shutdown()
+
+
+def test_alarms_evaluated_without_batch_frames():
+    events, frames, targets = [], [], []
+    monitor = AlarmMonitor(on_event=events.extend)
+    monitor.set_zones(ZoneSet([(-1000, -1000, 1000, 1000)]))
+    monitor.start()
+    receiver, thread, _, _ = _start('test_rx_alarm', batch_frames=False)
+    receiver.alarm_monitor = monitor
+    receiver.on_frame = frames.append
+    receiver.on_target = targets.append
+    peer = can.interface.Bus('test_rx_alarm', interface='virtual')
+    try:
+        time.sleep(0.1)
+        # 列表头报告1个目标，收齐后组成一帧交给报警线程
+        peer.send(can.Message(arbitration_id=0x60A, data=bytes([1, 0, 1, 0, 0, 0, 0, 0]), is_extended_id=False))
+        peer.send(can.Message(arbitration_id=0x60B, data=bytes([3, 0x80, 0, 0x04, 0x80, 0x20, 0x10, 0]),
+                              is_extended_id=False))
+        deadline = time.monotonic() + 2.0
+        while not events and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert [event.kind for event in events] == ['enter']
+        assert len(targets) == 1 and not frames
+    finally:
+        _stop(receiver, thread)
+        monitor.stop()
+        peer.shutdown()
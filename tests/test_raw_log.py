@@ -0,0 +1,83 @@
+import numpy as np
+
+from raw_log import RAW_FRAME_DTYPE, RawFrameLog
+
+
+def _records(start, count, ids=(0x100, 0x200, 0x300)):
+    records = np.zeros(count, dtype=RAW_FRAME_DTYPE)
+    seqs = np.arange(start, start + count)
+    records['timestamp'] = seqs * 0.01
+    records['arbitration_id'] = np.asarray(ids)[seqs % len(ids)]
+    records['dlc'] = 8
+    records['data'][:, 0] = seqs % 256
+    return records
+
+
+def test_grows_lazily_up_to_capacity():
+    log = RawFrameLog(capacity=100, initial=8)
+    assert len(log.records) == 8
+    for i in range(20):
+        log.append(i * 0.01, 0x100, bytes([i]))
+    assert len(log.records) == 32
+    log.extend(_records(20, 200))
+    assert len(log.records) == 100
+    assert log.first_seq == 120 and len(log) == 100
+    assert log.slice()['data'][:, 0].tolist() == [s % 256 for s in range(120, 220)]
+
+
+def test_wraparound_keeps_latest_records():
+    log = RawFrameLog(capacity=10, initial=4)
+    log.extend(_records(0, 7))
+    for seq in range(7, 23):
+        log.append(seq * 0.01, 0x100 + 0x100 * (seq % 3), bytes([seq, 1, 2]))
+    assert log.total == 23 and log.first_seq == 13
+    records = log.slice()
+    assert records['data'][:, 0].tolist() == list(range(13, 23))
+    assert records['dlc'].tolist() == [3] * 10
+    assert np.all(np.diff(records['timestamp']) > 0)
+
+
+def test_extend_larger_than_capacity():
+    log = RawFrameLog(capacity=10, initial=4)
+    log.extend(_records(0, 3))
+    log.extend(_records(3, 25))
+    assert log.total == 28 and log.first_seq == 18
+    assert log.slice()['data'][:, 0].tolist() == list(range(18, 28))
+    assert log.query([0x100]).tolist() == [18, 21, 24, 27]
+
+
+def test_index_pruned_after_overwrite():
+    log = RawFrameLog(capacity=50, initial=50)
+    for start in range(0, 3000, 30):
+        log.extend(_records(start, 30))
+    index = log._index[0x100]
+    seqs = log.query([0x100])
+    assert seqs.tolist() == [s for s in range(2950, 3000) if s % 3 == 0]
+    # 覆盖的序号被丢弃，索引不随累计写入条数增长
+    assert index.count - index.start == len(seqs)
+    assert len(index.seqs) <= 128
+
+
+def test_query_across_wrap_point():
+    log = RawFrameLog(capacity=16, initial=16)
+    log.extend(_records(0, 27))  # 最旧记录位于缓冲区中间，序号11~26
+    assert log.total % log.capacity != 0
+    all_seqs = log.query()
+    assert all_seqs.tolist() == list(range(11, 27))
+    # 时间范围跨过缓冲区末尾
+    seqs = log.query(start_time=0.14, end_time=0.20)
+    assert seqs.tolist() == list(range(14, 21))
+    assert log.get(seqs)['timestamp'].tolist() == [s * 0.01 for s in range(14, 21)]
+    seqs = log.query([0x200, 0x300], start_time=0.14, end_time=0.20)
+    assert seqs.tolist() == [s for s in range(14, 21) if s % 3 != 0]
+    assert log.query([0x400]).size == 0
+
+
+def test_clear():
+    log = RawFrameLog(capacity=8, initial=4)
+    log.extend(_records(0, 12))
+    log.clear()
+    assert len(log) == 0 and log.ids() == []
+    log.append(1.0, 0x123, b'\x01')
+    assert log.query([0x123]).tolist() == [0]
+    assert log.start_time == 1.0
@@ -0,0 +1,32 @@
+# test_recorder.py
+import numpy as np
+from radar_decoder import FRAME_DTYPE
+from recorder import CaptureRecorder, load_capture
+
+
+def _record(path, tids, **kwargs):
+    recorder = CaptureRecorder(path, **kwargs)
+    recorder.start()
+    frame = np.zeros(len(tids), dtype=FRAME_DTYPE)
+    frame['tid'] = tids
+    recorder.add_targets(frame)
+    recorder.stop()
+
+
+def test_append_after_torn_chunk(tmp_path):
+    path = str(tmp_path / 'capture.srcap')
+    _record(path, [1, 2])
+    # 模拟上次录制中断: 末尾留下半个数据块
+    with open(path, 'ab') as f:
+        f.write(b'CHNK\x02\x05')
+    _record(path, [3])
+    _, targets = load_capture(path)
+    assert list(targets['tid']) == [1, 2, 3]
+
+
+def test_overwrite(tmp_path):
+    path = str(tmp_path / 'capture.srcap')
+    _record(path, [1, 2])
+    _record(path, [3], overwrite=True)
+    _, targets = load_capture(path)
+    assert list(targets['tid']) == [3]
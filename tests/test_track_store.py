@@ -0,0 +1,58 @@
+import numpy as np
+
+from track_store import TrackStore
+
+
+def test_points_in_time_order_after_wrap():
+    store = TrackStore(max_tracks=4, track_length=3)
+    for i in range(5):
+        store.append(7, float(i), -float(i), i * 0.1)
+    points = store.points(7)
+    assert points[:, 0].tolist() == [2.0, 3.0, 4.0]
+    assert points[:, 1].tolist() == [-2.0, -3.0, -4.0]
+
+
+def test_reused_id_starts_new_track():
+    store = TrackStore(max_tracks=4, track_length=5, max_age=1.0)
+    store.append(1, 0.0, 0.0, 0.0)
+    store.append(1, 1.0, 1.0, 0.5)
+    store.append(1, 9.0, 9.0, 2.0)
+    assert store.points(1)[:, 0].tolist() == [9.0]
+
+
+def test_full_store_evicts_oldest_track():
+    store = TrackStore(max_tracks=3, track_length=5)
+    store.extend([1, 2, 3], np.zeros(3), np.zeros(3), 0.0)
+    store.extend([2, 3], np.ones(2), np.ones(2), 0.1)
+    store.extend([4], [5.0], [5.0], 0.2)
+    assert 1 not in store
+    assert {2, 3, 4} <= set(store._slots)
+    assert len(store.points(2)) == 2
+
+
+def test_frame_with_more_tracks_than_slots():
+    store = TrackStore(max_tracks=4, track_length=5)
+    store.extend([1, 2], np.zeros(2), np.zeros(2), 0.0)
+    keys = list(range(10, 16))
+    xs = np.arange(6, dtype=float)
+    slots = store.extend(keys, xs, xs, 1.0)
+    # 本帧先分配的槽位不会被本帧后面的新轨迹回收
+    assigned = slots[slots >= 0]
+    assert len(assigned) == 4 and len(set(assigned.tolist())) == 4
+    assert slots.tolist()[4:] == [-1, -1]
+    assert set(store._slots) == {10, 11, 12, 13}
+    for key, x in zip(keys[:4], xs[:4]):
+        assert store.points(key).tolist() == [[x, x, 1.0]]
+    # 下一帧仍可正常回收旧轨迹
+    store.extend([20], [7.0], [7.0], 2.0)
+    assert 20 in store and len(store) == 4
+
+
+def test_evict_and_take_dirty():
+    store = TrackStore(max_tracks=4, track_length=5, max_age=1.0)
+    store.extend([1, 2], np.zeros(2), np.zeros(2), 0.0)
+    assert sorted(store.take_dirty().tolist()) == sorted(store._slots.values())
+    assert store.take_dirty().size == 0
+    store.append(2, 1.0, 1.0, 1.5)
+    stale = store.evict(2.1)
+    assert len(stale) == 1 and 1 not in store and 2 in store
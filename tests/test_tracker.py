@@ -0,0 +1,63 @@
+# test_tracker.py
+import numpy as np
+from tracker import TargetTracker
+
+
+def _run(tracker, frames, dt=0.05, t0=0.0):
+    """依次送入若干帧 [(xs, ys)]，返回每帧的结果"""
+    return [tracker.update(xs, ys, t0 + i * dt) for i, (xs, ys) in enumerate(frames)]
+
+
+def test_ids_stable_for_moving_targets():
+    tracker = TargetTracker()
+    frames = [([10 + 0.5 * i, -5.0], [0.0, 20 - 0.3 * i]) for i in range(20)]
+    results = _run(tracker, frames)
+    first_ids = results[0][0]
+    assert len(set(first_ids.tolist())) == 2
+    for ids, confirmed, _, _ in results:
+        assert list(ids) == list(first_ids)
+    assert results[-1][1].all()
+    assert not results[0][1].any()  # 命中 confirm_hits 次后才确认
+
+
+def test_measurement_outside_gate_starts_new_track():
+    tracker = TargetTracker()
+    ids = [tracker.update([0.0], [0.0], i * 0.05)[0][0] for i in range(5)]
+    assert len(set(ids)) == 1
+    jumped = tracker.update([30.0], [30.0], 0.25)[0][0]
+    assert jumped != ids[0]
+    assert len(tracker) == 2
+
+
+def test_coasting_and_expiry():
+    tracker = TargetTracker(max_coast=0.5)
+    track_id = tracker.update([5.0], [5.0], 0.0)[0][0]
+    # 短暂丢失后仍关联到原航迹
+    tracker.update([], [], 0.2)
+    assert tracker.update([5.0], [5.0], 0.4)[0][0] == track_id
+    # 超过 max_coast 没有量测后删除
+    tracker.update([], [], 1.0)
+    assert len(tracker) == 0
+    assert tracker.update([5.0], [5.0], 1.05)[0][0] != track_id
+
+
+def test_empty_frames():
+    tracker = TargetTracker()
+    ids, confirmed, xs, ys = tracker.update(np.zeros(0), np.zeros(0), 0.0)
+    assert len(ids) == len(confirmed) == len(xs) == len(ys) == 0
+    assert len(tracker) == 0
+
+
+def test_time_going_backwards_drops_tracks():
+    tracker = TargetTracker(max_coast=0.5)
+    old = tracker.update([5.0], [5.0], 100.0)[0][0]
+    # 重新回放，时间从头开始
+    results = _run(tracker, [([20.0], [0.0])] * 40, t0=1.0)
+    assert len(tracker) == 1
+    assert old not in [ids[0] for ids, _, _, _ in results]
+
+
+def test_track_limit():
+    tracker = TargetTracker(max_tracks=4)
+    ids = tracker.update(np.arange(6) * 10.0, np.zeros(6), 0.0)[0]
+    assert (ids[:4] >= 0).all() and (ids[4:] == -1).all()
@@ -0,0 +1,96 @@
+# test_tx_queue.py
+import time
+import can
+from tx_queue import TxQueue
+
+
+class _Bus:
+    """记录发送的报文，fail_times 次后才发送成功"""
+
+    def __init__(self, fail_times=0, error=can.CanOperationError):
+        self.sent = []
+        self.fail_times = fail_times
+        self.error = error
+
+    def send(self, message, timeout=None):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise self.error("发送缓冲区满")
+        self.sent.append((message.arbitration_id, time.monotonic()))
+
+
+def _message(can_id):
+    return can.Message(arbitration_id=can_id, data=bytes(8), is_extended_id=False)
+
+
+def test_max_burst_per_drain():
+    queue = TxQueue(gap=0.0, max_burst=3)
+    bus = _Bus()
+    for i in range(5):
+        assert queue.put(_message(i))
+    assert queue.drain(bus) == 3
+    assert queue.drain(bus) == 2
+    assert [can_id for can_id, _ in bus.sent] == [0, 1, 2, 3, 4]
+
+
+def test_gap_between_messages():
+    queue = TxQueue(gap=0.02, max_burst=4)
+    bus = _Bus()
+    queue.put(_message(1))
+    queue.put(_message(2))
+    assert queue.drain(bus) == 1  # 第二条未到发送间隔
+    wait = queue.wait_time()
+    assert 0 < wait <= 0.02
+    time.sleep(wait)
+    assert queue.drain(bus) == 1
+    assert bus.sent[1][1] - bus.sent[0][1] >= 0.02
+    assert queue.wait_time() is None
+
+
+def test_retry_on_operation_error():
+    results = []
+    queue = TxQueue(gap=0.0, max_retries=3, retry_delay=0.0)
+    bus = _Bus(fail_times=2)
+    queue.put(_message(1), lambda message, error, latency: results.append(error))
+    for _ in range(3):
+        queue.drain(bus)
+    assert results == [None]
+    assert queue.stats.retries == 2 and queue.stats.sent == 1 and queue.stats.failed == 0
+
+
+def test_failure_after_max_retries():
+    results = []
+    queue = TxQueue(gap=0.0, max_retries=1, retry_delay=0.0)
+    bus = _Bus(fail_times=5)
+    queue.put(_message(1), lambda message, error, latency: results.append(error))
+    queue.put(_message(2))
+    queue.drain(bus)  # 第一条重试
+    queue.drain(bus)  # 第一条失败，第二条开始重试
+    assert len(results) == 1 and results[0] is not None
+    assert queue.stats.failed == 1 and queue.stats.retries == 2
+    assert len(queue) == 1  # 第二条仍在重试
+
+
+def test_other_can_errors_fail_immediately():
+    queue = TxQueue(gap=0.0)
+    queue.put(_message(1))
+    queue.drain(_Bus(fail_times=1, error=can.CanError))
+    assert queue.stats.failed == 1 and queue.stats.retries == 0 and len(queue) == 0
+
+
+def test_stats_and_rejection():
+    queue = TxQueue(maxsize=2, gap=0.0)
+    assert queue.put(_message(1)) and queue.put(_message(2))
+    assert not queue.put(_message(3))
+    queue.drain(_Bus())
+    stats = queue.stats.to_dict()
+    assert stats['sent'] == 2 and stats['rejected'] == 1 and stats['failed'] == 0
+    assert 0 <= stats['latency_p50_ms'] <= stats['latency_max_ms']
+
+
+def test_clear_reports_failure():
+    results = []
+    queue = TxQueue()
+    queue.put(_message(1), lambda message, error, latency: results.append(error))
+    queue.clear("总线已关闭")
+    assert results == ["总线已关闭"] and queue.stats.failed == 1 and len(queue) == 0